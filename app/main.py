@@ -1,7 +1,50 @@
-from dataclasses import dataclass
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from app.utils import create_kml, generate_html_map
+from app.utils import (
+    create_kml,
+    export,
+    generate_html_map,
+    html_map,
+    iter_locations,
+    kml_exporter,
+    load_store,
+    profiling,
+)
+from app.utils.build_cache import (
+    BuildManifest,
+    geocoder_inputs,
+    hash_config,
+    hash_file,
+    zone_digests,
+)
+from app.utils.dedup import DEFAULT_DISTANCE_M, Deduplicator
+from app.utils.geocoding import (
+    Gazetteer,
+    GeocodeCache,
+    Geocoder,
+    NominatimBackend,
+    geocode_csv,
+)
+from app.utils.models import COUNTRY_CONFIGS, Location
+
+if TYPE_CHECKING:
+    from app.utils.columnar import LocationStore
+    from app.utils.itinerary import Itinerary
+    from app.utils.watch import Snapshot
+
+GEOCODE_CACHE_NAME = ".geocode_cache.sqlite"
+
+# Default --density threshold, as in app.utils.density (not imported: it needs numpy)
+DENSITY_ZOOM = 13
 
 
 @dataclass
@@ -10,10 +53,74 @@ class Country:
     path: Path
 
 
-def find_countries() -> dict[str, Country]:
+@dataclass
+class CountryReport:
+    """Outcome of building one country in a batch."""
+
+    name: str
+    outputs: dict[str, str] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class BuildTask:
+    """One job of a batch build: the KML, the HTML or the extra formats of a country."""
+
+    kind: str  # "kml", "html" or "exports"
+    country_name: str
+    csv_file: str
+    outputs: dict[str, str]  # output kind or format -> file
+    inputs: dict[str, dict[str, str]]  # output kind or format -> manifest fingerprint
+
+
+@dataclass(frozen=True)
+class BuildOptions:
+    """Output options that change what gets built (and so the manifest fingerprint)."""
+
+    sharded: bool = False
+    cluster_threshold: int = html_map.CLUSTER_THRESHOLD  # above this many places, cluster
+    dedup_m: float | None = None
+    itineraries: bool = False
+    compact_popups: bool = False
+    shared_assets: bool = False  # sidebar CSS/JS as files shared by every page
+    nearby: int = 0  # other places listed in each popup (0: none)
+    ingest: str | None = None  # pandas CSV engine for validated ingestion; None streams rows
+    exports: tuple[str, ...] = ()  # extra formats (see export.WRITERS) written in one pass
+    export_categories: tuple[str, ...] = ()  # only these categories in the extra formats
+    auto_zones: bool = False  # zone outlines and views derived from the places
+    density_zoom: int | None = None  # below this zoom, density circles replace the markers
+
+    def deduplicator(self) -> Deduplicator | None:
+        """A fresh near-duplicate filter for one load, if dedup was requested."""
+        return Deduplicator(self.dedup_m) if self.dedup_m else None
+
+    def export_filter(self) -> export.Predicate | None:
+        """Which places the extra formats keep (all unless categories were given)."""
+        return export.category_filter(self.export_categories)
+
+    def map_options(self) -> dict[str, object]:
+        """The HTML map's keyword arguments for ``generate_html_map``."""
+        return {
+            "sharded": self.sharded,
+            "cluster_threshold": self.cluster_threshold,
+            "itineraries": self.itineraries,
+            "compact_popups": self.compact_popups,
+            "shared_assets": self.shared_assets,
+            "nearby": self.nearby,
+            "derive_zones": self.auto_zones,
+            "density_zoom": self.density_zoom,
+        }
+
+
+DEFAULT_OPTIONS = BuildOptions()
+
+
+def find_countries(root: Path | None = None) -> dict[str, Country]:
     """Discover countries by looking for folders with a 'data' subfolder."""
     countries: dict[str, Country] = {}
-    current_dir = Path.cwd()
+    current_dir = root or Path.cwd()
 
     for item in sorted(current_dir.iterdir()):
         if item.is_dir() and (item / "data").exists():
@@ -52,41 +159,915 @@ def get_country_choice() -> Country | None:
         return first_country
 
 
-def main() -> None:
-    result = get_country_choice()
-    if not result:
-        return
+def find_places_csv(country_path: Path) -> str | None:
+    """Return the first '*_places.csv' in the country's data folder."""
+    csv_files = sorted((country_path / "data").glob("*_places.csv"))
+    return str(csv_files[0]) if csv_files else None
 
-    country_name, country_path = result.name, result.path
 
-    # Find the CSV file in the data subfolder
-    data_folder = country_path / "data"
-    csv_files = list(data_folder.glob("*_places.csv"))
+def output_paths(
+    country_name: str, output_folder: Path, exports: Iterable[str] = ()
+) -> dict[str, str]:
+    """Output file for each exporter, plus one per extra export format."""
+    return {
+        "kml": str(output_folder / f"{country_name}_Trip_Mobile.kml"),
+        "html": str(output_folder / f"{country_name}_Planner.html"),
+        **{fmt: export.export_path(fmt, country_name, output_folder) for fmt in exports},
+    }
 
-    if not csv_files:
-        print(f"Error: No '*_places.csv' file found in {data_folder}")
-        return
 
-    csv_file = str(csv_files[0])
-    print(f"\n1. Reading '{csv_file}'...")
+def merge_report_path(country_name: str, output_folder: Path) -> Path:
+    """Where the near-duplicate merge report of a country is written."""
+    return output_folder / f"{country_name}_merge_report.csv"
 
-    # Setup output folder
-    output_folder = Path("output")
+
+def save_merge_report(country_name: str, dedup: Deduplicator, output_folder: Path) -> None:
+    """Write the merge report of a finished load and summarise it."""
+    report = merge_report_path(country_name, output_folder)
+    dedup.write_report(report)
+    print(f"🔁 {country_name}: {dedup.summary()} (report: {report})")
+
+
+def bad_rows_report_path(country_name: str, output_folder: Path) -> Path:
+    """Where the rows rejected by validated ingestion are listed."""
+    return output_folder / f"{country_name}_bad_rows.csv"
+
+
+def load_places(
+    country_name: str,
+    csv_file: str,
+    output_folder: Path,
+    geocoder: Geocoder | None = None,
+    options: BuildOptions = DEFAULT_OPTIONS,
+    save_reports: bool = True,
+) -> "LocationStore":
+    """Load a country's places the way ``options`` asks, writing its reports.
+
+    With ``options.ingest`` the CSV is read and validated column-wise; rows with
+    unusable coordinates are left out and listed in a bad-rows report instead
+    of stopping the build.
+    """
+    dedup = options.deduplicator()
+    ingest_report = None
+    with profiling.stage("load"):
+        if options.ingest:
+            from app.utils.ingest import ingest_store  # pandas; only for validated ingestion
+
+            locations, ingest_report = ingest_store(
+                csv_file, country_name, geocoder, dedup, engine=options.ingest
+            )
+        else:
+            locations = load_store(csv_file, geocoder, dedup)
+    if not save_reports:
+        return locations
+    if dedup:
+        save_merge_report(country_name, dedup, output_folder)
+    if ingest_report is not None:
+        report = bad_rows_report_path(country_name, output_folder)
+        ingest_report.write_report(report)
+        icon = "⚠️ " if ingest_report.bad_rows else "✅"
+        print(f"{icon} {country_name}: {ingest_report.summary()} (report: {report})")
+    return locations
+
+
+def output_inputs(
+    country_name: str,
+    csv_file: str,
+    options: BuildOptions = DEFAULT_OPTIONS,
+    geocoder: Geocoder | None = None,
+) -> dict[str, dict[str, str]]:
+    """Manifest fingerprint of the inputs behind each exporter's output."""
+    shared = {"csv": hash_file(csv_file), "config": hash_config(country_name)}
+    shared.update(geocoder_inputs(geocoder))
+    if options.dedup_m:
+        shared["dedup"] = f"{options.dedup_m:g}"
+    if options.itineraries:
+        shared["itineraries"] = "1"
+    html_exporter = f"html-{html_map.EXPORTER_VERSION}"
+    if options.sharded:
+        html_exporter += "-sharded"
+    if options.cluster_threshold != html_map.CLUSTER_THRESHOLD:
+        html_exporter += f"-cluster{options.cluster_threshold}"
+    if options.compact_popups:
+        html_exporter += "-compact"
+    if options.shared_assets:
+        html_exporter += "-sharedassets"
+    if options.nearby > 0:
+        html_exporter += f"-nearby{options.nearby}"
+    if options.auto_zones:
+        html_exporter += "-autozones"
+    if options.density_zoom is not None:
+        html_exporter += f"-density{options.density_zoom}"
+    if options.ingest:
+        shared["ingest"] = "validated"
+    inputs = {
+        "kml": {**shared, "exporter": f"kml-{kml_exporter.EXPORTER_VERSION}"},
+        "html": {**shared, "exporter": html_exporter},
+    }
+    for fmt in options.exports:
+        inputs[fmt] = {**shared, "exporter": f"{fmt}-{export.EXPORT_VERSION}"}
+        if options.export_categories:
+            inputs[fmt]["categories"] = ",".join(sorted(options.export_categories))
+    return inputs
+
+
+def plan_day_routes(
+    country_name: str, locations: Sequence[Location], options: BuildOptions = DEFAULT_OPTIONS
+) -> "dict[str, Itinerary] | None":
+    """Each zone's day route if ``options`` asks for them, planned once for every output."""
+    if not options.itineraries:
+        return None
+    from app.utils.itinerary import country_itineraries  # numpy; only with --itineraries
+
+    with profiling.stage("itineraries"):
+        return country_itineraries(country_name, locations)
+
+
+def write_exports(
+    country_name: str,
+    locations: Sequence[Location],
+    outputs: dict[str, str],
+    options: BuildOptions = DEFAULT_OPTIONS,
+    day_routes: "dict[str, Itinerary] | None" = None,
+) -> None:
+    """Write the extra export formats in ``outputs`` from loaded places, in one pass.
+
+    ``day_routes`` are the zones' itineraries if already planned (see
+    ``plan_day_routes``); the KMZ draws them.
+    """
+    routes = ()
+    if options.itineraries and any(fmt == "kmz" for fmt in outputs):
+        with profiling.stage("itineraries"):
+            routes = kml_exporter.route_placemarks(locations, country_name, day_routes)
+    export.write_exports(locations, outputs, country_name, options.export_filter(), routes)
+
+
+def build_country(
+    country_name: str,
+    csv_file: str,
+    output_folder: Path,
+    force: bool = False,
+    geocoder: Geocoder | None = None,
+    options: BuildOptions = DEFAULT_OPTIONS,
+) -> tuple[str, str]:
+    """Parse the CSV once and feed the same dataset to both exporters.
+
+    Outputs whose CSV, country config and exporter version are unchanged since
+    the last build (per the manifest in ``output_folder``) are skipped unless
+    ``force`` is set. ``options.sharded`` writes the HTML map with per-zone
+    GeoJSON shards. With ``options.dedup_m``, places within that many metres of an
+    earlier place with a similar name are dropped and listed in a merge report.
+    ``options.itineraries`` adds a day route through each zone to the outputs,
+    planned once and shared by all of them.
+    ``options.ingest`` skips rows with bad coordinates and lists them in a report.
+    The ``options.exports`` formats are written together in one pass afterwards.
+    """
     output_folder.mkdir(exist_ok=True)
+    outputs = output_paths(country_name, output_folder, options.exports)
+    kml_output, html_output = outputs["kml"], outputs["html"]
+
+    manifest = BuildManifest(output_folder)
+    inputs = output_inputs(country_name, csv_file, options, geocoder)
+
+    build_kml = force or not manifest.is_fresh(kml_output, inputs["kml"])
+    build_html = force or not manifest.is_fresh(html_output, inputs["html"])
+    stale_exports = {
+        fmt: outputs[fmt]
+        for fmt in options.exports
+        if force or not manifest.is_fresh(outputs[fmt], inputs[fmt])
+    }
+    if not (build_kml or build_html or stale_exports):
+        print(f"⏭️  {country_name}: inputs unchanged, outputs are up to date.")
+        return kml_output, html_output
+
+    locations = load_places(country_name, csv_file, output_folder, geocoder, options)
+    with profiling.stage("digests"):
+        digests = zone_digests(locations)
+    changed = manifest.changed_zones(country_name, digests)
+    if changed and country_name in manifest.zones:
+        print(f"   Changed zones: {', '.join(sorted(changed))}")
+    day_routes = plan_day_routes(country_name, locations, options)
 
     # Generate KML file for Google My Maps
-    kml_output = str(output_folder / f"{country_name}_Trip_Mobile.kml")
-    create_kml(csv_file, country_name, kml_output)
+    if build_kml:
+        create_kml(
+            csv_file,
+            country_name,
+            kml_output,
+            locations=locations,
+            itineraries=options.itineraries,
+            day_routes=day_routes,
+        )
+        manifest.record(kml_output, inputs["kml"])
 
     # Generate single HTML file for Desktop Planning
-    html_output = str(output_folder / f"{country_name}_Planner.html")
-    generate_html_map(csv_file, country_name, html_output)
+    if build_html:
+        generate_html_map(
+            csv_file,
+            country_name,
+            html_output,
+            locations=locations,
+            day_routes=day_routes,
+            **options.map_options(),
+        )
+        manifest.record(html_output, inputs["html"])
+
+    # GeoJSON, GPX, KMZ and CSV subsets, all from one pass over the places
+    if stale_exports:
+        write_exports(country_name, locations, stale_exports, options, day_routes)
+        for fmt, output_file in stale_exports.items():
+            manifest.record(output_file, inputs[fmt])
+
+    manifest.record_zones(country_name, digests)
+    manifest.save()
+    return kml_output, html_output
+
+
+def export_task(
+    kind: str,
+    country_name: str,
+    csv_file: str,
+    outputs: dict[str, str],
+    geocoder: Geocoder | None = None,
+    options: BuildOptions = DEFAULT_OPTIONS,
+) -> tuple[float, dict[str, str] | None]:
+    """Run one exporter on its own; returns (seconds, zone digests if computed).
+
+    ``kind`` "exports" writes every format in ``outputs`` from one pass over
+    the places; "kml" and "html" write the single file in ``outputs``.
+    Module-level so it can be pickled into a worker process.
+    """
+    start = time.perf_counter()
+    digests = None
+    output_folder = Path(next(iter(outputs.values()))).parent
+    if kind == "kml" and options.ingest:
+        # Validated like the HTML task's load, which writes the reports
+        locations = load_places(
+            country_name, csv_file, output_folder, geocoder, options, save_reports=False
+        )
+        create_kml(
+            csv_file,
+            country_name,
+            outputs["kml"],
+            locations=locations,
+            itineraries=options.itineraries,
+        )
+    elif kind == "kml":
+        # Streams rows straight from the CSV (unless routes need them all loaded)
+        create_kml(
+            csv_file,
+            country_name,
+            outputs["kml"],
+            geocoder=geocoder,
+            dedup=options.deduplicator(),
+            itineraries=options.itineraries,
+        )
+    elif kind == "exports":
+        if options.ingest or (options.itineraries and "kmz" in outputs):
+            locations = load_places(
+                country_name, csv_file, output_folder, geocoder, options, save_reports=False
+            )
+            write_exports(country_name, locations, outputs, options)
+        else:
+            # Streams places straight from the CSV into every file at once
+            export.write_exports(
+                iter_locations(csv_file, geocoder, options.deduplicator()),
+                outputs,
+                country_name,
+                options.export_filter(),
+            )
+    else:
+        locations = load_places(country_name, csv_file, output_folder, geocoder, options)
+        with profiling.stage("digests"):
+            digests = zone_digests(locations)
+        generate_html_map(
+            csv_file,
+            country_name,
+            outputs["html"],
+            locations=locations,
+            **options.map_options(),
+        )
+    return time.perf_counter() - start, digests
+
+
+def build_batch(
+    countries: list[Country],
+    output_folder: Path,
+    jobs: int | None = None,
+    force: bool = False,
+    geocoder: Geocoder | None = None,
+    options: BuildOptions = DEFAULT_OPTIONS,
+) -> list[CountryReport]:
+    """Build many countries without prompting, in up to three tasks per country.
+
+    The KML and the HTML map are a task each, and the extra ``options.exports``
+    formats one more that writes them all from a single pass over the places.
+
+    The tasks run across a pool of at most ``jobs`` worker processes (all CPUs by
+    default; ``jobs=1`` runs them in this process, one after another). The
+    manifest is only read and written here, never by the workers. While a
+    profiling session is running every task runs here, so its stages are timed.
+
+    Missing coordinates are looked up here too, once per country, and the tasks
+    read a filled-in copy of the CSV: the geocoder's rate limit only holds
+    within one process, so workers must not each query the remote service.
+    """
+    output_folder.mkdir(exist_ok=True)
+    manifest = BuildManifest(output_folder)
+    reports = {country.name: CountryReport(country.name) for country in countries}
+    tasks: list[BuildTask] = []
+
+    for country in countries:
+        report = reports[country.name]
+        csv_file = find_places_csv(country.path)
+        if csv_file is None:
+            report.errors["csv"] = f"no '*_places.csv' in {country.path / 'data'}"
+            continue
+        outputs = output_paths(country.name, output_folder, options.exports)
+        inputs = output_inputs(country.name, csv_file, options, geocoder)
+        stale: dict[str, str] = {}
+        for kind, output_file in outputs.items():
+            if not force and manifest.is_fresh(output_file, inputs[kind]):
+                report.skipped.append(kind)
+                report.outputs[kind] = output_file
+            else:
+                stale[kind] = output_file
+        for kind in ("kml", "html"):
+            if kind in stale:
+                tasks.append(BuildTask(kind, country.name, csv_file, {kind: stale[kind]}, inputs))
+        exports = {fmt: stale[fmt] for fmt in options.exports if fmt in stale}
+        if exports:
+            tasks.append(BuildTask("exports", country.name, csv_file, exports, inputs))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if geocoder is not None:
+            tasks = prefill_coordinates(tasks, geocoder, Path(tmp))
+        run_tasks(tasks, reports, manifest, jobs, options)
+
+    manifest.save()
+    return list(reports.values())
+
+
+def prefill_coordinates(
+    tasks: list[BuildTask], geocoder: Geocoder, folder: Path
+) -> list[BuildTask]:
+    """``tasks`` reading copies (in ``folder``) of their CSVs with coordinates filled in."""
+    copies: dict[str, str] = {}
+    for task in tasks:
+        if task.csv_file not in copies:
+            copy = copies[task.csv_file] = str(
+                folder / f"{task.country_name}_{Path(task.csv_file).name}"
+            )
+            with profiling.stage("geocode"):
+                geocode_csv(task.csv_file, geocoder, copy)
+    return [replace(task, csv_file=copies[task.csv_file]) for task in tasks]
+
+
+def run_tasks(
+    tasks: list[BuildTask],
+    reports: dict[str, CountryReport],
+    manifest: BuildManifest,
+    jobs: int | None,
+    options: BuildOptions,
+) -> None:
+    """Run the export ``tasks`` (in a process pool unless ``jobs`` is 1), recording each."""
+
+    def arguments(task: BuildTask) -> tuple[str, str, str, dict[str, str], None, BuildOptions]:
+        return task.kind, task.country_name, task.csv_file, task.outputs, None, options
+
+    def collect(task: BuildTask, run: Future | None) -> None:
+        report = reports[task.country_name]
+        try:
+            seconds, digests = run.result() if run else export_task(*arguments(task))
+        except Exception as exc:  # report and carry on with the other countries
+            report.errors[task.kind] = f"{type(exc).__name__}: {exc}"
+            return
+        report.seconds += seconds
+        for kind, output_file in task.outputs.items():
+            report.outputs[kind] = output_file
+            manifest.record(output_file, task.inputs[kind])
+        if digests is not None:
+            manifest.record_zones(task.country_name, digests)
+
+    if jobs == 1 or len(tasks) <= 1 or profiling.enabled():
+        for task in tasks:
+            collect(task, None)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [(task, pool.submit(export_task, *arguments(task))) for task in tasks]
+            for task, future in futures:
+                collect(task, future)
+
+
+def print_batch_summary(reports: list[CountryReport], elapsed: float) -> None:
+    """Print one line per country and the overall wall time."""
+    print("\n" + "=" * 60)
+    for report in reports:
+        status = "❌" if report.errors else "✅"
+        built = sorted(set(report.outputs) - set(report.skipped))
+        parts = [f"built {', '.join(built) or 'nothing'}"]
+        if report.skipped:
+            parts.append(f"up to date: {', '.join(sorted(report.skipped))}")
+        for kind, error in report.errors.items():
+            parts.append(f"{kind} failed: {error}")
+        print(f"{status} {report.name:<12} {report.seconds:6.2f} s  " + "; ".join(parts))
+    print(f"Batch finished in {elapsed:.2f} s")
+    print("=" * 60)
+
+
+def select_countries(args: argparse.Namespace) -> list[Country] | None:
+    """Country folders named by ``--countries`` (all by default); None after an error."""
+    discovered = list(find_countries().values())
+    if args.countries:
+        wanted = {name.strip().lower() for name in args.countries.split(",") if name.strip()}
+        unknown = wanted - {country.name.lower() for country in discovered}
+        if unknown:
+            print(f"Error: No country folder for: {', '.join(sorted(unknown))}")
+            return None
+        discovered = [country for country in discovered if country.name.lower() in wanted]
+
+    if not discovered:
+        print("Error: No country folders with 'data' subfolder found.")
+        return None
+    return discovered
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Non-interactive entry point; returns the process exit code."""
+    discovered = select_countries(args)
+    if discovered is None:
+        return 1
+
+    start = time.perf_counter()
+    reports = build_batch(
+        discovered,
+        Path("output"),
+        jobs=args.jobs,
+        force=args.force,
+        geocoder=make_geocoder(args, Path("output")),
+        options=build_options(args),
+    )
+    print_batch_summary(reports, time.perf_counter() - start)
+    return 1 if any(report.errors for report in reports) else 0
+
+
+class LiveBuild:
+    """One watched country: the snapshot of its last build and how to redo only what changed.
+
+    The first ``rebuild`` skips outputs the manifest says are up to date, like
+    ``build_country``. Later ones compare the freshly loaded rows with the last
+    snapshot: the KML is rewritten only if the places themselves changed, the
+    HTML only if some zone's places did (and, when sharded, only those zones'
+    shards are rewritten). Edits that leave the places as they were rebuild
+    nothing.
+    """
+
+    def __init__(
+        self,
+        country_name: str,
+        csv_file: str,
+        output_folder: Path,
+        geocoder: Geocoder | None = None,
+        options: BuildOptions = DEFAULT_OPTIONS,
+        force: bool = False,
+    ) -> None:
+        self.country_name = country_name
+        self.csv_file = csv_file
+        self.output_folder = output_folder
+        self.geocoder = geocoder
+        self.options = options
+        self.force = force
+        self.snapshot: Snapshot | None = None
+        self.inputs: dict[str, dict[str, str]] | None = None
+
+    def rebuild(self) -> None:
+        """Reload the CSV and regenerate the outputs its changes affect."""
+        from app.utils.watch import Snapshot, diff
+        from app.utils.zoning import zone_index_for
+
+        start = time.perf_counter()
+        name, options = self.country_name, self.options
+        self.output_folder.mkdir(exist_ok=True)
+        outputs = output_paths(name, self.output_folder, options.exports)
+        manifest = BuildManifest(self.output_folder)
+        inputs = output_inputs(name, self.csv_file, options, self.geocoder)
+        if inputs == self.inputs and all(Path(output).exists() for output in outputs.values()):
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"⏭️  {name}: CSV content unchanged, nothing to rebuild ({elapsed:.0f} ms)")
+            return
+
+        # Plain Location objects, decoded once: the rows are walked several times below
+        store = load_places(name, self.csv_file, self.output_folder, self.geocoder, options)
+        locations = [loc.to_location() for loc in store]
+        zones = COUNTRY_CONFIGS.get(name, COUNTRY_CONFIGS["Singapore"]).zones
+        with profiling.stage("snapshot"):
+            snapshot = Snapshot.of(locations, zones, zone_index_for(name).bucket(locations))
+        changes = diff(self.snapshot, snapshot)
+
+        changed_zones = None
+        if self.snapshot is None:
+            build = {
+                kind: self.force or not manifest.is_fresh(output, inputs[kind])
+                for kind, output in outputs.items()
+            }
+        else:
+            build = {
+                # Routes follow the zones, so they can change without any place changing
+                "kml": changes.rows_changed or (options.itineraries and bool(changes.zones)),
+                "html": bool(changes.zones) or not Path(outputs["html"]).exists(),
+            }
+            for fmt in options.exports:
+                # Like the KML, but the other formats also copy the CSV's Zone column
+                build[fmt] = build["kml"] if fmt == "kmz" else changes.rows_changed
+                build[fmt] |= fmt != "kmz" and changes.labels_changed
+            if Path(outputs["html"]).exists():
+                changed_zones = changes.zones
+
+        day_routes = None
+        if any(build.values()):
+            day_routes = plan_day_routes(name, locations, options)
+        if build["kml"]:
+            create_kml(
+                self.csv_file,
+                name,
+                outputs["kml"],
+                locations=locations,
+                itineraries=options.itineraries,
+                day_routes=day_routes,
+            )
+        if build["html"]:
+            generate_html_map(
+                self.csv_file,
+                name,
+                outputs["html"],
+                locations=locations,
+                day_routes=day_routes,
+                changed_zones=changed_zones,
+                **options.map_options(),
+            )
+        stale_exports = {fmt: outputs[fmt] for fmt in options.exports if build[fmt]}
+        if stale_exports:
+            write_exports(name, locations, stale_exports, options, day_routes)
+
+        # Outputs the edit did not affect are still current for the new CSV
+        for kind, output in outputs.items():
+            if Path(output).exists():
+                manifest.record(output, inputs[kind])
+        manifest.record_zones(name, zone_digests(locations))
+        manifest.save()
+        first, self.snapshot, self.inputs = self.snapshot is None, snapshot, inputs
+
+        built = [kind for kind, flag in build.items() if flag]
+        elapsed = (time.perf_counter() - start) * 1000
+        if not built:
+            reason = "outputs are up to date" if first else "places unchanged, nothing to rebuild"
+            print(f"⏭️  {name}: {reason} ({elapsed:.0f} ms)")
+        else:
+            what = "built" if first else f"{changes.summary(zones)}; rebuilt"
+            print(f"🔄 {name}: {what} {', '.join(built)} in {elapsed:.0f} ms")
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Build the chosen countries, then rebuild each one whenever its CSV is saved."""
+    from app.utils.watch import watch_files
+
+    countries = select_countries(args)
+    if countries is None:
+        return 1
+
+    output_folder = Path("output")
+    geocoder = make_geocoder(args, output_folder)
+    options = build_options(args)
+    builds: dict[Path, LiveBuild] = {}
+    for country in countries:
+        csv_file = find_places_csv(country.path)
+        if csv_file is None:
+            print(f"⚠️  {country.name}: no '*_places.csv' in {country.path / 'data'}, skipped")
+            continue
+        build = LiveBuild(country.name, csv_file, output_folder, geocoder, options, args.force)
+        builds[Path(csv_file)] = build
+        rebuild_safely(build)
+    if not builds:
+        return 1
+
+    def on_change(paths: list[Path]) -> None:
+        for path in paths:
+            rebuild_safely(builds[path])
+
+    print(f"👀 Watching {len(builds)} places CSV(s) for changes (Ctrl+C to stop)...")
+    try:
+        watch_files(list(builds), on_change)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    return 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """Serve one country's planner, place queries and KML over HTTP until interrupted."""
+    from app.utils.server import MapServer, MapSite
+
+    if args.countries:
+        countries = select_countries(args)
+        if countries is None:
+            return 1
+        if len(countries) != 1:
+            print("Error: --serve serves a single country; name one with --countries.")
+            return 1
+        country = countries[0]
+    else:
+        country = get_country_choice()
+        if country is None:
+            return 0
+
+    csv_file = find_places_csv(country.path)
+    if csv_file is None:
+        print(f"Error: No '*_places.csv' file found in {country.path / 'data'}")
+        return 1
+
+    options = build_options(args)
+    output_folder = Path("output")
+    output_folder.mkdir(exist_ok=True)
+    # Loaded like a build (dedup, validated ingestion), writing the same reports
+    locations = load_places(
+        country.name, csv_file, output_folder, make_geocoder(args, output_folder), options
+    )
+    with tempfile.TemporaryDirectory() as site_dir:
+        site = MapSite.build(
+            country.name, csv_file, Path(site_dir), locations, **options.map_options()
+        )
+        server = MapServer((args.host, args.port), site)
+        host, port = server.server_address[:2]
+        print(f"🌐 Serving {country.name} at http://{host}:{port}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Server stopped.")
+        finally:
+            server.server_close()
+    return 0
+
+
+def rebuild_safely(build: LiveBuild) -> None:
+    """Rebuild, reporting a failure (e.g. a half-typed row) instead of ending the watch."""
+    try:
+        build.rebuild()
+    except Exception as exc:  # keep watching; the next save may fix it
+        print(f"❌ {build.country_name}: {type(exc).__name__}: {exc}")
+
+
+def build_options(args: argparse.Namespace) -> BuildOptions:
+    """Output options from the command line."""
+    return BuildOptions(
+        sharded=args.sharded,
+        cluster_threshold=args.cluster_threshold,
+        dedup_m=args.dedup,
+        itineraries=args.itineraries,
+        compact_popups=args.compact_popups,
+        shared_assets=args.shared_assets,
+        nearby=args.nearby,
+        ingest=args.ingest,
+        exports=args.export,
+        export_categories=args.export_categories,
+        auto_zones=args.auto_zones,
+        density_zoom=args.density,
+    )
+
+
+def profile_session(args: argparse.Namespace) -> AbstractContextManager:
+    """Profiling session for the run if ``--profile`` or ``--pstats`` was given."""
+    if not (args.profile or args.pstats):
+        return nullcontext()
+    return profiling.profile_session(args.profile, args.pstats, memory=args.profile_memory)
+
+
+def make_geocoder(args: argparse.Namespace, output_folder: Path) -> Geocoder | None:
+    """Geocoder for rows without coordinates, if a gazetteer or Nominatim was requested."""
+    if not (args.gazetteer or args.nominatim):
+        return None
+    return Geocoder(
+        cache=GeocodeCache(output_folder / GEOCODE_CACHE_NAME),
+        gazetteer=Gazetteer(args.gazetteer) if args.gazetteer else None,
+        backend=NominatimBackend() if args.nominatim else None,
+    )
+
+
+def comma_list(text: str) -> tuple[str, ...]:
+    """Non-blank items of a comma-separated option, in order."""
+    return tuple(item.strip() for item in text.split(",") if item.strip())
+
+
+def export_formats(text: str) -> tuple[str, ...]:
+    """``--export`` formats, without repeats; rejects unknown ones."""
+    formats = tuple(dict.fromkeys(fmt.lower() for fmt in comma_list(text)))
+    unknown = [fmt for fmt in formats if fmt not in export.WRITERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown format(s) {', '.join(unknown)}; choose from {', '.join(export.WRITERS)}"
+        )
+    return formats
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build trip maps from a country's places CSV.")
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild even if the inputs are unchanged"
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="build every country folder without prompting"
+    )
+    parser.add_argument(
+        "--countries",
+        metavar="NAMES",
+        help="comma-separated country folders to build without prompting (implies --batch)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="worker processes for batch builds (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild a country's outputs whenever its places CSV changes "
+        "(all countries, or those given with --countries)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve one country's planner, /places bbox queries and /kml over HTTP",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="address to serve on (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8000, help="port to serve on (default: 8000; 0 picks one)"
+    )
+    parser.add_argument(
+        "--gazetteer",
+        metavar="PATH",
+        help="local SQLite gazetteer for places that have an address but no coordinates",
+    )
+    parser.add_argument(
+        "--nominatim",
+        action="store_true",
+        help="look up places missing from the gazetteer on OpenStreetMap Nominatim",
+    )
+    parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help="write each zone's places to a GeoJSON file the HTML map loads on demand",
+    )
+    parser.add_argument(
+        "--cluster-threshold",
+        type=int,
+        default=html_map.CLUSTER_THRESHOLD,
+        metavar="N",
+        help="cluster the HTML map's markers in the browser when there are more than N places "
+        f"(default {html_map.CLUSTER_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--dedup",
+        type=float,
+        nargs="?",
+        const=DEFAULT_DISTANCE_M,
+        metavar="METRES",
+        help=f"drop places with a similar name within METRES of an earlier one "
+        f"(default {DEFAULT_DISTANCE_M:g} m) and write a merge report",
+    )
+    parser.add_argument(
+        "--itineraries",
+        action="store_true",
+        help="draw a short day route through each zone's places on both outputs",
+    )
+    parser.add_argument(
+        "--compact-popups",
+        action="store_true",
+        help="write unclustered markers as one JSON table and build popups in the browser",
+    )
+    parser.add_argument(
+        "--nearby",
+        type=int,
+        default=0,
+        metavar="N",
+        help=f"list up to N other places within {html_map.NEARBY_RADIUS_M} m in each "
+        "HTML map popup",
+    )
+    parser.add_argument(
+        "--shared-assets",
+        action="store_true",
+        help="write the sidebar CSS/JS once next to the HTML maps and link them, instead of "
+        "inlining them in every page",
+    )
+    parser.add_argument(
+        "--auto-zones",
+        action="store_true",
+        help="outline zones that have no hand-drawn polygon by their places, and fit each "
+        "zone's view to its places",
+    )
+    parser.add_argument(
+        "--density",
+        type=int,
+        nargs="?",
+        const=DENSITY_ZOOM,
+        metavar="ZOOM",
+        help=f"below zoom level ZOOM (default {DENSITY_ZOOM}) draw circles counting the places "
+        "per area instead of individual markers",
+    )
+    parser.add_argument(
+        "--ingest",
+        nargs="?",
+        const="auto",
+        choices=("auto", "c", "pyarrow"),
+        metavar="ENGINE",
+        help="read the CSV with pandas (ENGINE: auto, c or pyarrow), skip rows with bad "
+        "coordinates and list them in a report instead of stopping",
+    )
+    parser.add_argument(
+        "--export",
+        type=export_formats,
+        default=(),
+        metavar="FORMATS",
+        help=f"also write these formats in one pass over the places, comma-separated "
+        f"({', '.join(export.WRITERS)})",
+    )
+    parser.add_argument(
+        "--export-categories",
+        type=comma_list,
+        default=(),
+        metavar="NAMES",
+        help="only export places of these comma-separated categories (e.g. Food,Bar)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="write a JSON report of per-stage timings and counters to PATH",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="also trace peak Python memory per stage (slows the build down)",
+    )
+    parser.add_argument(
+        "--pstats", metavar="PATH", help="write a cProfile dump to PATH (see 'python -m pstats')"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    with profile_session(args) as profiler:
+        if args.serve:
+            code = run_serve(args)
+        elif args.watch:
+            code = run_watch(args)
+        elif args.batch or args.countries:
+            code = run_batch(args)
+        else:
+            code = run_interactive(args)
+    if profiler is not None:
+        print("\n" + profiler.summary())
+        if args.profile:
+            print(f"⏱️  Profile written to '{args.profile}'")
+        if args.pstats:
+            print(f"⏱️  cProfile stats written to '{args.pstats}'")
+    if code:
+        raise SystemExit(code)
+
+
+def run_interactive(args: argparse.Namespace) -> int:
+    """Prompt for a country and build it; returns the process exit code."""
+    result = get_country_choice()
+    if not result:
+        return 0
+
+    country_name, country_path = result.name, result.path
+
+    # Find the CSV file in the data subfolder
+    csv_file = find_places_csv(country_path)
+    if csv_file is None:
+        print(f"Error: No '*_places.csv' file found in {country_path / 'data'}")
+        return 0
+
+    print(f"\n1. Reading '{csv_file}'...")
+
+    # Generate both outputs from a single parse of the CSV
+    output_folder = Path("output")
+    build_country(
+        country_name,
+        csv_file,
+        output_folder,
+        force=args.force,
+        geocoder=make_geocoder(args, output_folder),
+        options=build_options(args),
+    )
 
     print("\n" + "=" * 60)
     print("✨ Files generated in 'output' folder!")
     print(f"🌏 Open 'output/{country_name}_Planner.html' in your browser")
     print(f"📍 Or import 'output/{country_name}_Trip_Mobile.kml' to Google My Maps")
     print("=" * 60)
+    return 0
 
 
 if __name__ == "__main__":
@@ -1,4 +1,57 @@
-from .html_map import generate_html_map
-from .kml_exporter import create_kml
+"""Exporters and loaders, imported on first attribute access.
 
-__all__ = ["generate_html_map", "create_kml"]
+``from app.utils import create_kml`` only loads the KML exporter; folium and
+jinja2 are not imported until ``generate_html_map`` actually builds a map.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .columnar import LocationStore
+    from .export import export_locations
+    from .html_map import generate_html_map
+    from .ingest import ingest_store
+    from .kml_exporter import create_kml
+    from .loader import iter_locations, iter_rows, load_locations, load_store
+    from .spatial import SpatialIndex
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "generate_html_map": "html_map",
+    "create_kml": "kml_exporter",
+    "export_locations": "export",
+    "ingest_store": "ingest",
+    "iter_locations": "loader",
+    "iter_rows": "loader",
+    "load_locations": "loader",
+    "load_store": "loader",
+    "LocationStore": "columnar",
+    "SpatialIndex": "spatial",
+}
+
+__all__ = [
+    "generate_html_map",
+    "create_kml",
+    "export_locations",
+    "ingest_store",
+    "iter_locations",
+    "iter_rows",
+    "load_locations",
+    "load_store",
+    "LocationStore",
+    "SpatialIndex",
+]
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,124 @@
+"""Build manifest that lets unchanged trip folders skip regeneration.
+
+The manifest lives at ``output/.build_manifest.json``. For every generated file
+it records the fingerprint of its inputs: the content hash of the places CSV,
+the hash of the country's ``COUNTRY_CONFIGS`` entry, and the exporter version.
+An output is fresh when it still exists and its recorded fingerprint matches.
+
+Per-zone row digests are stored alongside, so a rebuild can report which zones
+actually changed.
+"""
+
+import hashlib
+import json
+from collections.abc import Iterable
+from dataclasses import asdict
+from pathlib import Path
+
+from .geocoding import Geocoder
+from .models import COUNTRY_CONFIGS, Location
+
+MANIFEST_NAME = ".build_manifest.json"
+MANIFEST_VERSION = 1
+
+# Read size used when hashing input files
+_HASH_CHUNK = 1 << 20
+
+
+def hash_file(path: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_config(country: str) -> str:
+    """Return a stable hash of the ``COUNTRY_CONFIGS`` entry used for ``country``."""
+    config = asdict(COUNTRY_CONFIGS.get(country, COUNTRY_CONFIGS["Singapore"]))
+    encoded = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def geocoder_inputs(geocoder: Geocoder | None) -> dict[str, str]:
+    """Fingerprint of where missing coordinates come from.
+
+    Outputs built before a gazetteer or the remote backend was added (or before
+    the gazetteer was rebuilt) may be missing rows that can now be placed.
+    """
+    if geocoder is None:
+        return {}
+    inputs = {}
+    if geocoder.gazetteer is not None:
+        path = Path(geocoder.gazetteer.path)
+        try:
+            digest = hash_file(path)
+        except FileNotFoundError:
+            digest = "missing"
+        inputs["gazetteer"] = f"{path.resolve()}:{digest}"
+    if geocoder.backend is not None:
+        inputs["geocoder_remote"] = type(geocoder.backend).__name__
+    return inputs
+
+
+def zone_digests(locations: Iterable[Location]) -> dict[str, str]:
+    """Digest the rows of each zone (keyed by the CSV ``Zone`` text)."""
+    digests: dict[str, hashlib.blake2b] = {}
+    for loc in locations:
+        digest = digests.get(loc.zone)
+        if digest is None:
+            digest = digests[loc.zone] = hashlib.blake2b(digest_size=16)
+        digest.update(
+            repr(
+                (loc.name, loc.latitude, loc.longitude, loc.category, loc.address, loc.notes)
+            ).encode("utf-8")
+        )
+    return {zone: digest.hexdigest() for zone, digest in digests.items()}
+
+
+class BuildManifest:
+    """Input fingerprints of previously generated outputs in one folder."""
+
+    def __init__(self, output_folder: Path) -> None:
+        self.path = output_folder / MANIFEST_NAME
+        self.outputs: dict[str, dict[str, str]] = {}
+        self.zones: dict[str, dict[str, str]] = {}
+
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.outputs = data.get("outputs", {})
+            self.zones = data.get("zones", {})
+
+    def is_fresh(self, output_file: str | Path, inputs: dict[str, str]) -> bool:
+        """True if ``output_file`` exists and was built from exactly ``inputs``."""
+        output = Path(output_file)
+        return output.exists() and self.outputs.get(output.name) == inputs
+
+    def record(self, output_file: str | Path, inputs: dict[str, str]) -> None:
+        """Remember the inputs ``output_file`` was just built from."""
+        self.outputs[Path(output_file).name] = inputs
+
+    def changed_zones(self, dataset: str, digests: dict[str, str]) -> set[str]:
+        """Zones whose rows differ from the last recorded build of ``dataset``."""
+        previous = self.zones.get(dataset, {})
+        return {
+            zone
+            for zone in previous.keys() | digests.keys()
+            if previous.get(zone) != digests.get(zone)
+        }
+
+    def record_zones(self, dataset: str, digests: dict[str, str]) -> None:
+        """Remember the per-zone row digests of ``dataset``."""
+        self.zones[dataset] = digests
+
+    def save(self) -> None:
+        """Write the manifest next to the outputs."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "outputs": self.outputs, "zones": self.zones}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
@@ -0,0 +1,329 @@
+"""Compact, column-oriented storage for large place catalogues.
+
+A ``LocationStore`` keeps coordinates in float64 arrays, dictionary-encodes the
+low-cardinality ``category`` and ``zone`` columns, and packs the free-text
+columns (and the coordinates as written in the CSV) into UTF-8 string tables.
+Indexing or iterating yields ``LocationView`` objects, which are ``Location``s
+that read their fields from the columns when accessed, so existing exporter
+code keeps working without a full ``Location`` being built for every row.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+import numpy as np
+
+from .models import Location
+
+
+class StringTable(Sequence[str]):
+    """Append-only list of strings stored as one UTF-8 buffer plus offsets."""
+
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self._blob = bytearray()
+        self._offsets = array("q", [0])
+        for value in values:
+            self.append(value)
+
+    @classmethod
+    def from_strings(cls, values: Sequence[str]) -> "StringTable":
+        """Build a table in one go (much faster than appending one by one)."""
+        text = "".join(values)
+        table = cls()
+        table._blob = bytearray(text.encode("utf-8"))
+        # Pure-ASCII text has one byte per character, so no per-string encode is needed
+        sized = values if text.isascii() else [value.encode("utf-8") for value in values]
+        lengths = np.fromiter(map(len, sized), dtype=np.int64, count=len(values))
+        table._offsets = array("q", [0])
+        table._offsets.frombytes(np.cumsum(lengths).tobytes())
+        return table
+
+    def append(self, value: str) -> None:
+        """Add one string to the end of the table."""
+        self._blob += value.encode("utf-8")
+        self._offsets.append(len(self._blob))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("StringTable index out of range")
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def take(self, indices: Iterable[int]) -> "StringTable":
+        """Return a new table with only the given rows."""
+        return StringTable(self[int(i)] for i in indices)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table."""
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
+
+
+class CategoricalColumn:
+    """Dictionary-encoded string column: int32 codes plus a lookup table."""
+
+    __slots__ = ("codes", "_lookup")
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.codes = array("i")
+        self._lookup: dict[str, int] = {}
+        for value in values:
+            self.append(value)
+
+    def append(self, value: str) -> None:
+        """Encode and add one value."""
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self._lookup)
+        self.codes.append(code)
+
+    def finish(self) -> tuple[np.ndarray, list[str]]:
+        """Return the codes as an array and the code-to-value table."""
+        return np.frombuffer(self.codes, dtype=np.int32), list(self._lookup)
+
+
+def _take_text(table: StringTable | None, indices: Iterable[int]) -> StringTable | None:
+    return table.take(indices) if table is not None else None
+
+
+def encode_categorical(values: Iterable[str]) -> tuple[np.ndarray, list[str]]:
+    """Dictionary-encode ``values`` into int32 codes and a lookup table."""
+    return CategoricalColumn(values).finish()
+
+
+class LocationView(Location):
+    """One row of a ``LocationStore``, read from its columns on access.
+
+    Creating a view decodes nothing, so grouping or walking a store costs one
+    small object per row; each field is decoded when it is read. The inherited
+    ``Location`` slots stay empty and the fields cannot be assigned.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "LocationStore", index: int) -> None:
+        self._store = store
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._index]
+
+    @property
+    def latitude(self) -> float:
+        return float(self._store.latitude[self._index])
+
+    @property
+    def longitude(self) -> float:
+        return float(self._store.longitude[self._index])
+
+    @property
+    def category(self) -> str:
+        store = self._store
+        return store.categories[store.category_codes[self._index]]
+
+    @property
+    def address(self) -> str:
+        return self._store.addresses[self._index]
+
+    @property
+    def notes(self) -> str:
+        return self._store.notes[self._index]
+
+    @property
+    def zone(self) -> str:
+        store = self._store
+        return store.zones[store.zone_codes[self._index]]
+
+    @property
+    def latitude_text(self) -> str:
+        text = self._store.latitude_text
+        return text[self._index] if text is not None else ""
+
+    @property
+    def longitude_text(self) -> str:
+        text = self._store.longitude_text
+        return text[self._index] if text is not None else ""
+
+    def to_location(self) -> Location:
+        """A plain ``Location`` holding this row's (decoded) fields."""
+        return Location(
+            name=self.name,
+            latitude=self.latitude,
+            longitude=self.longitude,
+            category=self.category,
+            address=self.address,
+            notes=self.notes,
+            zone=self.zone,
+            latitude_text=self.latitude_text,
+            longitude_text=self.longitude_text,
+        )
+
+
+class LocationStore(Sequence[Location]):
+    """Array-backed collection of locations with ``LocationView`` rows."""
+
+    __slots__ = (
+        "latitude",
+        "longitude",
+        "category_codes",
+        "categories",
+        "zone_codes",
+        "zones",
+        "names",
+        "addresses",
+        "notes",
+        "latitude_text",
+        "longitude_text",
+    )
+
+    def __init__(
+        self,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        category_codes: np.ndarray,
+        categories: list[str],
+        zone_codes: np.ndarray,
+        zones: list[str],
+        names: StringTable,
+        addresses: StringTable,
+        notes: StringTable,
+        latitude_text: StringTable | None = None,
+        longitude_text: StringTable | None = None,
+    ) -> None:
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.categories = categories
+        self.zone_codes = np.asarray(zone_codes, dtype=np.int32)
+        self.zones = zones
+        self.names = names
+        self.addresses = addresses
+        self.notes = notes
+        # Without the CSV text, coordinates are formatted from the floats
+        self.latitude_text = latitude_text
+        self.longitude_text = longitude_text
+
+    @classmethod
+    def from_locations(cls, locations: Iterable[Location]) -> "LocationStore":
+        """Build a store from existing ``Location`` objects."""
+        locations = list(locations)
+        category_codes, categories = encode_categorical(loc.category for loc in locations)
+        zone_codes, zones = encode_categorical(loc.zone for loc in locations)
+        return cls(
+            latitude=np.fromiter((loc.latitude for loc in locations), np.float64, len(locations)),
+            longitude=np.fromiter((loc.longitude for loc in locations), np.float64, len(locations)),
+            category_codes=category_codes,
+            categories=categories,
+            zone_codes=zone_codes,
+            zones=zones,
+            names=StringTable(loc.name for loc in locations),
+            addresses=StringTable(loc.address for loc in locations),
+            notes=StringTable(loc.notes for loc in locations),
+            latitude_text=StringTable(loc.latitude_text for loc in locations),
+            longitude_text=StringTable(loc.longitude_text for loc in locations),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, str]]) -> "LocationStore":
+        """Read CSV rows (as from ``csv.DictReader``) straight into columns."""
+        lats, lons = array("d"), array("d")
+        categories, zones = CategoricalColumn(), CategoricalColumn()
+        names, addresses, notes = StringTable(), StringTable(), StringTable()
+        lat_text, lon_text = StringTable(), StringTable()
+
+        for row in rows:
+            names.append(row.get("Name", "Unknown"))
+            lats.append(float(row.get("Latitude", 0)))
+            lons.append(float(row.get("Longitude", 0)))
+            lat_text.append(row.get("Latitude", ""))
+            lon_text.append(row.get("Longitude", ""))
+            categories.append(row.get("Category", "Other"))
+            addresses.append(row.get("Address", ""))
+            notes.append(row.get("Notes", ""))
+            zones.append(row.get("Zone", ""))
+
+        category_codes, category_table = categories.finish()
+        zone_codes, zone_table = zones.finish()
+        return cls(
+            latitude=np.frombuffer(lats, dtype=np.float64),
+            longitude=np.frombuffer(lons, dtype=np.float64),
+            category_codes=category_codes,
+            categories=category_table,
+            zone_codes=zone_codes,
+            zones=zone_table,
+            names=names,
+            addresses=addresses,
+            notes=notes,
+            latitude_text=lat_text,
+            longitude_text=lon_text,
+        )
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    @overload
+    def __getitem__(self, index: int) -> Location: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "LocationStore": ...
+
+    def __getitem__(self, index: int | slice) -> "Location | LocationStore":
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("LocationStore index out of range")
+        return LocationView(self, index)
+
+    def __iter__(self) -> Iterator[Location]:
+        for i in range(len(self)):
+            yield LocationView(self, i)
+
+    def take(self, indices: Iterable[int]) -> "LocationStore":
+        """Return a new store with only the given rows, in the given order."""
+        idx = np.fromiter(indices, dtype=np.int64)
+        return LocationStore(
+            latitude=self.latitude[idx],
+            longitude=self.longitude[idx],
+            category_codes=self.category_codes[idx],
+            categories=self.categories,
+            zone_codes=self.zone_codes[idx],
+            zones=self.zones,
+            names=self.names.take(idx),
+            addresses=self.addresses.take(idx),
+            notes=self.notes.take(idx),
+            latitude_text=_take_text(self.latitude_text, idx),
+            longitude_text=_take_text(self.longitude_text, idx),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns."""
+        text = (self.latitude_text, self.longitude_text)
+        return sum(table.nbytes for table in text if table is not None) + (
+            self.latitude.nbytes
+            + self.longitude.nbytes
+            + self.category_codes.nbytes
+            + self.zone_codes.nbytes
+            + self.names.nbytes
+            + self.addresses.nbytes
+            + self.notes.nbytes
+        )
@@ -0,0 +1,158 @@
+"""Drop near-duplicate places while a CSV is being loaded.
+
+Merged, crowd-sourced CSVs list the same place several times under slightly
+different names and with coordinates a few metres apart. Each kept place is
+filed under a grid cell about ``distance_m`` across plus the numbers in its name
+(which must match exactly), so a new row is only compared with the places in the
+neighbouring cells that carry the same numbers: its normalized name against
+theirs, and its distance from them. That keeps the cost close to linear in the
+number of rows, and rows stream through without being collected first.
+
+The first occurrence of a place is kept; every dropped row is listed in the
+merge report, by its line in the CSV file.
+"""
+
+import csv
+import math
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import astuple, dataclass, fields
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from .geocoding import normalize_address
+from .loader import LINE
+
+DEFAULT_DISTANCE_M = 50.0
+DEFAULT_NAME_SIMILARITY = 0.85
+
+# Metres per degree of latitude
+_M_PER_DEG = 111_195.0
+
+_NUMBER = re.compile(r"\d+")
+
+
+@dataclass(slots=True)
+class Merge:
+    """One dropped row and the kept row it duplicates, by CSV line (the header is line 1)."""
+
+    kept_line: int
+    kept_name: str
+    dropped_line: int
+    dropped_name: str
+    distance_m: float
+    similarity: float
+
+
+def _distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Equirectangular distance; accurate to well under a metre at dedup ranges."""
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return math.hypot(x, y) * 6_371_008.8
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity in [0, 1] of two already-normalized names.
+
+    Names with different numbers ("Block 123" / "Block 124") are different places.
+    """
+    if a == b:
+        return 1.0
+    if _NUMBER.findall(a) != _NUMBER.findall(b):
+        return 0.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return matcher.ratio()
+
+
+class Deduplicator:
+    """Streaming near-duplicate filter for place rows; collects a merge report."""
+
+    def __init__(
+        self,
+        distance_m: float = DEFAULT_DISTANCE_M,
+        min_similarity: float = DEFAULT_NAME_SIMILARITY,
+    ) -> None:
+        """
+        Args:
+            distance_m: Rows further apart than this are never duplicates.
+            min_similarity: Lowest normalized-name similarity counted as the same place.
+        """
+        self.distance_m = distance_m
+        self.min_similarity = min_similarity
+        self.cell_deg = distance_m / _M_PER_DEG
+        self.merges: list[Merge] = []
+        self.rows_seen = 0
+
+    def filter(self, rows: Iterable[dict[str, str]]) -> Iterator[dict[str, str]]:
+        """Yield the rows that do not duplicate an earlier row, in order.
+
+        Rows whose coordinates do not parse are passed through unchecked. Rows
+        without a ``LINE`` (not read by ``iter_rows``) are numbered as if they were
+        one line each after a header line.
+        """
+        cell_deg = self.cell_deg
+        # (lat cell, lon cell, numbers in the name) -> [(normalized name, lat, lon, line, name)]
+        grid: dict[tuple, list[tuple[str, float, float, int, str]]] = {}
+
+        for row in rows:
+            self.rows_seen += 1
+            try:
+                lat, lon = float(row["Latitude"]), float(row["Longitude"])
+            except (KeyError, TypeError, ValueError):
+                yield row
+                continue
+
+            line = int(row.get(LINE) or self.rows_seen + 1)
+            name = row.get("Name", "")
+            key = normalize_address(name)
+            numbers = tuple(_NUMBER.findall(key))
+            duplicate = self._find(grid, key, numbers, lat, lon)
+            if duplicate is not None:
+                kept, distance, similarity = duplicate
+                self.merges.append(
+                    Merge(kept[3], kept[4], line, name, round(distance, 1), similarity)
+                )
+                continue
+
+            cell = (math.floor(lat / cell_deg), math.floor(lon / cell_deg), numbers)
+            grid.setdefault(cell, []).append((key, lat, lon, line, name))
+            yield row
+
+    def _find(
+        self,
+        grid: dict[tuple, list[tuple[str, float, float, int, str]]],
+        key: str,
+        numbers: tuple[str, ...],
+        lat: float,
+        lon: float,
+    ) -> tuple[tuple[str, float, float, int, str], float, float] | None:
+        """Best-matching kept place near ``(lat, lon)``, with its distance and similarity."""
+        cell_deg = self.cell_deg
+        # A longitude degree shrinks with latitude, so widen the column range to match
+        lon_reach = self.distance_m / (_M_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        row0, row1 = math.floor(lat / cell_deg - 1), math.floor(lat / cell_deg + 1)
+        col0 = math.floor((lon - lon_reach) / cell_deg)
+        col1 = math.floor((lon + lon_reach) / cell_deg)
+
+        best = None
+        for cell_row in range(row0, row1 + 1):
+            for cell_col in range(col0, col1 + 1):
+                for kept in grid.get((cell_row, cell_col, numbers), ()):
+                    distance = _distance_m(lat, lon, kept[1], kept[2])
+                    if distance > self.distance_m:
+                        continue
+                    similarity = name_similarity(key, kept[0])
+                    if similarity >= self.min_similarity and (best is None or similarity > best[2]):
+                        best = (kept, distance, round(similarity, 3))
+        return best
+
+    def summary(self) -> str:
+        """One-line description of what was merged."""
+        return f"{len(self.merges)} near-duplicate(s) merged out of {self.rows_seen} row(s)"
+
+    def write_report(self, path: str | Path) -> None:
+        """Write the merge report as CSV, one line per dropped row."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(field.name for field in fields(Merge))
+            writer.writerows(astuple(merge) for merge in self.merges)
@@ -0,0 +1,203 @@
+"""Multi-resolution place counts for drawing large catalogues at low zoom.
+
+At country-level zoom tens of thousands of pins are just noise. A
+``DensityGrid`` counts the places per category in square cells of a Web
+Mercator grid at every zoom level below the marker threshold, so the page can
+draw one graduated circle per cell instead.
+
+The cells nest like quadkeys: a cell at zoom ``z`` is four cells at ``z + 1``.
+The points are binned once, at the finest level, in one vectorized pass;
+every coarser level is then aggregated from the level above, whose table is
+far smaller than the points. The grid is cached next to the page and only
+recomputed when the coordinates or categories change.
+"""
+
+import hashlib
+import json
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .columnar import LocationStore, encode_categorical
+from .models import Location
+from .styles import style_for
+
+# Bump whenever the aggregation changes, so cached grids are recomputed
+DENSITY_VERSION = "1"
+
+# Individual markers are drawn from this zoom level up, circles below it
+DENSITY_ZOOM = 13
+# Coarsest level computed; lower zooms reuse it
+MIN_DENSITY_ZOOM = 3
+# Cell edge in screen pixels at the cell's own zoom level (a power of two, so cells nest)
+CELL_PX = 64
+
+DENSITY_CACHE_SUFFIX = ".density.json"
+
+# [lat, lon, places, [category index, count, ...] by descending count]
+Cell = list
+
+
+@dataclass(frozen=True)
+class DensityGrid:
+    """Place counts per cell and category for a range of zoom levels."""
+
+    categories: tuple[str, ...]
+    # Zoom level -> cells, in ascending zoom order
+    levels: dict[int, list[Cell]]
+
+    def to_json(self) -> dict:
+        return {
+            "categories": list(self.categories),
+            "levels": {str(z): c for z, c in self.levels.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "DensityGrid":
+        return cls(
+            categories=tuple(data["categories"]),
+            levels={int(zoom): cells for zoom, cells in data["levels"].items()},
+        )
+
+    def category_colors(self) -> list[list[str]]:
+        """``[category, "#rrggbb"]`` per category index."""
+        return [[category, style_for(category).hex_color] for category in self.categories]
+
+
+def _columns(
+    locations: Sequence[Location],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]:
+    """(latitudes, longitudes, category codes, categories) of ``locations``."""
+    if isinstance(locations, LocationStore):
+        return (
+            locations.latitude,
+            locations.longitude,
+            locations.category_codes,
+            locations.categories,
+        )
+    count = len(locations)
+    lats = np.fromiter((loc.latitude for loc in locations), np.float64, count)
+    lons = np.fromiter((loc.longitude for loc in locations), np.float64, count)
+    codes, categories = encode_categorical(loc.category for loc in locations)
+    return lats, lons, codes, categories
+
+
+def _cells_per_axis(zoom: int) -> int:
+    return 2**zoom * 256 // CELL_PX
+
+
+def _aggregate(
+    keys: np.ndarray,
+    codes: np.ndarray,
+    counts: np.ndarray,
+    lat_sums: np.ndarray,
+    lon_sums: np.ndarray,
+) -> tuple[np.ndarray, ...]:
+    """Sum rows that share (cell key, category); returns the summed table."""
+    composite = keys * (int(codes.max()) + 1 if codes.size else 1) + codes
+    unique, first, inverse = np.unique(composite, return_index=True, return_inverse=True)
+    return (
+        keys[first],
+        codes[first],
+        np.bincount(inverse, counts, len(unique)),
+        np.bincount(inverse, lat_sums, len(unique)),
+        np.bincount(inverse, lon_sums, len(unique)),
+    )
+
+
+def _level_cells(
+    keys: np.ndarray,
+    codes: np.ndarray,
+    counts: np.ndarray,
+    lat_sums: np.ndarray,
+    lon_sums: np.ndarray,
+) -> list[Cell]:
+    """One ``Cell`` per distinct key of a (key, category)-summed table."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, counts, len(unique))
+    lats = np.bincount(inverse, lat_sums, len(unique)) / totals
+    lons = np.bincount(inverse, lon_sums, len(unique)) / totals
+
+    # Per cell, its categories by descending count
+    order = np.lexsort((-counts, inverse))
+    per_category: list[list[int]] = [[] for _ in range(len(unique))]
+    for cell, code, count in zip(
+        inverse[order].tolist(), codes[order].tolist(), counts[order].tolist(), strict=True
+    ):
+        per_category[cell] += (code, int(count))
+
+    return [
+        [round(lat, 6), round(lon, 6), int(total), categories]
+        for lat, lon, total, categories in zip(
+            lats.tolist(), lons.tolist(), totals.tolist(), per_category, strict=True
+        )
+    ]
+
+
+def density_grid(locations: Sequence[Location], levels: Sequence[int] | None = None) -> DensityGrid:
+    """Count ``locations`` per cell and category at each zoom in ``levels``.
+
+    ``levels`` defaults to every zoom from ``MIN_DENSITY_ZOOM`` up to (not
+    including) ``DENSITY_ZOOM``.
+    """
+    levels = sorted(levels if levels is not None else range(MIN_DENSITY_ZOOM, DENSITY_ZOOM))
+    lats, lons, codes, categories = _columns(locations)
+    if not levels or not len(lats):
+        return DensityGrid(tuple(categories), {})
+
+    # Web Mercator position in [0, 1) of the world, then cell indices at the finest level
+    finest = levels[-1]
+    cells = _cells_per_axis(finest)
+    x = (lons + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(np.clip(lats, -85.05112878, 85.05112878)))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    ix = np.clip((x * cells).astype(np.int64), 0, cells - 1)
+    iy = np.clip((y * cells).astype(np.int64), 0, cells - 1)
+
+    table = _aggregate((ix << 32) | iy, codes.astype(np.int64), np.ones(len(lats)), lats, lons)
+    grid: dict[int, list[Cell]] = {}
+    zoom = finest
+    for level in reversed(levels):
+        # Halve the cell indices once per zoom level and merge the cells that now coincide
+        shift = zoom - level
+        if shift:
+            keys = table[0]
+            keys = ((keys >> 32) >> shift << 32) | ((keys & 0xFFFFFFFF) >> shift)
+            table = _aggregate(keys, *table[1:])
+            zoom = level
+        grid[level] = _level_cells(*table)
+    return DensityGrid(tuple(categories), dict(sorted(grid.items())))
+
+
+def grid_digest(locations: Sequence[Location], levels: Sequence[int]) -> str:
+    """Key of the grid for ``locations``: coordinates, categories and levels."""
+    lats, lons, codes, categories = _columns(locations)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{DENSITY_VERSION}|{CELL_PX}|{list(levels)}|{categories}".encode())
+    for column in (lats, lons, codes):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()
+
+
+def cached_density_grid(
+    locations: Sequence[Location], cache_file: Path, levels: Sequence[int] | None = None
+) -> DensityGrid:
+    """``density_grid``, read from ``cache_file`` if it was computed for the same places."""
+    levels = sorted(levels if levels is not None else range(MIN_DENSITY_ZOOM, DENSITY_ZOOM))
+    key = grid_digest(locations, levels)
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        if data.get("key") == key:
+            return DensityGrid.from_json(data["grid"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+    grid = density_grid(locations, levels)
+    tmp = cache_file.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"key": key, "grid": grid.to_json()}, separators=(",", ":")), encoding="utf-8"
+    )
+    tmp.replace(cache_file)
+    return grid
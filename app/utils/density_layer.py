@@ -0,0 +1,89 @@
+"""Graduated circles for low zoom levels, individual markers above a threshold.
+
+``DensityLayer`` draws one circle per cell of a ``density.DensityGrid``,
+sized by how many places the cell holds and colored by its most common
+category, for the grid level closest below the map's zoom. From the
+threshold zoom up, the circles are removed and the marker layers put back.
+"""
+
+from folium import MacroElement
+from jinja2 import Template
+
+from .density import DensityGrid
+from .popups import rows_json
+
+
+class DensityLayer(MacroElement):
+    """Switches between density circles and the marker layers as the map zooms."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this.map_name }};
+            var markerLayers = [{{ this.marker_layers|join(", ") }}];
+            var categories = {{ this.categories }};
+            var levels = {{ this.levels }};
+            var threshold = {{ this.threshold }};
+            var circles = L.layerGroup(), renderer = L.canvas(), shown = null;
+
+            function circle(cell, largest) {
+                var parts = [];
+                for (var k = 0; k < cell[3].length; k += 2) {
+                    parts.push(cell[3][k + 1] + " " + categories[cell[3][k]][0]);
+                }
+                return L.circleMarker([cell[0], cell[1]], {
+                    renderer: renderer,
+                    radius: 5 + 20 * Math.sqrt(cell[2] / largest),
+                    color: categories[cell[3][0]][1],
+                    weight: 1,
+                    fillOpacity: 0.55
+                }).bindTooltip(cell[2] + " places: " + parts.join(", "));
+            }
+
+            function showDensity() {
+                var zoom = map.getZoom(), detail = zoom >= threshold, level = null;
+                for (var i = 0; i < markerLayers.length; i++) {
+                    if (detail && !map.hasLayer(markerLayers[i])) map.addLayer(markerLayers[i]);
+                    if (!detail && map.hasLayer(markerLayers[i])) map.removeLayer(markerLayers[i]);
+                }
+                if (!detail && levels.length) {
+                    level = levels[0];
+                    for (var j = 1; j < levels.length && levels[j][0] <= zoom; j++) level = levels[j];
+                }
+                if (level === shown) return;
+                shown = level;
+                circles.clearLayers();
+                if (level === null) {
+                    map.removeLayer(circles);
+                    return;
+                }
+                var cells = level[1], largest = 1;
+                for (var c = 0; c < cells.length; c++) largest = Math.max(largest, cells[c][2]);
+                for (c = 0; c < cells.length; c++) circles.addLayer(circle(cells[c], largest));
+                circles.addTo(map);
+            }
+            map.on('zoomend', showDensity);
+            showDensity();
+        })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(
+        self, map_name: str, marker_layers: list[str], grid: DensityGrid, threshold: int
+    ) -> None:
+        """
+        Args:
+            map_name: JS variable of the folium map.
+            marker_layers: JS variables of the layers holding the markers.
+            grid: Cell counts per zoom level below ``threshold``.
+            threshold: Lowest zoom at which markers are shown instead of circles.
+        """
+        super().__init__()
+        self._name = "DensityLayer"
+        self.map_name = map_name
+        self.marker_layers = marker_layers
+        self.categories = rows_json(grid.category_colors())
+        self.levels = rows_json([[zoom, cells] for zoom, cells in grid.levels.items()])
+        self.threshold = threshold
@@ -0,0 +1,281 @@
+"""Streaming export writers that share one pass over the places.
+
+Each writer turns places into one file format and writes them to disk as they
+arrive, so no document is ever held in memory whole. ``export_locations``
+feeds the same places to several writers at once: the CSV (or a loaded
+dataset) is walked a single time however many formats are written.
+
+    with GeoJsonWriter("places.geojson") as geojson, GpxWriter("trip.gpx") as gpx:
+        export_locations(iter_locations("places.csv"), [geojson, gpx])
+
+Every writer takes an optional ``where`` predicate and only writes the places
+it accepts, e.g. ``category_filter(["Food", "Bar"])`` for a subset.
+"""
+
+import csv
+import html
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Collection, Iterable, Sequence
+from contextlib import ExitStack
+from pathlib import Path
+from types import MappingProxyType
+from typing import ClassVar, TextIO
+
+from . import profiling
+from .kml_exporter import FOOTER, WRITE_BUFFER_SIZE, header, location_placemark, open_kml
+from .models import Location
+from .styles import style_for
+
+# Bump whenever any export format changes, so cached builds are redone
+EXPORT_VERSION = "2"
+
+# Columns of the exported CSV, as in the places CSVs
+FIELDNAMES = ("Name", "Category", "Latitude", "Longitude", "Zone", "Address", "Notes")
+
+Predicate = Callable[[Location], bool]
+
+# json.dumps(..., ensure_ascii=False) would build a new encoder for every feature
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def category_filter(categories: Collection[str]) -> Predicate | None:
+    """Predicate keeping places of ``categories``; None (keep all) if there are none."""
+    wanted = frozenset(categories)
+    if not wanted:
+        return None
+    return lambda loc: loc.category in wanted
+
+
+class Writer(ABC):
+    """Streams places to one output file; use as a context manager.
+
+    Subclasses set ``format`` and ``file_name`` and implement ``write`` (plus
+    ``begin``/``end`` for anything before the first or after the last place).
+    The footer is only written if the ``with`` block finishes without error.
+    """
+
+    format: ClassVar[str]
+    file_name: ClassVar[str]  # formatted with the country name
+
+    def __init__(self, output_file: str, where: Predicate | None = None) -> None:
+        self.output_file = output_file
+        self.where = where
+        self.written = 0
+        self._stack = ExitStack()
+        self.out: TextIO | None = None
+
+    def open(self) -> TextIO:
+        """Buffered text stream for the output file."""
+        return open(  # noqa: SIM115 - closed by __exit__
+            self.output_file, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE
+        )
+
+    def begin(self) -> None:  # noqa: B027 - optional hook
+        """Write whatever comes before the first place."""
+
+    @abstractmethod
+    def write(self, loc: Location) -> None:
+        """Write one place."""
+
+    def end(self) -> None:  # noqa: B027 - optional hook
+        """Write whatever comes after the last place."""
+
+    def add(self, loc: Location) -> None:
+        """Write ``loc`` if the writer's ``where`` accepts it."""
+        if self.where is None or self.where(loc):
+            self.write(loc)
+            self.written += 1
+
+    def __enter__(self) -> "Writer":
+        self.out = self._stack.enter_context(self.open())
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        with self._stack:
+            if exc_type is None:
+                self.end()
+
+
+class KmlWriter(Writer):
+    """KML for Google My Maps, as ``create_kml`` writes it (a KMZ archive with ``kmz``).
+
+    Writes the same pieces as ``kml_exporter.iter_kml``, so both give one document.
+    """
+
+    format = "kml"
+    file_name = "{country}_Trip_Mobile.kml"
+
+    def __init__(
+        self,
+        output_file: str,
+        where: Predicate | None = None,
+        country: str = "Singapore",
+        kmz: bool = False,
+        routes: Iterable[str] = (),
+    ) -> None:
+        super().__init__(output_file, where)
+        self.country = country
+        self.kmz = kmz
+        self.routes = routes
+
+    def open(self) -> TextIO:
+        return self._stack.enter_context(open_kml(self.output_file, self.kmz))
+
+    def begin(self) -> None:
+        self.out.writelines(header(self.country))
+
+    def write(self, loc: Location) -> None:
+        self.out.write("\n" + location_placemark(loc))
+
+    def end(self) -> None:
+        for route in self.routes:
+            self.out.write("\n" + route)
+        self.out.write(FOOTER)
+
+
+class KmzWriter(KmlWriter):
+    """Compressed KML, for phones with little room or slow connections."""
+
+    format = "kmz"
+    file_name = "{country}_Trip_Mobile.kmz"
+
+    def __init__(self, output_file: str, where: Predicate | None = None, **kwargs) -> None:
+        super().__init__(output_file, where, kmz=True, **kwargs)
+
+
+class GeoJsonWriter(Writer):
+    """A GeoJSON FeatureCollection of points, styled with simplestyle properties."""
+
+    format = "geojson"
+    file_name = "{country}_places.geojson"
+
+    def begin(self) -> None:
+        self.out.write('{"type": "FeatureCollection", "features": [')
+
+    def write(self, loc: Location) -> None:
+        feature = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [loc.longitude, loc.latitude]},
+            "properties": {
+                "name": loc.name,
+                "category": loc.category,
+                "address": loc.address,
+                "notes": loc.notes,
+                "zone": loc.zone,
+                "marker-color": style_for(loc.category).hex_color,
+            },
+        }
+        separator = ",\n" if self.written else "\n"
+        self.out.write(separator + _encode_json(feature))
+
+    def end(self) -> None:
+        self.out.write("\n]}\n")
+
+
+class GpxWriter(Writer):
+    """GPX 1.1 waypoints for offline GPS and hiking apps."""
+
+    format = "gpx"
+    file_name = "{country}_Trip.gpx"
+
+    def __init__(
+        self, output_file: str, where: Predicate | None = None, country: str = "Singapore"
+    ) -> None:
+        super().__init__(output_file, where)
+        self.country = country
+
+    def begin(self) -> None:
+        self.out.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="interactive-map-planner" '
+            'xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f"<metadata><name>{html.escape(self.country)} Trip Plan</name></metadata>\n"
+        )
+
+    def write(self, loc: Location) -> None:
+        desc = " - ".join(text for text in (loc.address, loc.notes) if text)
+        self.out.write(
+            f'<wpt lat="{loc.latitude}" lon="{loc.longitude}">'
+            f"<name>{html.escape(loc.name)}</name>"
+            f"<desc>{html.escape(desc)}</desc>"
+            f"<type>{html.escape(loc.category)}</type></wpt>\n"
+        )
+
+    def end(self) -> None:
+        self.out.write("</gpx>\n")
+
+
+class CsvWriter(Writer):
+    """The places again as a places CSV, e.g. a filtered subset to share."""
+
+    format = "csv"
+    file_name = "{country}_places_export.csv"
+
+    def begin(self) -> None:
+        self._rows = csv.writer(self.out)
+        self._rows.writerow(FIELDNAMES)
+
+    def write(self, loc: Location) -> None:
+        self._rows.writerow(
+            (loc.name, loc.category, loc.latitude, loc.longitude, loc.zone, loc.address, loc.notes)
+        )
+
+
+# Format name -> writer class, for the formats ``--export`` offers
+WRITERS: MappingProxyType[str, type[Writer]] = MappingProxyType(
+    {cls.format: cls for cls in (KmzWriter, GeoJsonWriter, GpxWriter, CsvWriter)}
+)
+
+
+def export_path(fmt: str, country: str, output_folder: Path) -> str:
+    """Output file of format ``fmt`` for ``country``."""
+    return str(output_folder / WRITERS[fmt].file_name.format(country=country))
+
+
+def make_writer(
+    fmt: str,
+    output_file: str,
+    country: str = "Singapore",
+    where: Predicate | None = None,
+    routes: Iterable[str] = (),
+) -> Writer:
+    """Writer of format ``fmt``; ``routes`` are added to KML-based formats only."""
+    cls = WRITERS[fmt]
+    if issubclass(cls, KmlWriter):
+        return cls(output_file, where, country=country, routes=routes)
+    if cls is GpxWriter:
+        return cls(output_file, where, country=country)
+    return cls(output_file, where)
+
+
+@profiling.staged("export")
+def export_locations(locations: Iterable[Location], writers: Sequence[Writer]) -> int:
+    """Feed every place to each of the (open) ``writers`` in one pass; returns the count."""
+    adds = [writer.add for writer in writers]
+    count = 0
+    for loc in locations:
+        for add in adds:
+            add(loc)
+        count += 1
+    profiling.count("places_exported", count)
+    return count
+
+
+def write_exports(
+    locations: Iterable[Location],
+    outputs: dict[str, str],
+    country: str = "Singapore",
+    where: Predicate | None = None,
+    routes: Iterable[str] = (),
+) -> None:
+    """Write each ``{format: output file}`` of ``outputs`` from one pass over ``locations``."""
+    with ExitStack() as stack:
+        writers = [
+            stack.enter_context(make_writer(fmt, output_file, country, where, routes))
+            for fmt, output_file in outputs.items()
+        ]
+        export_locations(locations, writers)
+    for writer in writers:
+        print(f"✅ {writer.format.upper()} export: {writer.output_file} ({writer.written} places)")
@@ -0,0 +1,424 @@
+"""Fill in missing coordinates from a local gazetteer, a cache, or a remote geocoder.
+
+Lookups go, in order, through:
+
+1. ``GeocodeCache`` - a persistent SQLite table keyed by normalized address,
+   holding earlier answers (including "not found"). A remembered miss only
+   skips the remote backend; the gazetteer is still asked.
+2. ``Gazetteer`` - an on-disk SQLite/FTS5 index, typically built once from an
+   OpenStreetMap extract with ``python -m app.utils.geocoding build``.
+3. A pluggable ``GeocoderBackend`` (``NominatimBackend`` by default), called
+   only on a miss and throttled by a ``RateLimiter``.
+
+``StaticBackend`` answers from a dict, so the whole stage runs offline in tests.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Protocol
+
+Coordinates = tuple[float, float]
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "interactive-map-planner/0.1 (https://github.com/sahilmtayade/interactive-map-planner)"
+
+# Rows with missing coordinates resolved per geocoder round trip
+DEFAULT_BATCH_SIZE = 100
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_address(text: str) -> str:
+    """Case-fold, strip punctuation and collapse whitespace, for use as a lookup key."""
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+class GeocoderBackend(Protocol):
+    """Anything that can turn a free-text query into coordinates."""
+
+    def geocode(self, query: str) -> Coordinates | None: ...
+
+
+class StaticBackend:
+    """Backend answering from a fixed mapping; for tests and offline runs."""
+
+    def __init__(self, answers: dict[str, Coordinates]) -> None:
+        self.answers = {normalize_address(query): coords for query, coords in answers.items()}
+        self.calls: list[str] = []
+
+    def geocode(self, query: str) -> Coordinates | None:
+        self.calls.append(query)
+        return self.answers.get(normalize_address(query))
+
+
+class NominatimBackend:
+    """OpenStreetMap Nominatim search API (max. one request per second)."""
+
+    def __init__(
+        self,
+        url: str = NOMINATIM_URL,
+        country_codes: str | None = None,
+        timeout: float = 10.0,
+        user_agent: str = USER_AGENT,
+    ) -> None:
+        self.url = url
+        self.country_codes = country_codes
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+    def geocode(self, query: str) -> Coordinates | None:
+        # Deferred: http.client and ssl are only needed once we go online
+        import urllib.parse
+        import urllib.request
+
+        params = {"q": query, "format": "jsonv2", "limit": "1"}
+        if self.country_codes:
+            params["countrycodes"] = self.country_codes
+        request = urllib.request.Request(
+            f"{self.url}?{urllib.parse.urlencode(params)}",
+            headers={"User-Agent": self.user_agent},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            results = json.load(response)
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+class RateLimiter:
+    """Blocks so that consecutive calls are at least ``min_interval`` seconds apart."""
+
+    def __init__(
+        self,
+        min_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.min_interval = min_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._last: float | None = None
+
+    def wait(self) -> None:
+        """Sleep until the next call is allowed, then claim the slot."""
+        if self._last is not None:
+            remaining = self._last + self.min_interval - self.clock()
+            if remaining > 0:
+                self.sleep(remaining)
+        self._last = self.clock()
+
+
+class _SQLiteStore:
+    """Lazily opened SQLite connection that survives pickling into worker processes."""
+
+    _schema = ""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.executescript(self._schema)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __getstate__(self) -> dict[str, object]:
+        return {"path": self.path, "_conn": None}
+
+
+class GeocodeCache(_SQLiteStore):
+    """Persistent answers keyed by normalized address; ``None`` marks a known miss."""
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            key TEXT PRIMARY KEY,
+            lat REAL,
+            lon REAL,
+            source TEXT NOT NULL
+        );
+    """
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Coordinates | None]:
+        """Return cached answers for whichever of ``keys`` are known."""
+        found: dict[str, Coordinates | None] = {}
+        keys = list(keys)
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, lat, lon in self.conn.execute(
+                f"SELECT key, lat, lon FROM geocode_cache WHERE key IN ({placeholders})", chunk
+            ):
+                found[key] = None if lat is None else (lat, lon)
+        return found
+
+    def put_many(self, answers: dict[str, Coordinates | None], source: str) -> None:
+        """Store answers (including misses) from ``source``."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO geocode_cache (key, lat, lon, source) VALUES (?, ?, ?, ?)",
+                [
+                    (key, *(coords if coords else (None, None)), source)
+                    for key, coords in answers.items()
+                ],
+            )
+
+
+class Gazetteer(_SQLiteStore):
+    """Local place index: exact normalized-address lookups plus FTS5 token search."""
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS gazetteer_exact (
+            key TEXT PRIMARY KEY,
+            lat REAL NOT NULL,
+            lon REAL NOT NULL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS gazetteer_fts USING fts5(
+            text, lat UNINDEXED, lon UNINDEXED
+        );
+    """
+
+    def add(self, entries: Iterable[tuple[str, float, float]]) -> int:
+        """Index ``(text, lat, lon)`` entries; returns how many were added."""
+        count = 0
+        with self.conn:
+            for text, lat, lon in entries:
+                key = normalize_address(text)
+                if not key:
+                    continue
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO gazetteer_exact (key, lat, lon) VALUES (?, ?, ?)",
+                    (key, lat, lon),
+                )
+                self.conn.execute(
+                    "INSERT INTO gazetteer_fts (text, lat, lon) VALUES (?, ?, ?)",
+                    (key, lat, lon),
+                )
+                count += 1
+        return count
+
+    def import_csv(self, csv_file: str) -> int:
+        """Index an extract with ``name``, ``lat``, ``lon`` and optional ``address`` columns.
+
+        Each row is indexed under its name, its address, and "name, address",
+        matching how ``fill_missing_coordinates`` builds queries.
+        """
+
+        def entries() -> Iterator[tuple[str, float, float]]:
+            with open(csv_file, encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    lat, lon = float(row["lat"]), float(row["lon"])
+                    name, address = row.get("name", ""), row.get("address", "")
+                    for text in {name, address, f"{name}, {address}"}:
+                        if text.strip(" ,"):
+                            yield text, lat, lon
+
+        return self.add(entries())
+
+    def lookup(self, key: str) -> Coordinates | None:
+        """Find a normalized address: exact match first, then best full-token match."""
+        row = self.conn.execute(
+            "SELECT lat, lon FROM gazetteer_exact WHERE key = ?", (key,)
+        ).fetchone()
+        if row:
+            return row[0], row[1]
+
+        tokens = key.split()
+        if not tokens:
+            return None
+        query = " ".join(f'"{token}"' for token in tokens)
+        row = self.conn.execute(
+            "SELECT lat, lon FROM gazetteer_fts WHERE gazetteer_fts MATCH ? ORDER BY rank LIMIT 1",
+            (query,),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+
+class Geocoder:
+    """Cache -> local gazetteer -> rate-limited remote backend."""
+
+    def __init__(
+        self,
+        cache: GeocodeCache | None = None,
+        gazetteer: Gazetteer | None = None,
+        backend: GeocoderBackend | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.backend = backend
+        self.rate_limiter = rate_limiter or RateLimiter(1.0)
+
+    def geocode_many(
+        self, queries: Iterable[str], remote: bool = True
+    ) -> dict[str, Coordinates | None]:
+        """Resolve queries in one batch; the result is keyed by the original query.
+
+        With ``remote=False`` only the cache and the local gazetteer are consulted.
+        """
+        keys = {query: normalize_address(query) for query in queries}
+        pending = {key for key in keys.values() if key}
+        answers: dict[str, Coordinates | None] = {}
+        known_misses: set[str] = set()
+
+        if self.cache and pending:
+            cached = self.cache.get_many(pending)
+            answers.update((key, coords) for key, coords in cached.items() if coords)
+            # A remembered miss is still worth a local lookup (the gazetteer may be newer),
+            # but not another remote request
+            known_misses = {key for key, coords in cached.items() if coords is None}
+            pending -= answers.keys()
+
+        if self.gazetteer and pending:
+            local = {key: self.gazetteer.lookup(key) for key in sorted(pending)}
+            local = {key: coords for key, coords in local.items() if coords}
+            answers.update(local)
+            pending -= local.keys()
+            if self.cache and local:
+                self.cache.put_many(local, "gazetteer")
+
+        pending -= known_misses
+        if remote and self.backend and pending:
+            remote_answers: dict[str, Coordinates | None] = {}
+            for key in sorted(pending):
+                self.rate_limiter.wait()
+                try:
+                    remote_answers[key] = self.backend.geocode(key)
+                except (OSError, ValueError, KeyError) as exc:
+                    # Transient or malformed answer: leave it uncached and retry next build
+                    print(f"⚠️  Geocoding '{key}' failed: {exc}")
+            answers.update(remote_answers)
+            if self.cache:
+                self.cache.put_many(remote_answers, type(self.backend).__name__)
+
+        return {query: answers.get(key) for query, key in keys.items()}
+
+    def geocode(self, query: str) -> Coordinates | None:
+        """Resolve a single query."""
+        return self.geocode_many([query])[query]
+
+
+def _has_coordinates(row: dict[str, str]) -> bool:
+    return bool((row.get("Latitude") or "").strip() and (row.get("Longitude") or "").strip())
+
+
+def _queries(row: dict[str, str]) -> list[str]:
+    """Queries to try for a row, most specific first."""
+    name, address = (row.get("Name") or "").strip(), (row.get("Address") or "").strip()
+    candidates = [f"{name}, {address}" if name and address else "", address, name]
+    return [query for query in candidates if query]
+
+
+def fill_missing_coordinates(
+    rows: Iterable[dict[str, str]],
+    geocoder: Geocoder | None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    drop: bool = True,
+) -> Iterator[dict[str, str]]:
+    """Yield rows in order, with blank Latitude/Longitude filled in where possible.
+
+    Rows are held back from the first one needing a lookup until ``batch_size``
+    rows are waiting, then resolved together, so at most ``batch_size`` rows are
+    in memory; without a geocoder nothing is held back at all. Rows that still
+    have no coordinates are dropped with a warning, or passed on as they are
+    with ``drop=False``.
+    """
+    buffered: list[dict[str, str]] = []
+    dropped: list[str] = []
+
+    def flush() -> Iterator[dict[str, str]]:
+        need = [row for row in buffered if not _has_coordinates(row)]
+        if need and geocoder:
+            # Exhaust local sources for every query shape before going remote
+            for remote in (False, True):
+                for tier in range(3):
+                    todo = [
+                        row
+                        for row in need
+                        if not _has_coordinates(row) and len(_queries(row)) > tier
+                    ]
+                    if not todo:
+                        continue
+                    answers = geocoder.geocode_many(
+                        {_queries(row)[tier] for row in todo}, remote=remote
+                    )
+                    for row in todo:
+                        coords = answers.get(_queries(row)[tier])
+                        if coords:
+                            row["Latitude"], row["Longitude"] = str(coords[0]), str(coords[1])
+        for row in buffered:
+            if _has_coordinates(row) or not drop:
+                yield row
+            else:
+                dropped.append(row.get("Name") or "?")
+        buffered.clear()
+
+    for row in rows:
+        if (geocoder is None or _has_coordinates(row)) and not buffered:
+            if _has_coordinates(row) or not drop:
+                yield row
+            else:
+                dropped.append(row.get("Name") or "?")
+            continue
+        buffered.append(row)
+        if len(buffered) >= batch_size:
+            yield from flush()
+    yield from flush()
+
+    if dropped:
+        shown = ", ".join(dropped[:5]) + (" ..." if len(dropped) > 5 else "")
+        print(f"⚠️  Skipped {len(dropped)} place(s) without coordinates: {shown}")
+
+
+def geocode_csv(csv_file: str, geocoder: Geocoder, output_file: str | Path) -> None:
+    """Copy a places CSV to ``output_file`` with missing coordinates filled in.
+
+    Rows that cannot be placed are copied unchanged, so whoever reads the copy
+    skips (or reports) them as it would have the original.
+    """
+    with (
+        open(csv_file, encoding="utf-8", newline="") as src,
+        open(output_file, "w", encoding="utf-8", newline="") as dst,
+    ):
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, reader.fieldnames or [], extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(fill_missing_coordinates(reader, geocoder, drop=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the local geocoding gazetteer.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="index an extract CSV (name, address, lat, lon)")
+    build.add_argument("extract_csv")
+    build.add_argument("gazetteer", help="SQLite file to create or extend")
+    lookup = sub.add_parser("lookup", help="look an address up in a gazetteer")
+    lookup.add_argument("gazetteer")
+    lookup.add_argument("query")
+    args = parser.parse_args()
+
+    gazetteer = Gazetteer(args.gazetteer)
+    if args.command == "build":
+        print(f"Indexed {gazetteer.import_csv(args.extract_csv):,} entries into {args.gazetteer}")
+    else:
+        print(gazetteer.lookup(normalize_address(args.query)))
+    gazetteer.close()
+
+
+if __name__ == "__main__":
+    main()
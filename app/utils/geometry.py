@@ -0,0 +1,327 @@
+"""Zone outlines, centers and zoom levels derived from the places in each zone.
+
+Only some zones have a hand-drawn ``Zone.polygon``, and every ``Zone.center``
+and ``Zone.zoom`` is typed in by hand. ``zone_geometries`` works them out from
+the places a build put in each zone instead:
+
+* the outline is the convex hull of the places, padded by ``HULL_PADDING_M``
+  so pins do not sit on the edge (a single place becomes a small octagon);
+* the outline is simplified with Douglas-Peucker once per zoom level in
+  ``ZOOM_LEVELS``, to about one screen pixel at that zoom;
+* the center and zoom frame the padded outline in a ``FIT_VIEW_PX`` viewport.
+
+Results are cached per zone in a JSON file keyed by a digest of the zone's
+coordinates, so unchanged zones are not recomputed on the next build.
+"""
+
+import hashlib
+import json
+import math
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+
+from .models import Location, Zone
+from .zoning import points_in_polygon
+
+GEOMETRY_CACHE_NAME = ".zone_geometry.json"
+
+# Bump whenever the derived geometry changes, so cached entries are recomputed
+GEOMETRY_VERSION = "1"
+
+# Margin around a zone's outermost places
+HULL_PADDING_M = 150.0
+
+# Zoom levels an outline is simplified for, and the tolerance in screen pixels
+ZOOM_LEVELS = (6, 8, 10, 12, 14, 16, 18)
+SIMPLIFY_PX = 1.0
+
+# Map area a zone's view should fit in (the page minus the sidebar), and the
+# closest a zone's view zooms in
+FIT_VIEW_PX = (800, 600)
+MAX_FIT_ZOOM = 17
+
+_METERS_PER_DEGREE = 111_320.0
+_OCTAGON = np.array(
+    [(math.sin(a), math.cos(a)) for a in np.linspace(0, 2 * math.pi, 8, endpoint=False)]
+)
+
+Ring = tuple[tuple[float, float], ...]
+
+
+@dataclass(frozen=True)
+class ZoneGeometry:
+    """Outline and view of one zone, as derived from its places."""
+
+    center: tuple[float, float]
+    zoom: int
+    # (lowest zoom the outline is drawn at, [lat, lon] vertices), by ascending zoom
+    outlines: tuple[tuple[int, Ring], ...]
+
+    @property
+    def polygon(self) -> Ring:
+        """The most detailed outline."""
+        return self.outlines[-1][1]
+
+    def to_json(self) -> dict:
+        return {
+            "center": list(self.center),
+            "zoom": self.zoom,
+            "outlines": [[zoom, [list(p) for p in ring]] for zoom, ring in self.outlines],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ZoneGeometry":
+        return cls(
+            center=tuple(data["center"]),
+            zoom=data["zoom"],
+            outlines=tuple(
+                (zoom, tuple(tuple(p) for p in ring)) for zoom, ring in data["outlines"]
+            ),
+        )
+
+
+def _cross(o: tuple[float, float], a: tuple[float, float], b: tuple[float, float]) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """Convex hull of ``(n, 2)`` points, counter-clockwise, without repeating the first.
+
+    Points strictly inside the octagon of extreme points are discarded with one
+    vectorized test first (Akl-Toussaint), so the monotone chain only walks the
+    few that could be on the hull. Fewer than three distinct points are
+    returned as they are.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) > 64:
+        sums, diffs = points.sum(axis=1), points[:, 0] - points[:, 1]
+        extremes = [
+            points[:, 0].argmin(),
+            diffs.argmin(),
+            points[:, 1].argmax(),
+            sums.argmax(),
+            points[:, 0].argmax(),
+            diffs.argmax(),
+            points[:, 1].argmin(),
+            sums.argmin(),
+        ]
+        octagon = points[list(dict.fromkeys(extremes))]
+        if len(octagon) >= 3:
+            inside = points_in_polygon(points[:, 0], points[:, 1], octagon)
+            points = np.concatenate([points[~inside], octagon])
+
+    unique = [tuple(p) for p in np.unique(points, axis=0).tolist()]
+    if len(unique) < 3:
+        return np.array(unique, dtype=np.float64).reshape(-1, 2)
+
+    def chain(ordered: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        hull: list[tuple[float, float]] = []
+        for p in ordered:
+            while len(hull) >= 2 and _cross(hull[-2], hull[-1], p) <= 0:
+                hull.pop()
+            hull.append(p)
+        return hull
+
+    lower, upper = chain(unique), chain(unique[::-1])
+    return np.array(lower[:-1] + upper[:-1], dtype=np.float64)
+
+
+def padded_hull(
+    lats: np.ndarray, lons: np.ndarray, padding_m: float = HULL_PADDING_M
+) -> np.ndarray:
+    """``[lat, lon]`` outline around the points, ``padding_m`` out from the outermost."""
+    hull = convex_hull(np.column_stack([lats, lons]))
+    dlat = padding_m / _METERS_PER_DEGREE
+    dlon = dlat / max(math.cos(math.radians(float(np.mean(lats)))), 0.01)
+    # Every hull vertex grows into an octagon; the hull of those is the padded outline
+    grown = (hull[:, None, :] + _OCTAGON[None, :, :] * (dlat, dlon)).reshape(-1, 2)
+    return convex_hull(grown)
+
+
+def _douglas_peucker(xy: np.ndarray, tolerance: float) -> list[int]:
+    """Indices of the vertices of open polyline ``xy`` that simplification keeps."""
+    keep = [0, len(xy) - 1]
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = xy[first], xy[last]
+        inner = xy[first + 1 : last]
+        dx, dy = end - start
+        length = math.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(*(inner - start).T)
+        else:
+            distances = np.abs(dx * (inner[:, 1] - start[1]) - dy * (inner[:, 0] - start[0]))
+            distances /= length
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep.append(split)
+            stack.append((first, split))
+            stack.append((split, last))
+    return sorted(keep)
+
+
+def simplify(ring: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """Douglas-Peucker simplification of a closed ``[lat, lon]`` ring.
+
+    Distances are measured in metres on a local equirectangular projection.
+    The ring is split at the vertex farthest from the first, and at least
+    three vertices are always kept.
+    """
+    if len(ring) <= 3:
+        return ring
+    lat0 = math.radians(float(ring[:, 0].mean()))
+    xy = np.column_stack([ring[:, 1] * math.cos(lat0), ring[:, 0]]) * _METERS_PER_DEGREE
+    far = int(np.hypot(*(xy - xy[0]).T).argmax())
+    closed = np.concatenate([xy, xy[:1]])
+    first = _douglas_peucker(closed[: far + 1], tolerance_m)
+    second = [far + i for i in _douglas_peucker(closed[far:], tolerance_m)]
+    kept = first + second[1:-1]
+    if len(kept) < 3:
+        # Keep the vertex farthest from the 0 -> far chord as well
+        others = [i for i in range(len(ring)) if i not in (0, far)]
+        dx, dy = xy[far] - xy[0]
+        distances = np.abs(dx * (xy[others, 1] - xy[0, 1]) - dy * (xy[others, 0] - xy[0, 0]))
+        kept = sorted([0, far, others[int(distances.argmax())]])
+    return ring[kept]
+
+
+def meters_per_pixel(zoom: int, lat: float) -> float:
+    """Ground distance of one web-map pixel at ``zoom`` and latitude ``lat``."""
+    return 360 / 256 * _METERS_PER_DEGREE * math.cos(math.radians(lat)) / 2**zoom
+
+
+def _mercator_y(lat: float) -> float:
+    return math.degrees(math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)))
+
+
+def fit_view(
+    ring: np.ndarray, view_px: tuple[int, int] = FIT_VIEW_PX
+) -> tuple[tuple[float, float], int]:
+    """Center and the highest zoom (up to ``MAX_FIT_ZOOM``) that shows all of ``ring``."""
+    south, west = ring.min(axis=0)
+    north, east = ring.max(axis=0)
+    center = (float(south + north) / 2, float(west + east) / 2)
+    width, height = view_px
+    spans = (
+        (east - west) / width,
+        (_mercator_y(north) - _mercator_y(south)) / height,
+    )
+    degrees_per_px = max(spans)
+    if degrees_per_px <= 0:
+        return center, MAX_FIT_ZOOM
+    zoom = math.floor(math.log2(360 / 256 / degrees_per_px))
+    return center, max(0, min(MAX_FIT_ZOOM, zoom))
+
+
+def derive_geometry(lats: np.ndarray, lons: np.ndarray) -> ZoneGeometry:
+    """Outline, center and zoom of a zone with places at ``lats``/``lons``."""
+    ring = padded_hull(lats, lons)
+    center, zoom = fit_view(ring)
+    outlines: list[tuple[int, Ring]] = []
+    for level in ZOOM_LEVELS:
+        tolerance = SIMPLIFY_PX * meters_per_pixel(level, center[0])
+        outline = tuple(
+            (round(lat, 6), round(lon, 6)) for lat, lon in simplify(ring, tolerance).tolist()
+        )
+        if not outlines or outline != outlines[-1][1]:
+            outlines.append((level, outline))
+    # The coarsest outline is also the one for every zoom below it
+    outlines[0] = (0, outlines[0][1])
+    return ZoneGeometry(
+        center=(round(center[0], 6), round(center[1], 6)), zoom=zoom, outlines=tuple(outlines)
+    )
+
+
+def coordinates_digest(lats: np.ndarray, lons: np.ndarray) -> str:
+    """Digest of a zone's coordinates, the cache key of its geometry."""
+    digest = hashlib.blake2b(GEOMETRY_VERSION.encode(), digest_size=16)
+    digest.update(np.ascontiguousarray(lats, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(lons, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class GeometryCache:
+    """Derived zone geometry from earlier builds, kept in one JSON file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("version") == GEOMETRY_VERSION:
+            self.entries = data.get("zones", {})
+
+    def get(self, key: str, digest: str) -> ZoneGeometry | None:
+        entry = self.entries.get(key)
+        if entry is None or entry.get("digest") != digest:
+            return None
+        return ZoneGeometry.from_json(entry)
+
+    def put(self, key: str, digest: str, geometry: ZoneGeometry) -> None:
+        self.entries[key] = {"digest": digest, **geometry.to_json()}
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache if anything was added."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": GEOMETRY_VERSION, "zones": self.entries}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+def zone_geometries(
+    country: str,
+    zones: Sequence[Zone],
+    zone_locations: Mapping[str, Sequence[Location]],
+    cache: GeometryCache | None = None,
+) -> dict[str, ZoneGeometry]:
+    """Geometry of every zone of ``country`` that has places, by zone ID."""
+    geometries = {}
+    for zone in zones:
+        locations = zone_locations.get(zone.id, ())
+        if not locations:
+            continue
+        lats = np.fromiter((loc.latitude for loc in locations), np.float64, len(locations))
+        lons = np.fromiter((loc.longitude for loc in locations), np.float64, len(locations))
+        key, digest = f"{country}/{zone.id}", coordinates_digest(lats, lons)
+        geometry = cache.get(key, digest) if cache else None
+        if geometry is None:
+            geometry = derive_geometry(lats, lons)
+            if cache:
+                cache.put(key, digest, geometry)
+        geometries[zone.id] = geometry
+    if cache:
+        cache.save()
+    return geometries
+
+
+def derived_zones(zones: Sequence[Zone], geometries: Mapping[str, ZoneGeometry]) -> list[Zone]:
+    """``zones`` with their center and zoom taken from ``geometries``.
+
+    Zones without a hand-drawn polygon also get the derived outline, except
+    the last (catch-all) zone, whose places are scattered by design.
+    """
+    result = []
+    for i, zone in enumerate(zones):
+        geometry = geometries.get(zone.id)
+        if geometry is not None:
+            polygon = zone.polygon
+            if not polygon and i < len(zones) - 1:
+                polygon = geometry.polygon
+            zone = replace(zone, center=geometry.center, zoom=geometry.zoom, polygon=polygon)
+        result.append(zone)
+    return result
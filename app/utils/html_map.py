@@ -1,322 +1,279 @@
-import csv
-from dataclasses import dataclass, field
-from typing import Any
-
-import folium
-from folium import MacroElement
-from jinja2 import Template
-
-
-@dataclass
-class Location:
-    """Represents a single location/place."""
-
-    name: str
-    latitude: float
-    longitude: float
-    category: str
-    address: str = ""
-    notes: str = ""
-    zone: str = ""
-
-    @classmethod
-    def from_csv_row(cls, row: dict[str, str]) -> "Location":
-        """Create a Location from a CSV row."""
-        return cls(
-            name=row.get("Name", "Unknown"),
-            latitude=float(row.get("Latitude", 0)),
-            longitude=float(row.get("Longitude", 0)),
-            category=row.get("Category", "Other"),
-            address=row.get("Address", ""),
-            notes=row.get("Notes", ""),
-            zone=row.get("Zone", ""),
-        )
-
-
-@dataclass
-class Zone:
-    """Represents a geographic zone with locations."""
-
-    id: str
-    name: str
-    color: str
-    center: list[float]
-    zoom: int
-    description: str
-    polygon: list[list[float]] = field(default_factory=list)
-    locations: list[Location] = field(default_factory=list)
-
-
-@dataclass
-class CountryConfig:
-    """Configuration for a country's map."""
-
-    center: list[float]
-    zoom: int
-    zones: list[Zone]
-
-
-COUNTRY_CONFIGS: dict[str, CountryConfig] = {
-    "Singapore": CountryConfig(
-        center=[1.31, 103.84],
-        zoom=12,
-        zones=[
-            Zone(
-                id="chinatown",
-                name="Chinatown & CBD",
-                color="#e74c3c",
-                center=[1.2820, 103.8440],
-                zoom=16,
-                description="Heritage shophouses, temples, and Michelin food.",
-                polygon=[
-                    [1.2885, 103.8430],
-                    [1.2850, 103.8490],
-                    [1.2780, 103.8470],
-                    [1.2790, 103.8400],
-                ],
-            ),
-            Zone(
-                id="kampong",
-                name="Kampong Glam & Bugis",
-                color="#27ae60",
-                center=[1.3010, 103.8580],
-                zoom=16,
-                description="Malay heritage, gin bars, and trendy lanes.",
-                polygon=[
-                    [1.3040, 103.8560],
-                    [1.3030, 103.8620],
-                    [1.2990, 103.8600],
-                    [1.3000, 103.8550],
-                ],
-            ),
-            Zone(
-                id="civic",
-                name="Civic District & Marina Bay",
-                color="#2980b9",
-                center=[1.2890, 103.8550],
-                zoom=15,
-                description="Museums, Skylines, and Supertrees.",
-                polygon=[
-                    [1.2980, 103.8480],
-                    [1.2920, 103.8660],
-                    [1.2780, 103.8660],
-                    [1.2880, 103.8460],
-                ],
-            ),
-            Zone(
-                id="orchard",
-                name="Orchard & Tanglin",
-                color="#8e44ad",
-                center=[1.3080, 103.8250],
-                zoom=15,
-                description="Shopping belt and lush gardens.",
-                polygon=[
-                    [1.3160, 103.8140],
-                    [1.3050, 103.8400],
-                    [1.2990, 103.8350],
-                    [1.3100, 103.8100],
-                ],
-            ),
-            Zone(
-                id="east",
-                name="Katong & East Coast",
-                color="#d35400",
-                center=[1.3080, 103.9000],
-                zoom=15,
-                description="Peranakan culture and laksa.",
-                polygon=[
-                    [1.3150, 103.9000],
-                    [1.3140, 103.9080],
-                    [1.3000, 103.9060],
-                    [1.3000, 103.8950],
-                ],
-            ),
-            Zone(
-                id="outliers",
-                name="Worth the Travel",
-                color="#7f8c8d",
-                center=[1.3500, 103.8000],
-                zoom=11,
-                description="Unique experiences further afield.",
-            ),
-        ],
-    ),
-    "Japan": CountryConfig(
-        center=[35.68, 139.65],
-        zoom=10,
-        zones=[
-            Zone(
-                id="tokyo",
-                name="Tokyo",
-                color="#e74c3c",
-                center=[35.68, 139.65],
-                zoom=12,
-                description="Capital city and urban exploration",
-            ),
-            Zone(
-                id="osaka",
-                name="Osaka",
-                color="#27ae60",
-                center=[34.67, 135.50],
-                zoom=12,
-                description="Street food and nightlife",
-            ),
-            Zone(
-                id="kyoto",
-                name="Kyoto",
-                color="#2980b9",
-                center=[35.01, 135.78],
-                zoom=12,
-                description="Temples, gardens, and tradition",
-            ),
-            Zone(
-                id="other",
-                name="Other Regions",
-                color="#8e44ad",
-                center=[35.5, 137.5],
-                zoom=10,
-                description="Day trips and regional explores",
-            ),
-        ],
-    ),
-    "Thailand": CountryConfig(
-        center=[13.73, 100.52],
-        zoom=10,
-        zones=[
-            Zone(
-                id="bangkok",
-                name="Bangkok",
-                color="#e74c3c",
-                center=[13.73, 100.52],
-                zoom=12,
-                description="Thailand's vibrant capital",
-            ),
-            Zone(
-                id="north",
-                name="Northern Thailand",
-                color="#27ae60",
-                center=[18.78, 98.98],
-                zoom=10,
-                description="Mountains and temples",
-            ),
-            Zone(
-                id="south",
-                name="Southern Beaches",
-                color="#2980b9",
-                center=[8.65, 100.14],
-                zoom=10,
-                description="Island paradise",
-            ),
-            Zone(
-                id="central",
-                name="Central Thailand",
-                color="#d35400",
-                center=[13.5, 99.5],
-                zoom=10,
-                description="Historical sites",
-            ),
-        ],
-    ),
-    "Vietnam": CountryConfig(
-        center=[21.03, 105.85],
-        zoom=9,
-        zones=[
-            Zone(
-                id="hanoi",
-                name="Hanoi",
-                color="#e74c3c",
-                center=[21.03, 105.85],
-                zoom=12,
-                description="Capital city charm",
-            ),
-            Zone(
-                id="hcm",
-                name="Ho Chi Minh City",
-                color="#27ae60",
-                center=[10.77, 106.70],
-                zoom=12,
-                description="Southern metropolis",
-            ),
-            Zone(
-                id="danang",
-                name="Da Nang",
-                color="#2980b9",
-                center=[16.07, 108.23],
-                zoom=12,
-                description="Beach city and Hoi An gateway",
-            ),
-            Zone(
-                id="other",
-                name="Other Regions",
-                color="#8e44ad",
-                center=[15.5, 107.0],
-                zoom=9,
-                description="Regional explores",
-            ),
-        ],
-    ),
-    "Malaysia": CountryConfig(
-        center=[3.14, 101.69],
-        zoom=10,
-        zones=[
-            Zone(
-                id="kl",
-                name="Kuala Lumpur",
-                color="#e74c3c",
-                center=[3.14, 101.69],
-                zoom=12,
-                description="Capital city exploration",
-            ),
-            Zone(
-                id="penang",
-                name="Penang",
-                color="#27ae60",
-                center=[5.41, 100.33],
-                zoom=12,
-                description="Heritage and beaches",
-            ),
-            Zone(
-                id="malacca",
-                name="Malacca",
-                color="#2980b9",
-                center=[2.20, 102.25],
-                zoom=12,
-                description="Historical port city",
-            ),
-            Zone(
-                id="sabah",
-                name="Sabah",
-                color="#d35400",
-                center=[5.37, 118.67],
-                zoom=10,
-                description="Borneo adventures",
-            ),
-        ],
-    ),
-}
+import json
+from collections.abc import Collection, Container, Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING
+
+from . import profiling
+from .loader import load_locations
+from .models import COUNTRY_CONFIGS, Location, Zone
+from .styles import style_for
+
+# folium (with branca and pandas), numpy and the folium-based page elements are
+# imported on first use, so importing this module (e.g. for EXPORTER_VERSION) stays cheap
+if TYPE_CHECKING:
+    import folium
+
+    from .dedup import Deduplicator
+    from .geocoding import Geocoder
+    from .itinerary import Itinerary
+
+# Bump whenever the generated HTML changes, so cached builds are redone
+EXPORTER_VERSION = "5"
+
+# Above this many places, markers are emitted as one JSON array and clustered in the browser
+CLUSTER_THRESHOLD = 2000
+
+# How far the popup "Nearby" list looks, when enabled
+NEARBY_RADIUS_M = 500
+
+# JS marker factory, used as the FastMarkerCluster callback and for shard loading. Each row is
+# [lat, lon, name, category index, notes, address, location ID, nearby?], where nearby is an
+# optional list of [name, metres]; __CATEGORIES__ holds [category, marker color, icon] per
+# category index.
+_CLUSTER_CALLBACK = """(function() {
+    var categories = __CATEGORIES__;
+    function esc(text) {
+        var div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+    return function(row) {
+        var style = categories[row[3]];
+        var marker = L.marker(new L.LatLng(row[0], row[1]), {
+            icon: L.AwesomeMarkers.icon({
+                icon: style[2], markerColor: style[1], iconColor: 'white', prefix: 'glyphicon'
+            })
+        });
+        marker.bindTooltip(esc(row[2]));
+        marker.bindPopup(function() {
+            return '<div style="font-family:sans-serif; width:200px">'
+                + '<b>' + esc(row[2]) + '</b><br>'
+                + '<span style="color:gray; font-size:11px;">' + esc(style[0]) + '</span><hr>'
+                + esc(row[4]) + '<br><br>'
+                + '<small>📍 ' + esc(row[5]) + '</small>'
+                + (row[7] && row[7].length ? '<br><small>Nearby: ' + row[7].map(function(n) {
+                    return esc(n[0]) + ' (' + n[1] + ' m)';
+                }).join(', ') + '</small>' : '')
+                + '</div>';
+        }, {maxWidth: 250});
+        if (window.registerMarker) registerMarker(row[6], marker);
+        return marker;
+    };
+})()"""
+
+
+def get_icon(cat: str) -> tuple[str, str]:
+    """Map a category to a marker color and glyphicon name."""
+    style = style_for(cat)
+    return style.marker_color, style.icon
+
+
+def unique_id(base: str, taken: Container[str]) -> str:
+    """``base``, or ``base-2``, ``base-3``... if already used (duplicate rows)."""
+    loc_id, n = base, 1
+    while loc_id in taken:
+        n += 1
+        loc_id = f"{base}-{n}"
+    return loc_id
+
+
+def location_ids(
+    zones: Sequence[Zone], zone_locations: dict[str, list[Location]]
+) -> dict[str, list[str]]:
+    """Stable per-location IDs, zone by zone, parallel to ``zone_locations``."""
+    taken: dict[str, None] = {}
+    zone_ids: dict[str, list[str]] = {}
+    for zone in zones:
+        ids = zone_ids[zone.id] = []
+        for loc in zone_locations[zone.id]:
+            loc_id = unique_id(loc.uid, taken)
+            taken[loc_id] = None
+            ids.append(loc_id)
+    return zone_ids
+
+
+def category_styles(
+    zone_locations: dict[str, list[Location]],
+) -> tuple[dict[str, int], list[list[str]]]:
+    """Number the categories in use; returns (category -> index, [category, color, icon])."""
+    category_index: dict[str, int] = {}
+    categories: list[list[str]] = []
+    for locations in zone_locations.values():
+        for loc in locations:
+            if loc.category not in category_index:
+                category_index[loc.category] = len(categories)
+                categories.append([loc.category, *get_icon(loc.category)])
+    return category_index, categories
+
+
+def marker_factory(categories: list[list[str]]) -> str:
+    """JS function expression that builds a marker from a compact row."""
+    return _CLUSTER_CALLBACK.replace("__CATEGORIES__", json.dumps(categories))
+
+
+def nearby_places(
+    zones: Sequence[Zone],
+    zone_locations: dict[str, list[Location]],
+    count: int,
+    meters: float = NEARBY_RADIUS_M,
+) -> dict[str, list[list[tuple[str, int]]]]:
+    """Up to ``count`` other places within ``meters`` of each location.
+
+    Returns:
+        Zone ID -> ``[(name, whole metres), ...]`` per location, parallel to
+        ``zone_locations``, nearest first.
+    """
+    ordered = [loc for zone in zones for loc in zone_locations[zone.id]]
+    from .spatial import SpatialIndex
+
+    neighbours = SpatialIndex.from_locations(ordered).neighbours(count, meters)
+
+    result: dict[str, list[list[tuple[str, int]]]] = {}
+    start = 0
+    for zone in zones:
+        end = start + len(zone_locations[zone.id])
+        result[zone.id] = [
+            [(ordered[i].name, round(d)) for i, d in zip(idx.tolist(), dist.tolist(), strict=True)]
+            for idx, dist in neighbours[start:end]
+        ]
+        start = end
+    return result
+
+
+def marker_rows(
+    zones: Sequence[Zone],
+    zone_locations: dict[str, list[Location]],
+    zone_ids: dict[str, list[str]],
+    zone_nearby: dict[str, list[list[tuple[str, int]]]] | None = None,
+) -> tuple[list[list], list[list[str]]]:
+    """Rows for the JS marker factory, and the category table they index into."""
+    category_index, categories = category_styles(zone_locations)
+    rows: list[list] = []
+
+    for zone in zones:
+        for i, (loc, loc_id) in enumerate(
+            zip(zone_locations[zone.id], zone_ids[zone.id], strict=True)
+        ):
+            row = [
+                round(loc.latitude, 6),
+                round(loc.longitude, 6),
+                loc.name,
+                category_index[loc.category],
+                loc.notes,
+                loc.address,
+                loc_id,
+            ]
+            if zone_nearby:
+                row.append(zone_nearby[zone.id][i])
+            rows.append(row)
+    return rows, categories
+
+
+def add_clustered_markers(
+    m: "folium.Map",
+    zones: Sequence[Zone],
+    zone_locations: dict[str, list[Location]],
+    zone_ids: dict[str, list[str]],
+    zone_nearby: dict[str, list[list[tuple[str, int]]]] | None = None,
+) -> str:
+    """Add every zone's locations as a single client-side clustered layer.
+
+    Returns the JS variable name of the cluster group.
+    """
+    from folium.plugins import FastMarkerCluster
 
+    rows, categories = marker_rows(zones, zone_locations, zone_ids, zone_nearby)
+    cluster = FastMarkerCluster(rows, callback=marker_factory(categories), control=False)
+    cluster.add_to(m)
+    return cluster.get_name()
 
+
+@profiling.staged("html")
 def generate_html_map(
-    csv_file: str, country: str = "Singapore", output_file: str | None = None
+    csv_file: str,
+    country: str = "Singapore",
+    output_file: str | None = None,
+    locations: Iterable[Location] | None = None,
+    *,
+    cluster_threshold: int | None = CLUSTER_THRESHOLD,
+    geocoder: "Geocoder | None" = None,
+    dedup: "Deduplicator | None" = None,
+    shared_assets: bool = False,
+    sharded: bool = False,
+    nearby: int = 0,
+    itineraries: bool = False,
+    day_routes: "Mapping[str, Itinerary] | None" = None,
+    compact_popups: bool = False,
+    changed_zones: Collection[str] | None = None,
+    derive_zones: bool = False,
+    density_zoom: int | None = None,
+    places_url: str | None = None,
 ) -> None:
+    """
+    Generates a standalone HTML planner map with a zone sidebar.
+
+    Pass ``locations`` to reuse a dataset that was already loaded with
+    ``load_locations``/``load_store`` instead of parsing ``csv_file`` again.
+
+    When there are more than ``cluster_threshold`` places, markers are written
+    as one compact JSON array and clustered in the browser instead of being
+    emitted as individual Leaflet objects. Pass ``None`` to always emit
+    individual markers.
+
+    Pass ``geocoder`` to fill in rows that have an address but no coordinates,
+    and ``dedup`` to drop near-duplicate rows.
+    With ``shared_assets`` the sidebar CSS/JS are written once as hashed files
+    next to ``output_file`` and linked, instead of being inlined in every page.
+
+    With ``sharded`` each zone's places are written to a GeoJSON file next to
+    ``output_file`` and fetched when the zone is opened or scrolled into view;
+    the page itself only holds the map, zone list and polygons. Sharded pages
+    must be served over HTTP. Pass ``changed_zones`` (zone IDs whose places,
+    location IDs or category numbering differ from the last build of the same
+    page) to rewrite only those shards. A sharded page served along with a
+    bounding-box endpoint (``server.MapServer``'s ``/places``) can be given its
+    ``places_url``: markers in view are then fetched from it as the map moves.
+
+    With ``nearby`` set, each popup lists up to that many other places within
+    ``NEARBY_RADIUS_M``, precomputed with a spatial index. With ``itineraries``
+    a short day route through each zone's places is drawn as a polyline; pass
+    ``day_routes`` to draw itineraries already planned for ``locations``.
+
+    With ``compact_popups``, individual (unclustered) markers are written as one
+    JSON table and built in the browser, and popup HTML is only generated when
+    a popup is opened. Clustered and sharded pages always work this way.
+
+    With ``derive_zones`` each zone's sidebar view is fitted to its places, and
+    zones without a hand-drawn polygon are outlined by the hull of their places,
+    simplified to suit the zoom level (cached next to ``output_file``).
+
+    With ``density_zoom`` set, zoom levels below it show graduated circles
+    counting the places per grid cell instead of the markers, which only appear
+    from that zoom up. The cell counts are cached next to ``output_file``.
+    """
     from pathlib import Path
 
+    import folium
+    from folium.plugins import MarkerCluster
+
+    from .itinerary import zone_itineraries
+    from .popups import MarkerTable
+    from .shards import ZoneShards, write_zone_shards
+    from .sidebar import Sidebar, write_shared_assets
+    from .zoning import zone_index_for
+
     if output_file is None:
         output_file = str(Path("output") / f"{country}_Planner_Desktop.html")
 
-    # 1. Load Data from CSV
-    locations: list[Location] = []
-    try:
-        with open(csv_file, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if reader is None:
-                print(f"Failed to read CSV file '{csv_file}'.")
-                return
-            for row in reader:
-                locations.append(Location.from_csv_row(row))
-    except FileNotFoundError:
-        print(f"CSV file '{csv_file}' not found.")
-        return
+    # 1. Load Data from CSV (unless already loaded)
+    if locations is None:
+        try:
+            with profiling.stage("load"):
+                locations = load_locations(csv_file, geocoder, dedup)
+        except FileNotFoundError:
+            print(f"CSV file '{csv_file}' not found.")
+            return
+    elif not isinstance(locations, Sequence):
+        locations = list(locations)
 
     if not locations:
         print(f"No locations found in '{csv_file}'.")
@@ -328,294 +285,215 @@ def generate_html_map(
     zoom = config.zoom
     zones = config.zones
 
-    # 3. Populate zones with locations from CSV
-    for loc in locations:
-        # Find matching zone by name
-        zone_found = False
-        for zone in zones:
-            if zone.name.lower() == loc.zone.lower():
-                zone.locations.append(loc)
-                zone_found = True
-                break
-
-        # If no zone match found, assign to last zone (usually "Other/Worth the Travel")
-        if not zone_found and zones:
-            zones[-1].locations.append(loc)
+    # 3. Group locations into this build's zone buckets: by zone name first, then by
+    # the polygon containing the point. Anything left over goes to the last zone
+    # (usually "Other/Worth the Travel").
+    with profiling.stage("zones"):
+        zone_locations = zone_index_for(country).bucket(locations)
+
+    derived_outlines: dict[str, list] = {}
+    if derive_zones:
+        from .geometry import GEOMETRY_CACHE_NAME, GeometryCache, derived_zones, zone_geometries
+
+        with profiling.stage("geometry"):
+            cache = GeometryCache(Path(output_file).parent / GEOMETRY_CACHE_NAME)
+            geometries = zone_geometries(country, zones, zone_locations, cache)
+            derived_outlines = {
+                zone.id: [list(level) for level in geometries[zone.id].outlines]
+                for zone in zones
+                if not zone.polygon and zone.id in geometries
+            }
+            zones = derived_zones(zones, geometries)
 
     # 4. Create Map
     m = folium.Map(location=center, zoom_start=zoom, tiles="CartoDB positron")
 
-    # Helper for Icons
-    def get_icon(cat: str) -> tuple[str, str]:
-        cat = cat.lower()
-        if "food" in cat or "sweet" in cat:
-            return "red", "cutlery"
-        if "bar" in cat:
-            return "darkred", "glass"
-        if "nature" in cat:
-            return "green", "tree-deciduous"
-        if "culture" in cat or "museum" in cat:
-            return "orange", "star"
-        if "unique" in cat:
-            return "purple", "star"
-        return "blue", "info-sign"
+    clustered = cluster_threshold is not None and len(locations) > cluster_threshold
+    zone_nearby = None
+    if nearby > 0:
+        with profiling.stage("nearby"):
+            zone_nearby = nearby_places(zones, zone_locations, nearby)
+    routes: Mapping[str, Itinerary] = {}
+    if itineraries and day_routes is not None:
+        routes = day_routes
+    elif itineraries:
+        with profiling.stage("itineraries"):
+            routes = zone_itineraries(zones, zone_locations)
+
+    # Layers holding the markers, hidden while density circles are shown
+    marker_layers: list[str] = []
+    marker_parent = m
+    if density_zoom is not None and not (clustered or sharded or compact_popups):
+        marker_parent = folium.FeatureGroup(control=False)
+        marker_parent.add_to(m)
+        marker_layers.append(marker_parent.get_name())
 
     # 5. Add Markers and Polygons
-    marker_data: dict[str, dict[str, float | str]] = {}  # Store marker info for sidebar
-    for zone in zones:
-        # Add polygon for zone boundary
-        if zone.polygon:
-            folium.Polygon(
-                locations=zone.polygon,
-                color=zone.color,
-                weight=2,
-                fill=True,
-                fill_color=zone.color,
-                fill_opacity=0.4,
-                tooltip=zone.name,
-                popup=zone.description,
-            ).add_to(m)
-
-        # Add markers for locations
-        for loc in zone.locations:
-            try:
-                color, icon = get_icon(loc.category)
-
-                popup_html = f"""
+    with profiling.stage("markers"):
+        # Store marker info for the sidebar, keyed by a stable per-location ID
+        marker_data: dict[str, dict[str, float | str]] = {}
+        zone_ids = location_ids(zones, zone_locations)
+        polygon_vars: list[str] = []
+        # (polygon JS variable, outline per zoom level) of derived outlines
+        outline_levels: list[tuple[str, list]] = []
+        for zone in zones:
+            # Add polygon for zone boundary
+            if zone.polygon:
+                polygon = folium.Polygon(
+                    locations=zone.polygon,
+                    color=zone.color,
+                    weight=2,
+                    fill=True,
+                    fill_color=zone.color,
+                    fill_opacity=0.4,
+                    tooltip=zone.name,
+                    popup=zone.description,
+                )
+                polygon.add_to(m)
+                polygon_vars.append(polygon.get_name())
+                levels = derived_outlines.get(zone.id, ())
+                if len(levels) > 1:
+                    outline_levels.append((polygon.get_name(), levels))
+
+            # Add the zone's day route
+            if zone.id in routes:
+                route = routes[zone.id]
+                folium.PolyLine(
+                    locations=[
+                        [loc.latitude, loc.longitude]
+                        for loc in route.stops(zone_locations[zone.id])
+                    ],
+                    color=zone.color,
+                    weight=3,
+                    opacity=0.8,
+                    dash_array="6 8",
+                    tooltip=f"{zone.name} day route: {len(route.order)} stops, "
+                    f"{route.distance_m / 1000:.1f} km",
+                ).add_to(m)
+
+            for i, (loc, loc_id) in enumerate(
+                zip(zone_locations[zone.id], zone_ids[zone.id], strict=True)
+            ):
+                marker_data[loc_id] = {"name": loc.name, "lat": loc.latitude, "lon": loc.longitude}
+
+                if clustered or sharded or compact_popups:
+                    continue
+
+                # Add marker for location
+                try:
+                    color, icon = get_icon(loc.category)
+
+                    nearby_html = ""
+                    if zone_nearby and zone_nearby[zone.id][i]:
+                        nearby_html = (
+                            "<br><small>Nearby: "
+                            + ", ".join(
+                                f"{name} ({meters} m)" for name, meters in zone_nearby[zone.id][i]
+                            )
+                            + "</small>"
+                        )
+
+                    popup_html = f"""
                 <div style="font-family:sans-serif; width:200px">
                     <b>{loc.name}</b><br>
                     <span style="color:gray; font-size:11px;">{loc.category}</span><hr>
                     {loc.notes}<br><br>
-                    <small>📍 {loc.address}</small>
+                    <small>📍 {loc.address}</small>{nearby_html}
                 </div>
                 """
 
-                marker = folium.Marker(
-                    location=[loc.latitude, loc.longitude],
-                    tooltip=loc.name,
-                    popup=folium.Popup(popup_html, max_width=250),
-                    icon=folium.Icon(color=color, icon=icon),
-                )
-                marker.add_to(m)
-
-                # Store marker data for JavaScript access
-                loc_key = f"{loc.name}_{loc.latitude}_{loc.longitude}"
-                marker_data[loc_key] = {
-                    "name": loc.name,
-                    "lat": loc.latitude,
-                    "lon": loc.longitude,
-                }
-            except (ValueError, KeyError):
-                pass
+                    marker = folium.Marker(
+                        location=[loc.latitude, loc.longitude],
+                        tooltip=loc.name,
+                        popup=folium.Popup(popup_html, max_width=250),
+                        icon=folium.Icon(color=color, icon=icon),
+                    )
+                    marker.add_to(marker_parent)
+                    marker_data[loc_id]["marker"] = marker.get_name()
+                except (ValueError, KeyError):
+                    pass
+
+        cluster_vars: list[str] = []
+        # Page element that creates markers client-side, added after the sidebar
+        marker_loader = None
+        if sharded:
+            # Empty layer that markers from fetched shards are added to
+            layer = (
+                MarkerCluster(control=False) if clustered else folium.FeatureGroup(control=False)
+            )
+            layer.add_to(m)
+            if clustered:
+                cluster_vars.append(layer.get_name())
+            marker_layers.append(layer.get_name())
+            category_index, categories = category_styles(zone_locations)
+            shards = write_zone_shards(
+                output_file,
+                zones,
+                zone_locations,
+                zone_ids,
+                category_index,
+                zone_nearby,
+                # "Nearby" lists cross zone borders, so any change can touch every shard
+                only=None if zone_nearby else changed_zones,
+            )
+            marker_loader = ZoneShards(
+                layer.get_name(), marker_factory(categories), shards, categories, places_url
+            )
+        elif clustered:
+            cluster_vars.append(
+                add_clustered_markers(m, zones, zone_locations, zone_ids, zone_nearby)
+            )
+            marker_layers.append(cluster_vars[-1])
+        elif compact_popups:
+            layer = folium.FeatureGroup(control=False)
+            layer.add_to(m)
+            marker_layers.append(layer.get_name())
+            rows, categories = marker_rows(zones, zone_locations, zone_ids, zone_nearby)
+            marker_loader = MarkerTable(layer.get_name(), marker_factory(categories), rows)
+        profiling.count("markers", len(marker_data))
 
     # 6. Sidebar Logic with Zoom-Based Opacity
-    sidebar_html = """
-    {% macro html(this, kwargs) %}
-    <!doctype html>
-    <html lang="en">
-    <head>
-      <meta charset="utf-8">
-      <style>
-        #map-sidebar {
-            position: absolute;
-            top: 10px;
-            right: 10px;
-            width: 280px;
-            max-height: 90vh;
-            background-color: white;
-            z-index: 9999;
-            overflow-y: auto;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-            border-radius: 8px;
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            padding: 10px;
-        }
-        .sidebar-header {
-            font-size: 18px;
-            font-weight: bold;
-            margin-bottom: 10px;
-            color: #2c3e50;
-            border-bottom: 2px solid #ecf0f1;
-            padding-bottom: 5px;
-        }
-        .zone-container {
-            margin-bottom: 8px;
-            border: 1px solid #eee;
-            border-radius: 5px;
-            overflow: hidden;
-        }
-        .zone-title {
-            padding: 10px;
-            cursor: pointer;
-            font-weight: 600;
-            font-size: 14px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            color: white;
-            transition: all 0.3s ease;
-        }
-        .zone-title:hover {
-            transform: translateX(2px);
-            box-shadow: inset 0 -2px 4px rgba(0,0,0,0.1);
-        }
-        .location-list {
-            display: none;
-            padding: 5px 0;
-            background-color: #fff;
-        }
-        .location-item {
-            padding: 6px 15px;
-            font-size: 13px;
-            cursor: pointer;
-            color: #555;
-            border-left: 3px solid transparent;
-        }
-        .location-item:hover {
-            background-color: #f0f8ff;
-            color: #000;
-            border-left: 3px solid #3498db;
-        }
-        .zone-dot {
-            height: 10px;
-            width: 10px;
-            border-radius: 50%;
-            display: inline-block;
-            margin-right: 8px;
-        }
-        #map-sidebar::-webkit-scrollbar { width: 6px; }
-        #map-sidebar::-webkit-scrollbar-thumb { background: #ccc; border-radius: 3px; }
-      </style>
-    </head>
-    <body>
-
-    <div id="map-sidebar">
-        <div class="sidebar-header">🌍 Trip Planner</div>
-
-        {% for zone in this.zones %}
-        <div class="zone-container" style="border-left: 4px solid {{ zone.color }};">
-            <div class="zone-title" style="background: linear-gradient(90deg, {{ zone.color }}dd, {{ zone.color }}99);" onclick="flyToLoc({{ zone.center[0] }}, {{ zone.center[1] }}, {{ zone.zoom }}, '{{ zone.id }}')">
-                <span><span class="zone-dot" style="background-color: white;"></span>{{ zone.name }} ({{ zone.locations|length }})</span>
-                <span style="font-size:10px;">▼</span>
-            </div>
-
-            <div class="location-list" id="list-{{ zone.id }}">
-                <div style="padding: 8px 15px; font-size: 12px; color: #666; font-style: italic;">{{ zone.description }}</div>
-                {% for loc in zone.locations %}
-                <div class="location-item" onclick="flyToLocAndOpen({{ loc.latitude }}, {{ loc.longitude }}, 18)">
-                    📍 {{ loc.name }} <span style="font-size:10px; color:#aaa">({{ loc.category }})</span>
-                </div>
-                {% endfor %}
-            </div>
-        </div>
-        {% endfor %}
-
-        <div style="font-size:11px; color:#999; margin-top:10px; text-align:center;">
-            Click headers to zoom.<br>Click items to see pin.
-        </div>
-    </div>
-
-    <script>
-        var mapInstance = null;
-        function findMap() {
-            for (var key in window) {
-                if (key.startsWith('map_') && window[key] && window[key].on) {
-                    mapInstance = window[key];
-                    initMapListeners();
-                    break;
-                }
-            }
-        }
-
-        function flyToLocAndOpen(lat, lon, zoom) {
-            if (!mapInstance) findMap();
-            if (mapInstance) {
-                mapInstance.flyTo([lat, lon], zoom, {
-                    animate: true,
-                    duration: 1.5
-                });
-
-                // Find and open the marker popup by coordinates
-                setTimeout(function() {
-                    mapInstance.eachLayer(function(layer) {
-                        if (layer instanceof L.Marker) {
-                            var markerLat = layer.getLatLng().lat;
-                            var markerLon = layer.getLatLng().lng;
-                            // Check if marker is at the target location (with small tolerance for floating point)
-                            if (Math.abs(markerLat - lat) < 0.0001 && Math.abs(markerLon - lon) < 0.0001) {
-                                layer.openPopup();
-                            }
-                        }
-                    });
-                }, 800);
-            }
-        }
-
-        function flyToLoc(lat, lon, zoom, listId) {
-            if (!mapInstance) findMap();
-            if (mapInstance) {
-                mapInstance.flyTo([lat, lon], zoom, {
-                    animate: true,
-                    duration: 1.5
-                });
-
-                if (listId) {
-                    var list = document.getElementById("list-" + listId);
-                    var allLists = document.getElementsByClassName("location-list");
-                    for (var i=0; i<allLists.length; i++) {
-                        if (allLists[i].id !== "list-" + listId) {
-                            allLists[i].style.display = "none";
-                        }
-                    }
-                    if (list.style.display === "block") {
-                        list.style.display = "none";
-                    } else {
-                        list.style.display = "block";
-                    }
-                }
-            }
-        }
-
-        function initMapListeners() {
-            mapInstance.on('zoomend', function() {
-                var zoom = mapInstance.getZoom();
-                var newOpacity = (zoom >= 15) ? 0.1 : 0.45;
-                mapInstance.eachLayer(function (layer) {
-                    if (layer instanceof L.Polygon) {
-                        layer.setStyle({fillOpacity: newOpacity});
-                    }
-                });
-            });
-            // Trigger once to set initial state
-            var zoom = mapInstance.getZoom();
-            var newOpacity = (zoom >= 15) ? 0.1 : 0.45;
-            mapInstance.eachLayer(function (layer) {
-                if (layer instanceof L.Polygon) {
-                    layer.setStyle({fillOpacity: newOpacity});
-                }
-            });
-        }
-
-        findMap();
-        setTimeout(findMap, 1000);
-    </script>
-    </body>
-    </html>
-    {% endmacro %}
-    """
-
-    class Sidebar(MacroElement):
-        _template = Template(sidebar_html)
-
-        def __init__(
-            self, zones: list[Zone], marker_data: dict[str, dict[str, float | str]]
-        ) -> None:
-            super().__init__()
-            self.zones = zones
-            self.marker_data = marker_data
-
-    m.get_root().add_child(Sidebar(zones, marker_data))
-    m.save(output_file)
+    css_href = js_href = None
+    if shared_assets:
+        css_href, js_href = write_shared_assets(Path(output_file).parent)
+
+    sidebar = Sidebar(
+        zones,
+        zone_locations,
+        marker_data,
+        zone_ids,
+        map_name=m.get_name(),
+        polygon_vars=polygon_vars,
+        cluster_vars=cluster_vars,
+        lazy=sharded,
+        css_href=css_href,
+        js_href=js_href,
+    )
+    m.get_root().add_child(sidebar)
+    if marker_loader is not None:
+        m.get_root().add_child(marker_loader)
+    if outline_levels:
+        from .outlines import ZoneOutlines
+
+        m.get_root().add_child(ZoneOutlines(m.get_name(), outline_levels))
+    if density_zoom is not None:
+        from .density import DENSITY_CACHE_SUFFIX, MIN_DENSITY_ZOOM, cached_density_grid
+        from .density_layer import DensityLayer
+
+        with profiling.stage("density"):
+            grid = cached_density_grid(
+                locations,
+                Path(output_file).with_suffix(DENSITY_CACHE_SUFFIX),
+                range(MIN_DENSITY_ZOOM, density_zoom),
+            )
+        m.get_root().add_child(DensityLayer(m.get_name(), marker_layers, grid, density_zoom))
+
+    # 7. Render the page, then write it out (what ``m.save`` does in one go)
+    with profiling.stage("render"):
+        page = m.get_root().render().encode("utf8")
+    with profiling.stage("write"), open(output_file, "wb") as f:
+        f.write(page)
+    profiling.count("bytes_written", len(page))
     print(f"✅ Desktop Map Generated: {output_file}")
 
 
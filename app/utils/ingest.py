@@ -0,0 +1,228 @@
+"""Vectorized CSV ingestion with coordinate validation.
+
+``load_store`` converts each row with ``float()`` as it streams, and a single
+bad coordinate stops the build. Here the whole file is read by pandas (with
+the pyarrow engine when it is installed), coordinates are checked column-wise
+against the valid ranges and the country's ``bounds``, and rejected rows are
+collected in a report. The clean columns go straight into a ``LocationStore``.
+
+Coordinates are converted with Python's own float parsing, so a place gets
+exactly the same coordinates (and marker ID) as with the row-by-row loader.
+"""
+
+import csv
+from dataclasses import astuple, dataclass, field, fields
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from .columnar import LocationStore, StringTable
+from .geocoding import Geocoder, fill_missing_coordinates
+from .loader import LINE
+from .models import COUNTRY_CONFIGS
+
+if TYPE_CHECKING:
+    from .dedup import Deduplicator
+
+ENGINES = ("auto", "c", "pyarrow")
+
+# Text columns and the value used when the column is missing (as in Location.from_csv_row)
+_TEXT_COLUMNS = {
+    "Name": "Unknown",
+    "Category": "Other",
+    "Address": "",
+    "Notes": "",
+    "Zone": "",
+}
+
+
+@dataclass(slots=True)
+class BadRow:
+    """One rejected CSV row (data rows numbered from 1)."""
+
+    row: int
+    reason: str
+    name: str
+    latitude: str
+    longitude: str
+
+
+@dataclass
+class IngestReport:
+    """What validated ingestion read and rejected."""
+
+    rows_read: int = 0
+    bad_rows: list[BadRow] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """One-line description of what was rejected."""
+        return f"{len(self.bad_rows)} bad row(s) rejected out of {self.rows_read} row(s)"
+
+    def write_report(self, path: str | Path) -> None:
+        """Write the rejected rows as CSV, one line per row."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(item.name for item in fields(BadRow))
+            writer.writerows(astuple(bad) for bad in self.bad_rows)
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    """The pandas CSV engine to use: pyarrow if installed (for ``"auto"``), else C."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown CSV engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if engine != "auto":
+        return engine
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def read_frame(csv_file: str, engine: str = "auto") -> pd.DataFrame:
+    """Read a places CSV with every column as text ("" for empty cells).
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    frame = pd.read_csv(csv_file, dtype=str, keep_default_na=False, engine=resolve_engine(engine))
+    for column, default in _TEXT_COLUMNS.items():
+        if column not in frame:
+            frame[column] = default
+    for column in ("Latitude", "Longitude"):
+        if column not in frame:
+            frame[column] = ""
+    return frame
+
+
+def _fill_from_geocoder(frame: pd.DataFrame, geocoder: Geocoder) -> None:
+    """Geocode rows with a blank coordinate in place (rows that stay blank are left)."""
+    blank = np.flatnonzero(
+        (frame["Latitude"].str.strip() == "").to_numpy()
+        | (frame["Longitude"].str.strip() == "").to_numpy()
+    )
+    if not len(blank):
+        return
+    records = frame.iloc[blank].to_dict("records")
+    resolved = {id(row) for row in fill_missing_coordinates(records, geocoder)}
+    hits = [(i, row) for i, row in zip(blank, records, strict=True) if id(row) in resolved]
+    if hits:
+        rows = frame.index[[i for i, _ in hits]]
+        frame.loc[rows, "Latitude"] = [row["Latitude"] for _, row in hits]
+        frame.loc[rows, "Longitude"] = [row["Longitude"] for _, row in hits]
+
+
+def _parse_coordinates(text: pd.Series) -> np.ndarray:
+    """Floats exactly as ``float()`` parses them; NaN where the text is not a number."""
+    values = text.to_numpy(dtype=object)
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        # pandas' own parser only decides which cells are numbers; it can round differently
+        valid = pd.to_numeric(text, errors="coerce").notna().to_numpy()
+        result = np.full(len(values), np.nan)
+        result[valid] = values[valid].astype(np.float64)
+        return result
+
+
+def validate(
+    frame: pd.DataFrame, country: str | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Check every row's coordinates at once.
+
+    Returns:
+        ``(latitude, longitude, reasons)``, where ``reasons`` is an object array
+        holding ``None`` for good rows and the rejection reason otherwise.
+    """
+    lat_text, lon_text = frame["Latitude"], frame["Longitude"]
+    lat, lon = _parse_coordinates(lat_text), _parse_coordinates(lon_text)
+
+    invalid = ~(np.isfinite(lat) & np.isfinite(lon))
+    # Only cells that did not parse can be blank, so only those are stripped
+    blank = np.zeros(len(frame), dtype=bool)
+    suspect = np.flatnonzero(invalid)
+    blank[suspect] = (lat_text.iloc[suspect].str.strip() == "").to_numpy() | (
+        lon_text.iloc[suspect].str.strip() == ""
+    ).to_numpy()
+    with np.errstate(invalid="ignore"):
+        out_of_range = (np.abs(lat) > 90) | (np.abs(lon) > 180)
+        outside = np.zeros(len(frame), dtype=bool)
+        config = COUNTRY_CONFIGS.get(country) if country else None
+        if config is not None and config.bounds is not None:
+            (south, west), (north, east) = config.bounds
+            outside = ~((lat >= south) & (lat <= north) & (lon >= west) & (lon <= east))
+
+    reasons = np.select(
+        [blank, invalid, out_of_range, outside],
+        [
+            "missing coordinates",
+            "coordinates are not numbers",
+            "coordinates out of range",
+            f"outside {country} bounds",
+        ],
+        default="",
+    ).astype(object)
+    reasons[reasons == ""] = None
+    return lat, lon, reasons
+
+
+def ingest_store(
+    csv_file: str,
+    country: str | None = None,
+    geocoder: Geocoder | None = None,
+    dedup: "Deduplicator | None" = None,
+    engine: str = "auto",
+) -> tuple[LocationStore, IngestReport]:
+    """Read, validate and (optionally) deduplicate a places CSV into a ``LocationStore``.
+
+    Rows with a blank coordinate are geocoded first when ``geocoder`` is given.
+    Rows that still have no usable coordinates, or whose coordinates fall
+    outside ``country``'s bounds, are left out and listed in the report.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    frame = read_frame(csv_file, engine)
+    if geocoder is not None:
+        _fill_from_geocoder(frame, geocoder)
+
+    lat, lon, reasons = validate(frame, country)
+    report = IngestReport(rows_read=len(frame))
+    bad = np.flatnonzero(reasons != None)  # noqa: E711 - elementwise comparison
+    if len(bad):
+        names = frame["Name"].to_numpy()[bad]
+        lat_text = frame["Latitude"].to_numpy()[bad]
+        lon_text = frame["Longitude"].to_numpy()[bad]
+        report.bad_rows = [
+            BadRow(int(i) + 1, reasons[i], name, la, lo)
+            for i, name, la, lo in zip(bad, names, lat_text, lon_text, strict=True)
+        ]
+
+    keep = reasons == None  # noqa: E711 - elementwise comparison
+    if dedup is not None:
+        records = frame[keep].to_dict("records")
+        # One line per row after the header (pandas skips blank lines, so this can run short)
+        for row, i in zip(records, np.flatnonzero(keep), strict=True):
+            row[LINE] = str(i + 2)
+        kept = {id(row) for row in dedup.filter(records)}
+        keep[np.flatnonzero(keep)] = [id(row) in kept for row in records]
+
+    clean = frame[keep]
+    category_codes, categories = pd.factorize(clean["Category"])
+    zone_codes, zones = pd.factorize(clean["Zone"])
+    store = LocationStore(
+        latitude=lat[keep],
+        longitude=lon[keep],
+        category_codes=category_codes.astype(np.int32),
+        categories=list(categories),
+        zone_codes=zone_codes.astype(np.int32),
+        zones=list(zones),
+        names=StringTable.from_strings(clean["Name"].tolist()),
+        addresses=StringTable.from_strings(clean["Address"].tolist()),
+        notes=StringTable.from_strings(clean["Notes"].tolist()),
+        latitude_text=StringTable.from_strings(clean["Latitude"].tolist()),
+        longitude_text=StringTable.from_strings(clean["Longitude"].tolist()),
+    )
+    return store, report
@@ -0,0 +1,306 @@
+"""Visiting order for a set of stops: nearest neighbour, then 2-opt and Or-opt.
+
+Distances are great-circle metres. For up to ``MATRIX_LIMIT`` stops the full
+distance matrix is built in one vectorized call; above that, rows are computed
+on demand and the starting tour comes from a Hilbert curve instead of nearest
+neighbour, so memory stays linear. Improvement passes are vectorized per stop
+and stop once they have evaluated a budget of candidate moves, which bounds
+the time per route while keeping the result the same on every run.
+
+Without a start the route is an open path (both ends free). With a start it is a
+round trip that begins and ends at that stop.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from .models import COUNTRY_CONFIGS, Location, Zone
+from .spatial import haversine_m
+from .zoning import zone_index_for
+
+# Above this many stops the distance matrix is not materialized
+MATRIX_LIMIT = 1500
+
+# Default improvement budget per route: candidate moves evaluated (roughly 0.1 s)
+MOVE_BUDGET = 3_000_000
+
+# Budget charged per candidate move when distances are computed on demand
+_ON_DEMAND_MOVE_COST = 6
+
+# Ignore "improvements" smaller than this many metres (float noise)
+_EPS = 1e-6
+
+
+@dataclass(slots=True)
+class Itinerary:
+    """An ordered route through stops given by index."""
+
+    order: list[int]
+    distance_m: float
+    closed: bool = False
+
+    def stops(self, locations: Sequence[Location]) -> list[Location]:
+        """The visited locations in order; round trips end back at the start."""
+        path = [locations[i] for i in self.order]
+        if self.closed and path:
+            path.append(path[0])
+        return path
+
+
+class _Budget:
+    """Candidate moves the improvement passes may still evaluate."""
+
+    __slots__ = ("left",)
+
+    def __init__(self, moves: int) -> None:
+        self.left = moves
+
+    def spend(self, moves: int) -> None:
+        self.left -= moves
+
+    @property
+    def exhausted(self) -> bool:
+        return self.left <= 0
+
+
+class _Metric:
+    """Distance lookups backed by a full matrix or computed a row at a time."""
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, dummy: bool) -> None:
+        self.lats, self.lons = lats, lons
+        # Optional extra node at index n that is 0 m from every stop (turns a path into a tour)
+        self.dummy = dummy
+        self.n = len(lats)
+        self.matrix = None
+        # Budget charged per candidate move evaluated
+        self.move_cost = _ON_DEMAND_MOVE_COST
+        if self.n <= MATRIX_LIMIT:
+            self.matrix = haversine_m(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+            if dummy:
+                self.matrix = np.pad(self.matrix, ((0, 1), (0, 1)))
+            self.move_cost = 1
+
+    def row(self, i: int) -> np.ndarray:
+        """Distances from node ``i`` to every node."""
+        if self.matrix is not None:
+            return self.matrix[i]
+        if i == self.n:
+            return np.zeros(self.n + self.dummy)
+        row = haversine_m(self.lats[i], self.lons[i], self.lats, self.lons)
+        return np.append(row, 0.0) if self.dummy else row
+
+    def pairs(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Elementwise distances between nodes ``a[k]`` and ``b[k]``."""
+        if self.matrix is not None:
+            return self.matrix[a, b]
+        real = (a < self.n) & (b < self.n)
+        result = np.zeros(len(a))
+        result[real] = haversine_m(
+            self.lats[a[real]], self.lons[a[real]], self.lats[b[real]], self.lons[b[real]]
+        )
+        return result
+
+
+def _nearest_neighbour(metric: _Metric, nodes: int, start: int) -> np.ndarray:
+    tour = np.empty(nodes, dtype=np.int64)
+    visited = np.zeros(nodes, dtype=bool)
+    current = start
+    for k in range(nodes):
+        tour[k] = current
+        visited[current] = True
+        if k + 1 < nodes:
+            candidates = np.where(visited, np.inf, metric.row(current))
+            current = int(np.argmin(candidates))
+    return tour
+
+
+def _hilbert_order(lats: np.ndarray, lons: np.ndarray, bits: int = 16) -> np.ndarray:
+    """Indices sorted along a Hilbert curve over the points' bounding box."""
+    side = 1 << bits
+
+    def scale(values: np.ndarray) -> np.ndarray:
+        span = max(float(values.max() - values.min()), 1e-12)
+        return ((values - values.min()) / span * (side - 1)).astype(np.int64)
+
+    x, y = scale(lons), scale(lats)
+    keys = np.zeros(len(x), dtype=np.int64)
+    s = side >> 1
+    while s:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx) ^ ry)
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return np.argsort(keys, kind="stable")
+
+
+def route_length(lats: np.ndarray, lons: np.ndarray, order: Sequence[int], closed: bool) -> float:
+    """Length in metres of visiting ``order``, returning to the start if ``closed``."""
+    if len(order) < 2:
+        return 0.0
+    path = np.asarray(order)
+    if closed:
+        path = np.append(path, path[0])
+    return float(
+        haversine_m(lats[path[:-1]], lons[path[:-1]], lats[path[1:]], lons[path[1:]]).sum()
+    )
+
+
+def _two_opt(metric: _Metric, tour: np.ndarray, budget: _Budget) -> bool:
+    """One pass of best-improvement 2-opt moves over a closed tour; True if improved."""
+    n = len(tour)
+    improved = False
+    for i in range(n - 2):
+        if budget.exhausted:
+            break
+        a, b = tour[i], tour[i + 1]
+        # Candidate second edges (tour[j], tour[j + 1]) for j in i + 2 .. n - 1
+        c = tour[i + 2 :]
+        d = np.concatenate((tour[i + 3 :], tour[:1]))
+        if i == 0:
+            # The last edge touches tour[0]; reversing it would be a no-op
+            c, d = c[:-1], d[:-1]
+        if not len(c):
+            continue
+        row_a, row_b = metric.row(a), metric.row(b)
+        gains = row_a[b] + metric.pairs(c, d) - row_a[c] - row_b[d]
+        budget.spend(len(gains) * metric.move_cost)
+        best = int(np.argmax(gains))
+        if gains[best] > _EPS:
+            j = i + 2 + best
+            tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt(metric: _Metric, tour: np.ndarray, budget: _Budget) -> bool:
+    """Move runs of 1-3 stops (possibly reversed) to a cheaper edge; True if improved."""
+    n = len(tour)
+    improved = False
+    for length in (1, 2, 3):
+        if n < length + 3:
+            break
+        i = 0
+        while i < n:
+            if budget.exhausted:
+                return improved
+            # The segment starting at i, and the rest of the tour in order after it
+            seg = tour[i : i + length]
+            if len(seg) < length:
+                seg = np.concatenate((seg, tour[: length - len(seg)]))
+                rest = tour[length - (n - i) : i]
+            else:
+                rest = np.concatenate((tour[i + length :], tour[:i]))
+            first, last = seg[0], seg[-1]
+            prev, nxt = rest[-1], rest[0]
+            row_first, row_last = metric.row(first), metric.row(last)
+            removal = metric.row(prev)[first] + row_last[nxt] - metric.row(prev)[nxt]
+
+            # Insert between rest[k] and rest[k + 1] (excluding the gap we came from)
+            c, e = rest[:-1], rest[1:]
+            base = metric.pairs(c, e)
+            forward = row_first[c] + row_last[e] - base
+            backward = row_last[c] + row_first[e] - base
+            budget.spend(2 * len(base) * metric.move_cost)
+            k_f, k_b = int(np.argmin(forward)), int(np.argmin(backward))
+            if forward[k_f] <= backward[k_b]:
+                k, cost, piece = k_f, forward[k_f], seg
+            else:
+                k, cost, piece = k_b, backward[k_b], seg[::-1]
+
+            if removal - cost > _EPS:
+                tour[:] = np.concatenate([rest[: k + 1], piece, rest[k + 1 :]])
+                improved = True
+            i += 1
+    return improved
+
+
+def optimize_route(
+    lats: Sequence[float] | np.ndarray,
+    lons: Sequence[float] | np.ndarray,
+    start: int | None = None,
+    move_budget: int = MOVE_BUDGET,
+) -> Itinerary:
+    """Order the stops at ``lats``/``lons`` into a short route.
+
+    Args:
+        lats: Stop latitudes.
+        lons: Stop longitudes.
+        start: Index of the stop to start and end at (a round trip); ``None``
+            for an open path with free ends.
+        move_budget: Candidate moves to evaluate while improving the starting
+            tour; the same stops and budget always give the same route.
+    """
+    lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    n = len(lats)
+    closed = start is not None
+    if n < 3:
+        order = list(range(n))
+        if closed:
+            order = order[start:] + order[:start]
+        return Itinerary(order, route_length(lats, lons, order, closed), closed)
+
+    # An open path is a tour through an extra node that is 0 m from everything
+    metric = _Metric(lats, lons, dummy=not closed)
+    nodes = n + (not closed)
+    if metric.matrix is not None:
+        tour = _nearest_neighbour(metric, nodes, start if closed else n)
+    else:
+        tour = _hilbert_order(lats, lons)
+        if not closed:
+            tour = np.append(tour, n)
+
+    budget = _Budget(move_budget)
+    while not budget.exhausted:
+        if not (_two_opt(metric, tour, budget) | _or_opt(metric, tour, budget)):
+            break
+
+    # Rotate so the tour starts at the start stop, or just after the extra node
+    anchor = start if closed else n
+    tour = np.roll(tour, -int(np.flatnonzero(tour == anchor)[0]))
+    if not closed:
+        tour = tour[1:]
+    order = tour.tolist()
+    return Itinerary(order, route_length(lats, lons, order, closed), closed)
+
+
+def plan_itinerary(
+    locations: Sequence[Location], start: int | None = None, move_budget: int = MOVE_BUDGET
+) -> Itinerary:
+    """Order ``locations`` (or any subset passed in) into a day route."""
+    return optimize_route(
+        [loc.latitude for loc in locations],
+        [loc.longitude for loc in locations],
+        start=start,
+        move_budget=move_budget,
+    )
+
+
+def zone_itineraries(
+    zones: Sequence[Zone],
+    zone_locations: dict[str, list[Location]],
+    move_budget: int = MOVE_BUDGET,
+) -> dict[str, Itinerary]:
+    """A day route through each zone that has at least two places."""
+    return {
+        zone.id: plan_itinerary(zone_locations[zone.id], move_budget=move_budget)
+        for zone in zones
+        if len(zone_locations[zone.id]) >= 2
+    }
+
+
+def country_itineraries(
+    country: str, locations: Sequence[Location], move_budget: int = MOVE_BUDGET
+) -> dict[str, Itinerary]:
+    """Day routes through ``country``'s zones, with the places bucketed as the exporters do.
+
+    Plan them once per build and pass them to each exporter that draws them.
+    """
+    config = COUNTRY_CONFIGS.get(country, COUNTRY_CONFIGS["Singapore"])
+    zone_locations = zone_index_for(country).bucket(locations)
+    return zone_itineraries(config.zones, zone_locations, move_budget)
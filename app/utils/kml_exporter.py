@@ -1,86 +1,246 @@
-import csv
 import html
+import zipfile
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from io import TextIOWrapper
+from typing import TYPE_CHECKING, TextIO
 
+from . import profiling
+from .geocoding import Geocoder
+from .loader import iter_locations, load_store
+from .models import COUNTRY_CONFIGS, Location, Zone
+from .styles import CATEGORY_STYLES, style_for
 
-def create_kml(csv_file: str, country: str = "Singapore", output_file: str | None = None) -> None:
-    """
-    Generates a KML file that can be imported into Google My Maps.
+if TYPE_CHECKING:
+    from .dedup import Deduplicator
+    from .itinerary import Itinerary
+
+# Bump whenever the generated KML changes, so cached builds are redone
+EXPORTER_VERSION = "2"
+
+# Pin colors (aabbggrr) per category
+KML_STYLES: dict[str, str] = {cat: style.kml_color for cat, style in CATEGORY_STYLES.items()}
+
+# Bytes handed to the OS per write
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def placemark(name: str, category: str, address: str, notes: str, lon: str, lat: str) -> str:
+    """Render one Placemark, escaping the free-text fields."""
+    style_id = style_for(category).style_id
+    return f"""
+                <Placemark>
+                    <name>{html.escape(name)}</name>
+                    <description><![CDATA[<b>Category:</b> {category}<br><b>Address:</b> {html.escape(address)}<br><br>{html.escape(notes)}]]></description>
+                    <styleUrl>#{style_id}</styleUrl>
+                    <Point>
+                        <coordinates>{lon},{lat},0</coordinates>
+                    </Point>
+                </Placemark>"""
+
+
+def location_placemark(loc: Location) -> str:
+    """Render one place, with its coordinates as written in the CSV when read from one."""
+    return placemark(loc.name, loc.category, loc.address, loc.notes, *loc.coordinate_text)
+
+
+def _route_placemark(zone: Zone, route: "Itinerary", stops: Iterable[Location]) -> str:
+    """Render a zone's day route as a LineString in the zone's color."""
+    # "#rrggbb" -> opaque "aabbggrr"
+    color = f"ff{zone.color[5:7]}{zone.color[3:5]}{zone.color[1:3]}"
+    coordinates = " ".join(f"{loc.longitude},{loc.latitude},0" for loc in stops)
+    return f"""
+                <Placemark>
+                    <name>{html.escape(zone.name)} day route</name>
+                    <description>{len(route.order)} stops, {route.distance_m / 1000:.1f} km</description>
+                    <Style>
+                        <LineStyle>
+                            <color>{color}</color>
+                            <width>4</width>
+                        </LineStyle>
+                    </Style>
+                    <LineString>
+                        <tessellate>1</tessellate>
+                        <coordinates>{coordinates}</coordinates>
+                    </LineString>
+                </Placemark>"""
+
+
+def route_placemarks(
+    locations: Sequence[Location],
+    country: str,
+    routes: "Mapping[str, Itinerary] | None" = None,
+) -> list[str]:
+    """Day-route placemarks for every zone of ``country`` with at least two places.
+
+    ``routes`` are the zones' itineraries if already planned for these places
+    (see ``itinerary.country_itineraries``); otherwise they are planned here.
     """
-    from pathlib import Path
+    # numpy-backed; streaming exports never get here
+    from .itinerary import zone_itineraries
+    from .zoning import zone_index_for
 
-    if output_file is None:
-        output_file = str(Path("output") / f"{country}_Trip_Mobile.kml")
+    config = COUNTRY_CONFIGS.get(country, COUNTRY_CONFIGS["Singapore"])
+    zone_locations = zone_index_for(country).bucket(locations)
+    if routes is None:
+        routes = zone_itineraries(config.zones, zone_locations)
+    return [
+        _route_placemark(zone, routes[zone.id], routes[zone.id].stops(zone_locations[zone.id]))
+        for zone in config.zones
+        if zone.id in routes
+    ]
 
+
+def header(country: str) -> Iterator[str]:
+    """The KML header and the style definitions, piece by piece."""
     # KML Header
-    kml_content: list[str] = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<kml xmlns="http://www.opengis.net/kml/2.2">',
-        "<Document>",
-        f"<name>{country} Trip Plan</name>",
-        "<description>Generated from Python</description>",
-    ]
+    yield "\n".join(
+        [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<kml xmlns="http://www.opengis.net/kml/2.2">',
+            "<Document>",
+            f"<name>{country} Trip Plan</name>",
+            "<description>Generated from Python</description>",
+        ]
+    )
 
-    # Define Styles for Pins (Colors based on Category)
-    styles: dict[str, str] = {
-        "Food": "ff5252ff",  # Red
-        "Sweet Tooth": "ff99ccff",  # Pink
-        "Bar": "ff000099",  # Dark Red
-        "Nature": "ff57bb8a",  # Green
-        "Culture": "ffffcc33",  # Orange/Yellow
-        "Unique": "ffba68c8",  # Purple
-    }
-
-    # Add Style Definitions to KML
-    for cat, color in styles.items():
-        kml_content.append(f'''
-        <Style id="{cat.replace(" ", "_")}">
+    # Later pieces are "\n"-separated, as when the document was built with one join
+    # Style Definitions (Colors based on Category)
+    for style in CATEGORY_STYLES.values():
+        yield f'''
+
+        <Style id="{style.style_id}">
             <IconStyle>
-                <color>{color}</color>
+                <color>{style.kml_color}</color>
                 <scale>1.1</scale>
                 <Icon>
                     <href>http://maps.google.com/mapfiles/kml/pushpin/wht-pushpin.png</href>
                 </Icon>
             </IconStyle>
-        </Style>''')
-
-    # Read CSV and create Placemarks
-    try:
-        with open(csv_file, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if reader is None:
-                print(f"Failed to read CSV file '{csv_file}'.")
-                return
-            for row in reader:
-                name = html.escape(row["Name"])
-                desc = html.escape(row["Notes"])
-                address = html.escape(row["Address"])
-                lat = row["Latitude"]
-                lon = row["Longitude"]
-                category = row["Category"]
-
-                style_id = category.replace(" ", "_") if category in styles else "Unique"
-
-                placemark = f"""
-                <Placemark>
-                    <name>{name}</name>
-                    <description><![CDATA[<b>Category:</b> {category}<br><b>Address:</b> {address}<br><br>{desc}]]></description>
-                    <styleUrl>#{style_id}</styleUrl>
-                    <Point>
-                        <coordinates>{lon},{lat},0</coordinates>
-                    </Point>
-                </Placemark>"""
-                kml_content.append(placemark)
+        </Style>'''
+
+
+# KML Footer
+FOOTER = "\n</Document></kml>"
+
+
+def iter_kml(
+    locations: Iterable[Location], country: str = "Singapore", routes: Iterable[str] = ()
+) -> Iterator[str]:
+    """
+    Yields the KML document for already-loaded locations piece by piece.
+
+    Concatenating the pieces gives the same file ``KmlWriter`` writes, so
+    callers (e.g. the server) can stream it without ever holding the whole
+    document in memory. ``routes`` are extra rendered placemarks (see
+    ``route_placemarks``) added after the places.
+    """
+    yield from header(country)
+
+    for loc in locations:
+        yield "\n" + location_placemark(loc)
+
+    for route in routes:
+        yield "\n" + route
+
+    yield FOOTER
+
+
+def iter_kml_rows(rows: Iterable[dict[str, str]], country: str = "Singapore") -> Iterator[str]:
+    """
+    Yields the KML document for raw CSV rows piece by piece.
+
+    Coordinates are copied verbatim from the CSV text.
+    """
+    return iter_kml(map(Location.from_csv_row, rows), country)
 
-    except FileNotFoundError:
-        print(f"Error: Could not find {csv_file}")
+
+@contextmanager
+def open_kml(output_file: str, kmz: bool = False) -> Iterator[TextIO]:
+    """
+    Opens ``output_file`` for streaming KML text through a buffered writer.
+
+    With ``kmz=True`` the document is deflate-compressed on the fly into a KMZ
+    archive (a zip holding ``doc.kml``) instead of being written as plain text.
+    """
+    if not kmz:
+        with open(output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
         return
 
-    # KML Footer
-    kml_content.append("</Document></kml>")
+    with (
+        zipfile.ZipFile(output_file, "w", compression=zipfile.ZIP_DEFLATED) as archive,
+        archive.open("doc.kml", "w", force_zip64=True) as raw,
+        TextIOWrapper(raw, encoding="utf-8", write_through=False) as f,
+    ):
+        yield f
+
+
+@profiling.staged("kml")
+def create_kml(
+    csv_file: str,
+    country: str = "Singapore",
+    output_file: str | None = None,
+    locations: Iterable[Location] | None = None,
+    kmz: bool = False,
+    geocoder: Geocoder | None = None,
+    dedup: "Deduplicator | None" = None,
+    itineraries: bool = False,
+    day_routes: "Mapping[str, Itinerary] | None" = None,
+) -> None:
+    """
+    Generates a KML file that can be imported into Google My Maps.
+
+    Pass ``locations`` to reuse a dataset that was already loaded with
+    ``load_locations``/``load_store`` instead of parsing ``csv_file`` again.
+    Otherwise rows are streamed from the CSV straight into the output, so
+    memory use does not grow with the number of places. Set ``kmz`` to write a
+    compressed KMZ archive instead, and pass ``geocoder`` to fill in rows that
+    have an address but no coordinates. Pass ``dedup`` to drop near-duplicate
+    rows (its grid of kept places does grow with the input). With
+    ``itineraries`` a day route through each zone is added as a LineString; the
+    places then have to be loaded rather than streamed. Pass ``day_routes`` to
+    draw itineraries already planned for ``locations`` instead of planning them.
+    """
+    from pathlib import Path
+
+    if output_file is None:
+        suffix = "kmz" if kmz else "kml"
+        output_file = str(Path("output") / f"{country}_Trip_Mobile.{suffix}")
+
+    if itineraries and locations is None:
+        try:
+            with profiling.stage("load"):
+                locations = load_store(csv_file, geocoder, dedup)
+        except FileNotFoundError:
+            print(f"Error: Could not find {csv_file}")
+            return
+
+    # Stream places straight from the CSV (unless already loaded)
+    routes: Sequence[str] = ()
+    if locations is None:
+        try:
+            locations = iter_locations(csv_file, geocoder, dedup)
+        except FileNotFoundError:
+            print(f"Error: Could not find {csv_file}")
+            return
+    elif itineraries:
+        if not isinstance(locations, Sequence):
+            locations = list(locations)
+        with profiling.stage("itineraries"):
+            routes = route_placemarks(locations, country, day_routes)
+
+    from .export import KmlWriter  # which builds on this module
 
-    # Write file
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(kml_content))
+    # When streaming, this stage includes reading the CSV
+    with (
+        profiling.stage("write"),
+        KmlWriter(output_file, country=country, kmz=kmz, routes=routes) as writer,
+    ):
+        for loc in locations:
+            writer.add(loc)
+    profiling.count("placemarks", writer.written + len(routes))
+    profiling.count_file("bytes_written", output_file)
 
     print(f"✅ Mobile Map Generated: {output_file}")
     print("   -> Upload this file to https://www.google.com/mymaps to use on your phone.")
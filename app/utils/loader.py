@@ -0,0 +1,83 @@
+"""Shared CSV loading so every exporter works from one parsed dataset."""
+
+import csv
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, TextIO
+
+from . import profiling
+from .geocoding import Geocoder, fill_missing_coordinates
+from .models import Location
+
+if TYPE_CHECKING:
+    from .columnar import LocationStore
+    from .dedup import Deduplicator
+
+# Key under which each row carries the line of the CSV file it was read from
+LINE = "_line"
+
+
+def iter_rows(
+    csv_file: str, geocoder: Geocoder | None = None, dedup: "Deduplicator | None" = None
+) -> Iterator[dict[str, str]]:
+    """Lazily yield the raw rows of a places CSV.
+
+    The file is opened straight away, so a missing file is reported here rather
+    than on the first ``next()``; rows are only parsed as they are consumed.
+    Each row records its line in the file (the header is line 1) under ``LINE``.
+    Rows with a blank Latitude/Longitude are geocoded with ``geocoder``, or
+    skipped with a warning if they cannot be resolved. With ``dedup``,
+    near-duplicates of earlier rows are dropped and recorded in its report.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    f = open(csv_file, encoding="utf-8", newline="")  # noqa: SIM115 - closed by _read_rows
+    rows = fill_missing_coordinates(_read_rows(f), geocoder)
+    return dedup.filter(rows) if dedup else rows
+
+
+def _read_rows(f: TextIO) -> Iterator[dict[str, str]]:
+    with f:
+        reader = csv.DictReader(f)
+        rows = 0
+        for row in reader:
+            # The line the row ends on; a quoted field can span several
+            row[LINE] = str(reader.line_num)
+            rows += 1
+            yield row
+        profiling.count("rows_read", rows)
+
+
+def iter_locations(
+    csv_file: str, geocoder: Geocoder | None = None, dedup: "Deduplicator | None" = None
+) -> Iterator[Location]:
+    """Lazily yield a Location for each row of a places CSV.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    return map(Location.from_csv_row, iter_rows(csv_file, geocoder, dedup))
+
+
+def load_locations(
+    csv_file: str, geocoder: Geocoder | None = None, dedup: "Deduplicator | None" = None
+) -> list[Location]:
+    """Read a places CSV once into a list of Locations.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    return list(iter_locations(csv_file, geocoder, dedup))
+
+
+def load_store(
+    csv_file: str, geocoder: Geocoder | None = None, dedup: "Deduplicator | None" = None
+) -> "LocationStore":
+    """Read a places CSV once into a compact, column-oriented ``LocationStore``.
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+    """
+    from .columnar import LocationStore  # numpy; not needed when only streaming rows
+
+    return LocationStore.from_rows(iter_rows(csv_file, geocoder, dedup))
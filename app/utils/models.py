@@ -0,0 +1,326 @@
+"""Data models and per-country map configuration."""
+
+import hashlib
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+
+@dataclass(slots=True)
+class Location:
+    """Represents a single location/place."""
+
+    name: str
+    latitude: float
+    longitude: float
+    category: str
+    address: str = ""
+    notes: str = ""
+    zone: str = ""
+    # Coordinates as written in the CSV, so text exports can copy them verbatim
+    latitude_text: str = field(default="", repr=False, compare=False)
+    longitude_text: str = field(default="", repr=False, compare=False)
+
+    @classmethod
+    def from_csv_row(cls, row: dict[str, str]) -> "Location":
+        """Create a Location from a CSV row."""
+        return cls(
+            name=row.get("Name", "Unknown"),
+            latitude=float(row.get("Latitude", 0)),
+            longitude=float(row.get("Longitude", 0)),
+            category=row.get("Category", "Other"),
+            address=row.get("Address", ""),
+            notes=row.get("Notes", ""),
+            zone=row.get("Zone", ""),
+            latitude_text=row.get("Latitude", ""),
+            longitude_text=row.get("Longitude", ""),
+        )
+
+    @property
+    def coordinate_text(self) -> tuple[str, str]:
+        """(longitude, latitude) as in the CSV, or formatted if not read from one."""
+        return (
+            self.longitude_text or str(self.longitude),
+            self.latitude_text or str(self.latitude),
+        )
+
+    @property
+    def uid(self) -> str:
+        """Short ID that stays the same across builds while name and position do."""
+        key = f"{self.name}|{self.latitude}|{self.longitude}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+
+
+@dataclass(frozen=True)
+class Zone:
+    """Represents a geographic zone.
+
+    Zones are shared, read-only configuration; the locations that fall in a
+    zone are grouped per build (see ``ZoneIndex.bucket``).
+    """
+
+    id: str
+    name: str
+    color: str
+    center: tuple[float, float]
+    zoom: int
+    description: str
+    polygon: tuple[tuple[float, float], ...] = ()
+
+
+@dataclass(frozen=True)
+class CountryConfig:
+    """Configuration for a country's map."""
+
+    center: tuple[float, float]
+    zoom: int
+    zones: tuple[Zone, ...]
+    # ((south, west), (north, east)); places outside are rejected by validated ingestion
+    bounds: tuple[tuple[float, float], tuple[float, float]] | None = None
+
+
+COUNTRY_CONFIGS: Mapping[str, CountryConfig] = MappingProxyType(
+    {
+        "Singapore": CountryConfig(
+            center=(1.31, 103.84),
+            zoom=12,
+            bounds=((1.15, 103.60), (1.48, 104.10)),
+            zones=(
+                Zone(
+                    id="chinatown",
+                    name="Chinatown & CBD",
+                    color="#e74c3c",
+                    center=(1.2820, 103.8440),
+                    zoom=16,
+                    description="Heritage shophouses, temples, and Michelin food.",
+                    polygon=(
+                        (1.2885, 103.8430),
+                        (1.2850, 103.8490),
+                        (1.2780, 103.8470),
+                        (1.2790, 103.8400),
+                    ),
+                ),
+                Zone(
+                    id="kampong",
+                    name="Kampong Glam & Bugis",
+                    color="#27ae60",
+                    center=(1.3010, 103.8580),
+                    zoom=16,
+                    description="Malay heritage, gin bars, and trendy lanes.",
+                    polygon=(
+                        (1.3040, 103.8560),
+                        (1.3030, 103.8620),
+                        (1.2990, 103.8600),
+                        (1.3000, 103.8550),
+                    ),
+                ),
+                Zone(
+                    id="civic",
+                    name="Civic District & Marina Bay",
+                    color="#2980b9",
+                    center=(1.2890, 103.8550),
+                    zoom=15,
+                    description="Museums, Skylines, and Supertrees.",
+                    polygon=(
+                        (1.2980, 103.8480),
+                        (1.2920, 103.8660),
+                        (1.2780, 103.8660),
+                        (1.2880, 103.8460),
+                    ),
+                ),
+                Zone(
+                    id="orchard",
+                    name="Orchard & Tanglin",
+                    color="#8e44ad",
+                    center=(1.3080, 103.8250),
+                    zoom=15,
+                    description="Shopping belt and lush gardens.",
+                    polygon=(
+                        (1.3160, 103.8140),
+                        (1.3050, 103.8400),
+                        (1.2990, 103.8350),
+                        (1.3100, 103.8100),
+                    ),
+                ),
+                Zone(
+                    id="east",
+                    name="Katong & East Coast",
+                    color="#d35400",
+                    center=(1.3080, 103.9000),
+                    zoom=15,
+                    description="Peranakan culture and laksa.",
+                    polygon=(
+                        (1.3150, 103.9000),
+                        (1.3140, 103.9080),
+                        (1.3000, 103.9060),
+                        (1.3000, 103.8950),
+                    ),
+                ),
+                Zone(
+                    id="outliers",
+                    name="Worth the Travel",
+                    color="#7f8c8d",
+                    center=(1.3500, 103.8000),
+                    zoom=11,
+                    description="Unique experiences further afield.",
+                ),
+            ),
+        ),
+        "Japan": CountryConfig(
+            center=(35.68, 139.65),
+            zoom=10,
+            bounds=((24.0, 122.9), (45.6, 146.0)),
+            zones=(
+                Zone(
+                    id="tokyo",
+                    name="Tokyo",
+                    color="#e74c3c",
+                    center=(35.68, 139.65),
+                    zoom=12,
+                    description="Capital city and urban exploration",
+                ),
+                Zone(
+                    id="osaka",
+                    name="Osaka",
+                    color="#27ae60",
+                    center=(34.67, 135.50),
+                    zoom=12,
+                    description="Street food and nightlife",
+                ),
+                Zone(
+                    id="kyoto",
+                    name="Kyoto",
+                    color="#2980b9",
+                    center=(35.01, 135.78),
+                    zoom=12,
+                    description="Temples, gardens, and tradition",
+                ),
+                Zone(
+                    id="other",
+                    name="Other Regions",
+                    color="#8e44ad",
+                    center=(35.5, 137.5),
+                    zoom=10,
+                    description="Day trips and regional explores",
+                ),
+            ),
+        ),
+        "Thailand": CountryConfig(
+            center=(13.73, 100.52),
+            zoom=10,
+            bounds=((5.6, 97.3), (20.5, 105.7)),
+            zones=(
+                Zone(
+                    id="bangkok",
+                    name="Bangkok",
+                    color="#e74c3c",
+                    center=(13.73, 100.52),
+                    zoom=12,
+                    description="Thailand's vibrant capital",
+                ),
+                Zone(
+                    id="north",
+                    name="Northern Thailand",
+                    color="#27ae60",
+                    center=(18.78, 98.98),
+                    zoom=10,
+                    description="Mountains and temples",
+                ),
+                Zone(
+                    id="south",
+                    name="Southern Beaches",
+                    color="#2980b9",
+                    center=(8.65, 100.14),
+                    zoom=10,
+                    description="Island paradise",
+                ),
+                Zone(
+                    id="central",
+                    name="Central Thailand",
+                    color="#d35400",
+                    center=(13.5, 99.5),
+                    zoom=10,
+                    description="Historical sites",
+                ),
+            ),
+        ),
+        "Vietnam": CountryConfig(
+            center=(21.03, 105.85),
+            zoom=9,
+            bounds=((8.2, 102.1), (23.4, 109.5)),
+            zones=(
+                Zone(
+                    id="hanoi",
+                    name="Hanoi",
+                    color="#e74c3c",
+                    center=(21.03, 105.85),
+                    zoom=12,
+                    description="Capital city charm",
+                ),
+                Zone(
+                    id="hcm",
+                    name="Ho Chi Minh City",
+                    color="#27ae60",
+                    center=(10.77, 106.70),
+                    zoom=12,
+                    description="Southern metropolis",
+                ),
+                Zone(
+                    id="danang",
+                    name="Da Nang",
+                    color="#2980b9",
+                    center=(16.07, 108.23),
+                    zoom=12,
+                    description="Beach city and Hoi An gateway",
+                ),
+                Zone(
+                    id="other",
+                    name="Other Regions",
+                    color="#8e44ad",
+                    center=(15.5, 107.0),
+                    zoom=9,
+                    description="Regional explores",
+                ),
+            ),
+        ),
+        "Malaysia": CountryConfig(
+            center=(3.14, 101.69),
+            zoom=10,
+            bounds=((0.8, 99.6), (7.4, 119.3)),
+            zones=(
+                Zone(
+                    id="kl",
+                    name="Kuala Lumpur",
+                    color="#e74c3c",
+                    center=(3.14, 101.69),
+                    zoom=12,
+                    description="Capital city exploration",
+                ),
+                Zone(
+                    id="penang",
+                    name="Penang",
+                    color="#27ae60",
+                    center=(5.41, 100.33),
+                    zoom=12,
+                    description="Heritage and beaches",
+                ),
+                Zone(
+                    id="malacca",
+                    name="Malacca",
+                    color="#2980b9",
+                    center=(2.20, 102.25),
+                    zoom=12,
+                    description="Historical port city",
+                ),
+                Zone(
+                    id="sabah",
+                    name="Sabah",
+                    color="#d35400",
+                    center=(5.37, 118.67),
+                    zoom=10,
+                    description="Borneo adventures",
+                ),
+            ),
+        ),
+    }
+)
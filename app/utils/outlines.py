@@ -0,0 +1,57 @@
+"""Zone polygons that switch to a simpler outline as the map zooms out.
+
+Derived zone outlines (see ``geometry.zone_geometries``) come simplified for
+several zoom levels. The page draws the most detailed one; ``ZoneOutlines``
+swaps in the outline for the current zoom whenever the zoom changes.
+"""
+
+from folium import MacroElement
+from jinja2 import Template
+
+from .popups import rows_json
+
+
+class ZoneOutlines(MacroElement):
+    """Keeps each polygon's outline in step with the map's zoom."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this.map_name }};
+            var outlines = [
+            {%- for polygon, levels in this.outlines %}
+                [{{ polygon }}, {{ levels }}],
+            {%- endfor %}
+            ];
+            function pickOutlines() {
+                var zoom = map.getZoom();
+                for (var i = 0; i < outlines.length; i++) {
+                    var levels = outlines[i][1], ring = levels[0][1];
+                    for (var j = 1; j < levels.length && levels[j][0] <= zoom; j++) {
+                        ring = levels[j][1];
+                    }
+                    if (outlines[i][0]._plannerRing !== ring) {
+                        outlines[i][0]._plannerRing = ring;
+                        outlines[i][0].setLatLngs(ring);
+                    }
+                }
+            }
+            map.on('zoomend', pickOutlines);
+            pickOutlines();
+        })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, map_name: str, outlines: list[tuple[str, list]]) -> None:
+        """
+        Args:
+            map_name: JS variable of the folium map.
+            outlines: (JS variable of a polygon, ``[[min zoom, ring], ...]`` by
+                ascending zoom) per polygon.
+        """
+        super().__init__()
+        self._name = "ZoneOutlines"
+        self.map_name = map_name
+        self.outlines = [(polygon, rows_json(levels)) for polygon, levels in outlines]
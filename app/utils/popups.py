@@ -0,0 +1,53 @@
+"""Individual markers built in the browser from one compact JSON table.
+
+By default every place becomes its own Leaflet marker, popup and popup ``<div>``
+in the saved page, with the popup markup repeated for each one. A
+``MarkerTable`` writes the places once as rows and builds each marker with the
+shared marker factory when the page loads; popup HTML is only generated when a
+popup is opened.
+"""
+
+import json
+
+from folium import MacroElement
+from jinja2 import Template
+
+# Characters that must not appear raw inside an inline <script>
+_SCRIPT_ESCAPES = str.maketrans({"<": "\\u003c", ">": "\\u003e", "&": "\\u0026"})
+
+
+def rows_json(rows: list[list]) -> str:
+    """Compact JSON for ``rows`` that is safe to inline in a script."""
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).translate(_SCRIPT_ESCAPES)
+
+
+class MarkerTable(MacroElement):
+    """Adds one marker per row to a layer when the page loads."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function() {
+            var makeMarker = {{ this.marker_factory }};
+            var rows = {{ this.rows }};
+            for (var i = 0; i < rows.length; i++) {
+                {{ this.layer }}.addLayer(makeMarker(rows[i]));
+            }
+        })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, layer: str, marker_factory: str, rows: list[list]) -> None:
+        """
+        Args:
+            layer: JS variable of the layer the markers are added to.
+            marker_factory: JS expression for a function building a marker from
+                ``[lat, lon, name, category index, notes, address, location ID]``.
+            rows: One row per place, in that layout.
+        """
+        super().__init__()
+        self._name = "MarkerTable"
+        self.layer = layer
+        self.marker_factory = marker_factory
+        self.rows = rows_json(rows)
@@ -0,0 +1,224 @@
+"""Named stage timers and counters for finding where a build spends its time.
+
+Exporters wrap their phases in ``stage("name")`` and report sizes with
+``count("name", n)``. Both are no-ops unless a ``profile_session`` is active, so
+the instrumentation can stay in place: a disabled ``stage`` costs one global
+lookup and returns a shared null context.
+
+Stages nest, and a nested stage is reported under its parent's name
+("html/render"). Each stage records its call count, wall time, the counters
+reported while it was innermost, and how far the process's peak RSS rose while
+it ran (the most over its calls); the process peak itself is reported once for
+the whole session. With ``memory=True`` the peak of Python allocations inside the stage is traced
+as well (tracemalloc slows everything down, so timings from such a run are
+inflated).
+"""
+
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_MIB = 1 << 20
+
+_NULL = nullcontext()
+
+# The running session, if any
+_profiler: "Profiler | None" = None
+
+
+def peak_rss() -> int | None:
+    """Peak resident set size of this process so far, in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageStats:
+    """Totals for every run of one named stage."""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    counters: dict[str, int] = field(default_factory=dict)
+    rss_growth: int | None = None
+    peak_traced: int | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        report: dict[str, Any] = {
+            "name": self.name,
+            "calls": self.calls,
+            "seconds": round(self.seconds, 6),
+            "counters": self.counters,
+        }
+        if self.rss_growth is not None:
+            report["rss_growth_mib"] = round(self.rss_growth / _MIB, 2)
+        if self.peak_traced is not None:
+            report["peak_traced_mib"] = round(self.peak_traced / _MIB, 2)
+        return report
+
+
+class Profiler:
+    """Collects stage timings and counters for one session."""
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory = memory
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        # Open stages, innermost last, with the traced peak of finished children
+        self._stack: list[tuple[StageStats, list[int]]] = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self._stack:
+            name = f"{self._stack[-1][0].name}/{name}"
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+
+        child_peak = [0]
+        if self.memory:
+            if self._stack:
+                # Keep the parent's peak so far before measuring the child on its own
+                self._stack[-1][1][0] = max(
+                    self._stack[-1][1][0], tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+        self._stack.append((stats, child_peak))
+        start_rss = peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            self._stack.pop()
+            rss = peak_rss()
+            if rss is not None and start_rss is not None:
+                stats.rss_growth = max(stats.rss_growth or 0, rss - start_rss)
+            if self.memory:
+                peak = max(child_peak[0], tracemalloc.get_traced_memory()[1])
+                stats.peak_traced = max(stats.peak_traced or 0, peak)
+                if self._stack:
+                    self._stack[-1][1][0] = max(self._stack[-1][1][0], peak)
+                tracemalloc.reset_peak()
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+        if self._stack:
+            counters = self._stack[-1][0].counters
+            counters[name] = counters.get(name, 0) + n
+
+    def report(self) -> dict[str, Any]:
+        """The session as a JSON-serializable dict."""
+        rss = peak_rss()
+        return {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "argv": sys.argv,
+            "seconds": round(time.perf_counter() - self.started, 6),
+            "memory_traced": self.memory,
+            "peak_rss_mib": round(rss / _MIB, 2) if rss is not None else None,
+            "counters": self.counters,
+            "stages": [stats.as_dict() for stats in self.stages.values()],
+        }
+
+    def summary(self) -> str:
+        """Plain-text table of the stages, in the order they first ran."""
+        lines = [f"{'stage':<32} {'calls':>5} {'seconds':>9}  counters"]
+        for stats in self.stages.values():
+            counters = ", ".join(f"{k}={v:,}" for k, v in stats.counters.items())
+            lines.append(f"{stats.name:<32} {stats.calls:>5} {stats.seconds:9.3f}  {counters}")
+        return "\n".join(lines)
+
+
+def enabled() -> bool:
+    """Whether a profiling session is running."""
+    return _profiler is not None
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """Time the enclosed block as stage ``name`` (a no-op outside a session)."""
+    return _NULL if _profiler is None else _profiler.stage(name)
+
+
+def staged(name: str) -> Callable[[F], F]:
+    """Decorator form of ``stage`` for a whole function."""
+
+    def decorate(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _profiler is None:
+                return fn(*args, **kwargs)
+            with _profiler.stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add ``n`` to counter ``name`` (a no-op outside a session)."""
+    if _profiler is not None:
+        _profiler.count(name, n)
+
+
+def count_file(name: str, path: str | Path) -> None:
+    """Add the size of the file at ``path`` to counter ``name``."""
+    if _profiler is not None:
+        _profiler.count(name, Path(path).stat().st_size)
+
+
+@contextmanager
+def profile_session(
+    report_path: str | Path | None = None,
+    pstats_path: str | Path | None = None,
+    memory: bool = False,
+) -> Iterator[Profiler]:
+    """Collect stage timings for the enclosed block.
+
+    On exit the JSON report is written to ``report_path`` and, if given, a
+    cProfile dump (readable with ``python -m pstats``) to ``pstats_path``. Both
+    are written even if the block raises.
+    """
+    global _profiler
+    if _profiler is not None:
+        raise RuntimeError("A profiling session is already running")
+
+    profiler = Profiler(memory)
+    cprofile = cProfile.Profile() if pstats_path else None
+    if memory:
+        tracemalloc.start()
+    _profiler = profiler
+    if cprofile:
+        cprofile.enable()
+    try:
+        yield profiler
+    finally:
+        if cprofile:
+            cprofile.disable()
+            cprofile.dump_stats(str(pstats_path))
+        _profiler = None
+        if memory:
+            tracemalloc.stop()
+        if report_path:
+            Path(report_path).write_text(json.dumps(profiler.report(), indent=2), encoding="utf-8")
@@ -0,0 +1,391 @@
+"""Local HTTP server for one country's planner and place data.
+
+The page is the sharded planner from ``generate_html_map``: the map, the zone
+sidebar and polygons. It fetches the markers in view from ``/places`` as the
+map moves, and a zone's GeoJSON shard when its sidebar list is opened. Next to
+the page the server answers:
+
+* ``/places?bbox=south,west,north,east&zoom=z``: the places inside the box as
+  compact rows (the marker-factory layout), looked up in a ``SpatialIndex``.
+  Below ``DETAIL_ZOOM`` at most one place per ``THIN_CELL_PX`` screen cell is
+  returned, so zoomed-out views stay small.
+* ``/kml``: the KML export, streamed with chunked transfer encoding.
+
+Everything is built in memory at start-up. Responses carry strong ETags (one
+per content encoding) and honour ``If-None-Match``; bodies are gzip- or, when
+the optional ``brotli`` package is installed, brotli-compressed when the
+client accepts it. Connections are kept alive (HTTP/1.1).
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .columnar import LocationStore
+from .html_map import (
+    EXPORTER_VERSION,
+    generate_html_map,
+    location_ids,
+    marker_rows,
+    nearby_places,
+)
+from .kml_exporter import EXPORTER_VERSION as KML_VERSION
+from .kml_exporter import WRITE_BUFFER_SIZE, iter_kml
+from .models import COUNTRY_CONFIGS
+from .popups import rows_json
+from .spatial import SpatialIndex
+from .zoning import zone_index_for
+
+if TYPE_CHECKING:
+    from .dedup import Deduplicator
+    from .geocoding import Geocoder
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+PAGE_NAME = "index.html"
+
+# From this zoom on, /places returns every place in the box
+DETAIL_ZOOM = 15
+
+# Below DETAIL_ZOOM, keep one place per square of this many screen pixels
+THIN_CELL_PX = 16
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+KML_TYPE = "application/vnd.google-earth.kml+xml"
+
+_COMPRESSIBLE = ("text/", "application/json", "application/geo+json", "application/javascript")
+
+
+def _etag(*parts: str) -> str:
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _encoded_etag(etag: str, encoding: str | None) -> str:
+    """Each content encoding is a different representation, so it gets its own tag."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick ``br``, ``gzip`` or no compression from an ``Accept-Encoding`` header."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str | None) -> bytes:
+    """``body`` in the given content encoding (deterministic, so ETags hold)."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+def _compressor(encoding: str | None) -> tuple[Callable, Callable] | None:
+    """``(compress, finish)`` functions of an incremental compressor, or None."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        return compressor.process, compressor.finish
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        return compressor.compress, compressor.flush
+    return None
+
+
+@dataclass
+class StaticFile:
+    body: bytes
+    content_type: str
+    etag: str
+
+
+@dataclass
+class MapSite:
+    """Everything the server hands out for one country, built once."""
+
+    country: str
+    locations: LocationStore
+    index: SpatialIndex
+    rows: list[str]  # JSON row per place, in ``index`` order
+    categories: list[list[str]]
+    files: dict[str, StaticFile]  # URL path -> page, shard or asset
+    version: str  # changes whenever the data or the exporters do
+
+    @classmethod
+    def build(
+        cls,
+        country: str,
+        csv_file: str,
+        directory: Path,
+        locations: LocationStore | None = None,
+        geocoder: "Geocoder | None" = None,
+        dedup: "Deduplicator | None" = None,
+        **map_options,
+    ) -> "MapSite":
+        """Write the sharded page for ``csv_file``'s places into ``directory``.
+
+        Pass ``locations`` to serve places that were already loaded; otherwise
+        ``csv_file`` is loaded with ``geocoder`` and ``dedup``. ``map_options``
+        (``nearby``, ``itineraries``, ...) are passed on to ``generate_html_map``;
+        the page is always sharded, with shared assets, and loads its markers
+        from ``/places``.
+        """
+        if locations is None:
+            from .loader import load_store
+
+            locations = load_store(csv_file, geocoder, dedup)
+        map_options.update(sharded=True, shared_assets=True, places_url="/places")
+        generate_html_map(csv_file, country, str(directory / PAGE_NAME), locations, **map_options)
+
+        zones = COUNTRY_CONFIGS.get(country, COUNTRY_CONFIGS["Singapore"]).zones
+        zone_locations = zone_index_for(country).bucket(locations)
+        zone_nearby = None
+        if map_options.get("nearby", 0) > 0:
+            zone_nearby = nearby_places(zones, zone_locations, map_options["nearby"])
+        # The same rows (and category numbering) as the page's shards
+        marker_table, categories = marker_rows(
+            zones, zone_locations, location_ids(zones, zone_locations), zone_nearby
+        )
+        rows = [rows_json(row) for row in marker_table]
+        ordered = [loc for zone in zones for loc in zone_locations[zone.id]]
+
+        # From the rows actually served, so geocoding and dedup are covered too
+        version = _etag(
+            country, "\n".join(rows), json.dumps(categories), EXPORTER_VERSION, KML_VERSION
+        )[1:-1]
+        files = {}
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                body = path.read_bytes()
+                content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+                if path.suffix == ".geojson":
+                    content_type = "application/geo+json"
+                files["/" + path.relative_to(directory).as_posix()] = StaticFile(
+                    body, content_type, _etag(hashlib.sha256(body).hexdigest())
+                )
+        return cls(
+            country,
+            locations,
+            SpatialIndex.from_locations(ordered),
+            rows,
+            categories,
+            files,
+            version,
+        )
+
+    def places(self, bbox: tuple[float, float, float, float], zoom: float | None) -> bytes:
+        """JSON body for ``/places``: rows inside ``bbox``, thinned below ``DETAIL_ZOOM``."""
+        found = self.index.bbox(*bbox)
+        total = len(found)
+        if zoom is not None and zoom < DETAIL_ZOOM and total > 1:
+            # One place per screen cell; 256 px span 360 degrees at zoom 0
+            cell_deg = 360 * THIN_CELL_PX / (256 * 2**zoom)
+            lats, lons = self.index.latitude[found], self.index.longitude[found]
+            cells = np.floor(lats / cell_deg).astype(np.int64) << 32
+            cells += np.floor(lons / cell_deg).astype(np.int64) & 0xFFFFFFFF
+            _, first = np.unique(cells, return_index=True)
+            found = found[np.sort(first)]
+        rows = self.rows
+        return (
+            f'{{"total":{total},"returned":{len(found)},'
+            f'"categories":{rows_json(self.categories)},'
+            f'"places":[{",".join(rows[i] for i in found.tolist())}]}}'
+        ).encode()
+
+
+def parse_bbox(text: str) -> tuple[float, float, float, float]:
+    """``"south,west,north,east"`` -> floats.
+
+    Raises:
+        ValueError: If it is not four finite numbers with south <= north and west <= east.
+    """
+    parts = [float(part) for part in text.split(",")]
+    if len(parts) != 4 or not all(np.isfinite(parts)):
+        raise ValueError("bbox must be four numbers: south,west,north,east")
+    south, west, north, east = parts
+    if south > north or west > east:
+        raise ValueError("bbox must be south,west,north,east with south <= north, west <= east")
+    return south, west, north, east
+
+
+def parse_zoom(text: str) -> float:
+    """Map zoom level, clamped to 0-24.
+
+    Raises:
+        ValueError: If it is not a finite number.
+    """
+    zoom = float(text)
+    if not np.isfinite(zoom):
+        raise ValueError("zoom must be a finite number")
+    return min(max(zoom, 0.0), 24.0)
+
+
+class MapRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the site's page, shards, ``/places`` and ``/kml``."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive; every response has a length or is chunked
+    # Headers and body go out in separate writes; without TCP_NODELAY, Nagle's algorithm
+    # and delayed ACKs hold each response back ~40 ms on a kept-alive connection
+    disable_nagle_algorithm = True
+    server: "MapServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url = urlsplit(self.path)
+        site = self.server.site
+        if url.path == "/places":
+            self.send_places(parse_qs(url.query))
+        elif url.path == "/kml":
+            self.send_kml()
+        elif (static := site.files.get("/" + PAGE_NAME if url.path == "/" else url.path)) is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+        else:
+            self.send_body(static.body, static.content_type, static.etag, cache=True)
+
+    def not_modified(self, etag: str) -> bool:
+        """Answer 304 if the client's ``If-None-Match`` covers ``etag``."""
+        tags = self.headers.get("If-None-Match")
+        if not tags:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in tags.split(",")}
+        if "*" not in candidates and etag not in candidates:
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return True
+
+    def send_body(self, body: bytes, content_type: str, etag: str, cache: bool = False) -> None:
+        """Send ``body``, compressed if worthwhile; ``cache`` keeps the compressed copy."""
+        encoding = None
+        if len(body) >= MIN_COMPRESS_BYTES and content_type.startswith(_COMPRESSIBLE):
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+        etag = _encoded_etag(etag, encoding)
+        if self.not_modified(etag):
+            return
+        if encoding:
+            body = (
+                self.server.compressed(etag, body, encoding) if cache else compress(body, encoding)
+            )
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")  # always revalidate; cheap with ETags
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_places(self, query: dict[str, list[str]]) -> None:
+        try:
+            bbox = parse_bbox(query["bbox"][0])
+            zoom = parse_zoom(query["zoom"][0]) if "zoom" in query else None
+        except (KeyError, ValueError) as exc:
+            self.send_error(HTTPStatus.BAD_REQUEST, f"Bad /places query: {exc}")
+            return
+        site = self.server.site
+        etag = _etag(site.version, repr(bbox), repr(zoom))
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+        # The tag is known before the query runs, so a revalidation costs no lookup
+        if self.not_modified(_encoded_etag(etag, encoding)):
+            return
+        self.send_body(site.places(bbox, zoom), "application/json", etag)
+
+    def send_kml(self) -> None:
+        site = self.server.site
+        encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+        etag = _encoded_etag(_etag(site.version, "kml"), encoding)
+        if self.not_modified(etag):
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", KML_TYPE)
+        self.send_header(
+            "Content-Disposition", f'attachment; filename="{site.country}_Trip_Mobile.kml"'
+        )
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        for chunk in _encode_chunks(iter_kml(site.locations, site.country), encoding):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _encode_chunks(pieces: Iterable[str], encoding: str | None) -> Iterator[bytes]:
+    """Batch text pieces into ~``WRITE_BUFFER_SIZE`` byte chunks, compressed on the fly."""
+    compressor = _compressor(encoding)
+    buffer: list[str] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= WRITE_BUFFER_SIZE:
+            data = "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+            if compressor is not None:
+                data = compressor[0](data)
+            if data:
+                yield data
+    data = "".join(buffer).encode("utf-8")
+    if compressor is not None:
+        data = compressor[0](data) + compressor[1]()
+    if data:
+        yield data
+
+
+class MapServer(ThreadingHTTPServer):
+    """Threaded server for one ``MapSite``; compressed static bodies are cached."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], site: MapSite, verbose: bool = False) -> None:
+        super().__init__(address, MapRequestHandler)
+        self.site = site
+        self.verbose = verbose
+        self._compressed: dict[str, bytes] = {}
+
+    def compressed(self, etag: str, body: bytes, encoding: str) -> bytes:
+        """``body`` in ``encoding``, compressed once per representation (``etag``)."""
+        cached = self._compressed.get(etag)
+        if cached is None:
+            cached = self._compressed.setdefault(etag, compress(body, encoding))
+        return cached
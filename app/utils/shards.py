@@ -0,0 +1,168 @@
+"""Per-zone GeoJSON shards for the lazily loaded HTML planner.
+
+In sharded mode the HTML page carries only the map, the zone list and the zone
+polygons. Each zone's places are written to ``<page>_shards/<zone id>.geojson``
+and fetched by the page the first time the zone is expanded in the sidebar or
+scrolled into view, so the page size no longer grows with the number of places.
+
+Browsers refuse ``fetch`` from ``file://`` pages, so sharded pages have to be
+opened through a web server.
+"""
+
+import json
+from collections.abc import Collection, Sequence
+from pathlib import Path
+
+from folium import MacroElement
+from jinja2 import Template
+
+from . import profiling
+from .models import Location, Zone
+
+SHARD_SUFFIX = ".geojson"
+
+# Coordinates are written with 6 decimals (~0.1 m)
+_PRECISION = 6
+
+
+def shard_directory(output_file: str | Path) -> Path:
+    """Folder the shards of ``output_file`` are written to."""
+    output = Path(output_file)
+    return output.with_name(f"{output.stem}_shards")
+
+
+def zone_features(
+    locations: Sequence[Location],
+    ids: Sequence[str],
+    category_index: dict[str, int],
+    nearby: Sequence[list[tuple[str, int]]] | None = None,
+) -> dict:
+    """GeoJSON FeatureCollection of one zone's places.
+
+    Properties are kept short: ``id``, ``name``, ``cat`` (index into the page's
+    category table), ``notes``, ``address`` and, if given, ``nearby``.
+    """
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [
+                    round(loc.longitude, _PRECISION),
+                    round(loc.latitude, _PRECISION),
+                ],
+            },
+            "properties": {
+                "id": loc_id,
+                "name": loc.name,
+                "cat": category_index[loc.category],
+                "notes": loc.notes,
+                "address": loc.address,
+            },
+        }
+        for loc, loc_id in zip(locations, ids, strict=True)
+    ]
+    if nearby is not None:
+        for feature, places in zip(features, nearby, strict=True):
+            feature["properties"]["nearby"] = places
+    return {"type": "FeatureCollection", "features": features}
+
+
+@profiling.staged("shards")
+def write_zone_shards(
+    output_file: str | Path,
+    zones: Sequence[Zone],
+    zone_locations: dict[str, list[Location]],
+    zone_ids: dict[str, list[str]],
+    category_index: dict[str, int],
+    zone_nearby: dict[str, list[list[tuple[str, int]]]] | None = None,
+    only: Collection[str] | None = None,
+) -> dict[str, dict]:
+    """Write one GeoJSON file per non-empty zone next to ``output_file``.
+
+    Shards left over from an earlier build of the same page are removed. With
+    ``only``, just those zones are written; the existing shards of the other
+    zones are taken to be current and kept.
+
+    Returns:
+        Zone ID -> ``{"url": ..., "bounds": [[south, west], [north, east]]}``,
+        with ``url`` relative to the page.
+    """
+    directory = shard_directory(output_file)
+    directory.mkdir(parents=True, exist_ok=True)
+    keep = set()
+    if only is not None:
+        keep = {zone.id for zone in zones if zone_locations[zone.id]} - set(only)
+    for stale in directory.glob(f"*{SHARD_SUFFIX}"):
+        if stale.stem not in keep:
+            stale.unlink()
+
+    shards: dict[str, dict] = {}
+    for zone in zones:
+        locations = zone_locations[zone.id]
+        if not locations:
+            continue
+        path = directory / f"{zone.id}{SHARD_SUFFIX}"
+        if zone.id not in keep or not path.exists():
+            collection = zone_features(
+                locations,
+                zone_ids[zone.id],
+                category_index,
+                zone_nearby[zone.id] if zone_nearby else None,
+            )
+            path.write_text(
+                json.dumps(collection, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+            )
+            profiling.count_file("bytes_written", path)
+        lats = [loc.latitude for loc in locations]
+        lons = [loc.longitude for loc in locations]
+        shards[zone.id] = {
+            "url": f"{directory.name}/{path.name}",
+            "bounds": [[min(lats), min(lons)], [max(lats), max(lons)]],
+        }
+    return shards
+
+
+class ZoneShards(MacroElement):
+    """Hands the shard table and marker factory to the sidebar script."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        registerShards(
+            {{ this.layer }},
+            {{ this.marker_factory }},
+            {{ this.shards|tojson }},
+            {{ this.categories|tojson }},
+            {{ this.places_url|tojson }}
+        );
+        {% endmacro %}
+        """
+    )
+
+    def __init__(
+        self,
+        layer: str,
+        marker_factory: str,
+        shards: dict[str, dict],
+        categories: list[list[str]],
+        places_url: str | None = None,
+    ) -> None:
+        """
+        Args:
+            layer: JS variable of the layer that loaded markers are added to.
+            marker_factory: JS expression for a function building a marker from
+                ``[lat, lon, name, category index, notes, address, location ID]``.
+            shards: As returned by ``write_zone_shards``.
+            categories: ``[category, color, icon]`` per category index.
+            places_url: Endpoint answering ``?bbox=...&zoom=...`` with the places
+                in view (see ``server.MapSite.places``), if the page is served;
+                shards are then only fetched for the sidebar lists.
+        """
+        super().__init__()
+        self._name = "ZoneShards"
+        self.layer = layer
+        self.marker_factory = marker_factory
+        self.shards = shards
+        self.categories = categories
+        self.places_url = places_url
@@ -0,0 +1,409 @@
+"""Planner sidebar: a Jinja template compiled once per process, plus its CSS/JS.
+
+The stylesheet and script are plain constants so they can either be inlined
+into every page or written once as content-hashed files that many pages share.
+"""
+
+import hashlib
+import os
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+from folium import MacroElement
+from jinja2 import Template
+
+from .models import Location, Zone
+
+SIDEBAR_CSS = """\
+#map-sidebar {
+    position: absolute;
+    top: 10px;
+    right: 10px;
+    width: 280px;
+    max-height: 90vh;
+    background-color: white;
+    z-index: 9999;
+    overflow-y: auto;
+    box-shadow: 0 4px 6px rgba(0,0,0,0.3);
+    border-radius: 8px;
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    padding: 10px;
+}
+.sidebar-header {
+    font-size: 18px;
+    font-weight: bold;
+    margin-bottom: 10px;
+    color: #2c3e50;
+    border-bottom: 2px solid #ecf0f1;
+    padding-bottom: 5px;
+}
+.zone-container {
+    margin-bottom: 8px;
+    border: 1px solid #eee;
+    border-radius: 5px;
+    overflow: hidden;
+}
+.zone-title {
+    padding: 10px;
+    cursor: pointer;
+    font-weight: 600;
+    font-size: 14px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    color: white;
+    transition: all 0.3s ease;
+}
+.zone-title:hover {
+    transform: translateX(2px);
+    box-shadow: inset 0 -2px 4px rgba(0,0,0,0.1);
+}
+.location-list {
+    display: none;
+    padding: 5px 0;
+    background-color: #fff;
+}
+.location-item {
+    padding: 6px 15px;
+    font-size: 13px;
+    cursor: pointer;
+    color: #555;
+    border-left: 3px solid transparent;
+}
+.location-item:hover {
+    background-color: #f0f8ff;
+    color: #000;
+    border-left: 3px solid #3498db;
+}
+.zone-dot {
+    height: 10px;
+    width: 10px;
+    border-radius: 50%;
+    display: inline-block;
+    margin-right: 8px;
+}
+#map-sidebar::-webkit-scrollbar { width: 6px; }
+#map-sidebar::-webkit-scrollbar-thumb { background: #ccc; border-radius: 3px; }
+"""
+
+SIDEBAR_JS = """\
+var mapInstance = null;
+var markerIndex = {};    // location ID -> L.Marker
+var zonePolygons = [];   // zone boundary layers, restyled on zoom
+var markerClusters = []; // cluster groups that may be hiding a marker
+var zoneShards = {};     // sharded pages: zone ID -> {url, bounds}, places fetched on demand
+var shardLayer = null;
+var shardMarker = null;
+var shardCategories = [];
+var placesUrl = null;    // served pages: endpoint answering with the places in a bbox
+
+// Called once by the page script after the map, markers and polygons exist
+function registerPlanner(map, markers, polygons, clusters) {
+    mapInstance = map;
+    for (var id in markers) {
+        markerIndex[id] = markers[id];
+    }
+    zonePolygons = polygons;
+    markerClusters = clusters;
+    initMapListeners();
+}
+
+// Markers created client-side (clustered mode) register themselves as they are built
+function registerMarker(id, marker) {
+    markerIndex[id] = marker;
+}
+
+function openMarker(marker) {
+    for (var i = 0; i < markerClusters.length; i++) {
+        if (markerClusters[i].hasLayer(marker)) {
+            markerClusters[i].zoomToShowLayer(marker, function() { marker.openPopup(); });
+            return;
+        }
+    }
+    marker.openPopup();
+}
+
+function openLocation(id, lat, lon, zoom) {
+    if (!mapInstance) return;
+    var marker = markerIndex[id];
+    if (marker) {
+        mapInstance.once('moveend', function() { openMarker(marker); });
+    }
+    mapInstance.flyTo([lat, lon], zoom, {
+        animate: true,
+        duration: 1.5
+    });
+}
+
+// Sharded pages: fetch each zone's places when it is opened or scrolled into view.
+// Served pages instead fetch the markers in view from placesUrl as the map moves,
+// and a zone's shard only when its list is opened.
+function registerShards(layer, markerFactory, shards, categories, places) {
+    shardLayer = layer;
+    shardMarker = markerFactory;
+    zoneShards = shards;
+    shardCategories = categories;
+    placesUrl = places || null;
+    var loadVisible = placesUrl ? loadVisiblePlaces : loadVisibleZones;
+    mapInstance.on('moveend', loadVisible);
+    loadVisible();
+}
+
+function loadVisiblePlaces() {
+    var view = mapInstance.getBounds();
+    var bbox = [view.getSouth(), view.getWest(), view.getNorth(), view.getEast()].join(",");
+    fetch(placesUrl + "?bbox=" + bbox + "&zoom=" + mapInstance.getZoom())
+        .then(function(response) {
+            if (!response.ok) throw new Error(response.status + " " + placesUrl);
+            return response.json();
+        })
+        .then(function(result) { addMarkers(result.places); })
+        .catch(function(error) { console.error("Could not load places:", error); });
+}
+
+// Adds markers for rows not on the map yet (rows: the marker factory's layout)
+function addMarkers(rows) {
+    var markers = [];
+    rows.forEach(function(row) {
+        if (!markerIndex[row[6]]) markers.push(shardMarker(row));
+    });
+    if (shardLayer.addLayers) {
+        shardLayer.addLayers(markers);
+    } else {
+        markers.forEach(function(marker) { shardLayer.addLayer(marker); });
+    }
+}
+
+function loadVisibleZones() {
+    var view = mapInstance.getBounds();
+    for (var zoneId in zoneShards) {
+        if (!zoneShards[zoneId].requested && view.intersects(zoneShards[zoneId].bounds)) {
+            loadZone(zoneId);
+        }
+    }
+}
+
+function loadZone(zoneId) {
+    var shard = zoneShards[zoneId];
+    if (!shard || shard.requested) return;
+    shard.requested = true;
+    fetch(shard.url)
+        .then(function(response) {
+            if (!response.ok) throw new Error(response.status + " " + shard.url);
+            return response.json();
+        })
+        .then(function(collection) { addZonePlaces(zoneId, collection.features); })
+        .catch(function(error) {
+            shard.requested = false;  // retry on the next open or pan
+            console.error("Could not load zone " + zoneId + ":", error);
+        });
+}
+
+function addZonePlaces(zoneId, features) {
+    var rows = [];
+    var items = document.createDocumentFragment();
+    features.forEach(function(feature) {
+        var p = feature.properties;
+        var lat = feature.geometry.coordinates[1], lon = feature.geometry.coordinates[0];
+        rows.push([lat, lon, p.name, p.cat, p.notes, p.address, p.id, p.nearby]);
+
+        var item = document.createElement("div");
+        item.className = "location-item";
+        item.onclick = function() { openLocation(p.id, lat, lon, 18); };
+        item.appendChild(document.createTextNode("📍 " + p.name + " "));
+        var category = document.createElement("span");
+        category.style.cssText = "font-size:10px; color:#aaa";
+        category.textContent = "(" + shardCategories[p.cat][0] + ")";
+        item.appendChild(category);
+        items.appendChild(item);
+    });
+    addMarkers(rows);
+    document.getElementById("list-" + zoneId).appendChild(items);
+}
+
+function flyToLoc(lat, lon, zoom, listId) {
+    if (mapInstance) {
+        if (listId) loadZone(listId);
+
+        mapInstance.flyTo([lat, lon], zoom, {
+            animate: true,
+            duration: 1.5
+        });
+
+        if (listId) {
+            var list = document.getElementById("list-" + listId);
+            var allLists = document.getElementsByClassName("location-list");
+            for (var i=0; i<allLists.length; i++) {
+                if (allLists[i].id !== "list-" + listId) {
+                    allLists[i].style.display = "none";
+                }
+            }
+            if (list.style.display === "block") {
+                list.style.display = "none";
+            } else {
+                list.style.display = "block";
+            }
+        }
+    }
+}
+
+function restylePolygons() {
+    var newOpacity = (mapInstance.getZoom() >= 15) ? 0.1 : 0.45;
+    for (var i = 0; i < zonePolygons.length; i++) {
+        zonePolygons[i].setStyle({fillOpacity: newOpacity});
+    }
+}
+
+function initMapListeners() {
+    mapInstance.on('zoomend', restylePolygons);
+    // Trigger once to set initial state
+    restylePolygons();
+}
+"""
+
+SIDEBAR_TEMPLATE = """
+{% macro html(this, kwargs) %}
+<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  {%- if this.css_href %}
+  <link rel="stylesheet" href="{{ this.css_href }}">
+  {%- else %}
+  <style>
+{{ this.css }}
+  </style>
+  {%- endif %}
+</head>
+<body>
+
+<div id="map-sidebar">
+    <div class="sidebar-header">🌍 Trip Planner</div>
+
+    {% for zone in this.zones %}
+    {% set locations = this.zone_locations[zone.id] %}
+    <div class="zone-container" style="border-left: 4px solid {{ zone.color }};">
+        <div class="zone-title" style="background: linear-gradient(90deg, {{ zone.color }}dd, {{ zone.color }}99);" onclick="flyToLoc({{ zone.center[0] }}, {{ zone.center[1] }}, {{ zone.zoom }}, '{{ zone.id }}')">
+            <span><span class="zone-dot" style="background-color: white;"></span>{{ zone.name }} ({{ locations|length }})</span>
+            <span style="font-size:10px;">▼</span>
+        </div>
+
+        <div class="location-list" id="list-{{ zone.id }}">
+            <div style="padding: 8px 15px; font-size: 12px; color: #666; font-style: italic;">{{ zone.description }}</div>
+            {% if not this.lazy %}
+            {% for loc in locations %}
+            <div class="location-item" onclick="openLocation('{{ this.zone_ids[zone.id][loop.index0] }}', {{ loc.latitude }}, {{ loc.longitude }}, 18)">
+                📍 {{ loc.name }} <span style="font-size:10px; color:#aaa">({{ loc.category }})</span>
+            </div>
+            {% endfor %}
+            {% endif %}
+        </div>
+    </div>
+    {% endfor %}
+
+    <div style="font-size:11px; color:#999; margin-top:10px; text-align:center;">
+        Click headers to zoom.<br>Click items to see pin.
+    </div>
+</div>
+
+{% if this.js_href -%}
+<script src="{{ this.js_href }}"></script>
+{%- else -%}
+<script>
+{{ this.js }}
+</script>
+{%- endif %}
+</body>
+</html>
+{% endmacro %}
+
+{% macro script(this, kwargs) %}
+registerPlanner(
+    {{ this.map_name }},
+    {
+    {%- for loc_id, data in this.marker_data.items() if data.marker %}
+        {{ loc_id|tojson }}: {{ data.marker }},
+    {%- endfor %}
+    },
+    [{{ this.polygon_vars|join(", ") }}],
+    [{{ this.cluster_vars|join(", ") }}]
+);
+{% endmacro %}
+"""
+
+
+class Sidebar(MacroElement):
+    """Zone list with fly-to links, rendered into the page body."""
+
+    # Parsed and compiled once, at import
+    _template = Template(SIDEBAR_TEMPLATE)
+
+    css = SIDEBAR_CSS
+    js = SIDEBAR_JS
+
+    def __init__(
+        self,
+        zones: Sequence[Zone],
+        zone_locations: Mapping[str, Sequence[Location]],
+        marker_data: dict[str, dict[str, float | str]],
+        zone_ids: dict[str, list[str]],
+        map_name: str,
+        polygon_vars: list[str] | None = None,
+        cluster_vars: list[str] | None = None,
+        lazy: bool = False,
+        css_href: str | None = None,
+        js_href: str | None = None,
+    ) -> None:
+        """
+        Args:
+            zones: Zones in sidebar order.
+            zone_locations: Zone ID -> the locations this build placed in it.
+            marker_data: Location ID -> name/lat/lon, plus ``marker``, the JS
+                variable of its marker when markers are emitted individually.
+            zone_ids: Zone ID -> location IDs, parallel to ``zone_locations``.
+            map_name: JS variable of the folium map.
+            polygon_vars: JS variables of the zone polygons.
+            cluster_vars: JS variables of marker cluster groups.
+            lazy: Leave the location lists empty; they are filled in as zone
+                shards are fetched (see ``shards.ZoneShards``).
+            css_href: Link this stylesheet instead of inlining the CSS.
+            js_href: Load this script instead of inlining the JS.
+        """
+        super().__init__()
+        self.zones = zones
+        self.zone_locations = zone_locations
+        self.marker_data = marker_data
+        self.zone_ids = zone_ids
+        self.map_name = map_name
+        self.polygon_vars = polygon_vars or []
+        self.cluster_vars = cluster_vars or []
+        self.lazy = lazy
+        self.css_href = css_href
+        self.js_href = js_href
+
+
+def asset_name(stem: str, content: str, suffix: str) -> str:
+    """Content-addressed file name, e.g. ``sidebar.3f2a9c1b.css``."""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:8]
+    return f"{stem}.{digest}{suffix}"
+
+
+def write_shared_assets(directory: str | Path) -> tuple[str, str]:
+    """Write the sidebar CSS and JS into ``directory`` once; return their file names.
+
+    Names carry a content hash, so pages built by different exporter versions
+    never pick up each other's assets and files that already exist are reused.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    names = []
+    for content, suffix in ((SIDEBAR_CSS, ".css"), (SIDEBAR_JS, ".js")):
+        name = asset_name("sidebar", content, suffix)
+        path = directory / name
+        if not path.exists():
+            # Per process: batch workers may write the same asset at the same time
+            tmp = path.with_suffix(f"{suffix}.{os.getpid()}.tmp")
+            tmp.write_text(content, encoding="utf-8")
+            tmp.replace(path)
+        names.append(name)
+    return names[0], names[1]
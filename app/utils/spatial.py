@@ -0,0 +1,196 @@
+"""Grid index for nearest-neighbour, radius and bounding-box queries over places.
+
+Points are bucketed into a uniform latitude/longitude grid and stored sorted by
+cell, so each grid row of a query window is one contiguous slice of the point
+arrays. Candidates from those slices are then filtered with vectorized
+haversine distances, which keeps every answer exact.
+
+The grid does not wrap around the antimeridian; a trip dataset never spans it.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from .columnar import LocationStore
+from .models import Location
+
+# Mean Earth radius (IUGG), in metres
+EARTH_RADIUS_M = 6_371_008.8
+
+# Aim for about this many points per grid cell
+_POINTS_PER_CELL = 8
+
+# Keep the grid (and its offset table) bounded for very large or very spread-out datasets
+_MAX_CELLS = 1 << 22
+
+
+def haversine_m(
+    lat: float | np.ndarray, lon: float | np.ndarray, lats: np.ndarray, lons: np.ndarray
+) -> np.ndarray:
+    """Great-circle distance in metres from ``(lat, lon)`` to each of ``lats``/``lons``."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Static grid over a set of points; query results are indices into them."""
+
+    def __init__(
+        self, latitude: np.ndarray, longitude: np.ndarray, cell_deg: float | None = None
+    ) -> None:
+        """
+        Args:
+            latitude: Point latitudes.
+            longitude: Point longitudes.
+            cell_deg: Grid cell size in degrees; picked from the point density if omitted.
+        """
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        count = len(self.latitude)
+
+        if count:
+            self.min_lat, self.min_lon = float(self.latitude.min()), float(self.longitude.min())
+            span_lat = float(self.latitude.max()) - self.min_lat
+            span_lon = float(self.longitude.max()) - self.min_lon
+        else:
+            self.min_lat = self.min_lon = span_lat = span_lon = 0.0
+
+        if cell_deg is None:
+            area = max(span_lat, 1e-6) * max(span_lon, 1e-6)
+            cell_deg = float(np.sqrt(area * _POINTS_PER_CELL / max(count, 1)))
+        cell_deg = max(cell_deg, np.sqrt(max(span_lat, 1e-6) * max(span_lon, 1e-6) / _MAX_CELLS))
+        self.cell_deg = cell_deg
+        self.rows = int(span_lat / cell_deg) + 1
+        self.cols = int(span_lon / cell_deg) + 1
+
+        keys = self._row(self.latitude) * self.cols + self._col(self.longitude)
+        self.order = np.argsort(keys, kind="stable")
+        # cell_start[key]:cell_start[key + 1] is the slice of ``order`` inside that cell
+        self.cell_start = np.searchsorted(
+            keys[self.order], np.arange(self.rows * self.cols + 1), side="left"
+        )
+        self._lat_sorted = self.latitude[self.order]
+        self._lon_sorted = self.longitude[self.order]
+
+    @classmethod
+    def from_locations(
+        cls, locations: Sequence[Location], cell_deg: float | None = None
+    ) -> "SpatialIndex":
+        """Index a loaded dataset; indices refer to positions in ``locations``."""
+        if isinstance(locations, LocationStore):
+            return cls(locations.latitude, locations.longitude, cell_deg)
+        count = len(locations)
+        lats = np.fromiter((loc.latitude for loc in locations), np.float64, count)
+        lons = np.fromiter((loc.longitude for loc in locations), np.float64, count)
+        return cls(lats, lons, cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    def _row(self, lat: float | np.ndarray) -> np.ndarray:
+        return np.clip(
+            np.floor_divide(np.subtract(lat, self.min_lat), self.cell_deg).astype(np.int64),
+            0,
+            self.rows - 1,
+        )
+
+    def _col(self, lon: float | np.ndarray) -> np.ndarray:
+        return np.clip(
+            np.floor_divide(np.subtract(lon, self.min_lon), self.cell_deg).astype(np.int64),
+            0,
+            self.cols - 1,
+        )
+
+    def _window(self, row0: int, row1: int, col0: int, col1: int) -> np.ndarray:
+        """Positions (in sorted order) of all points in the given cell rectangle."""
+        row0, row1 = max(row0, 0), min(row1, self.rows - 1)
+        col0, col1 = max(col0, 0), min(col1, self.cols - 1)
+        if row0 > row1 or col0 > col1:
+            return np.empty(0, dtype=np.int64)
+        rows = np.arange(row0, row1 + 1)
+        starts = self.cell_start[rows * self.cols + col0]
+        ends = self.cell_start[rows * self.cols + col1 + 1]
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts, ends, strict=True)])
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Indices of the points inside the box (edges included), in index order."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        pos = self._window(
+            int(self._row(min_lat)),
+            int(self._row(max_lat)),
+            int(self._col(min_lon)),
+            int(self._col(max_lon)),
+        )
+        lats, lons = self._lat_sorted[pos], self._lon_sorted[pos]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return np.sort(self.order[pos[inside]])
+
+    def radius(self, lat: float, lon: float, meters: float) -> tuple[np.ndarray, np.ndarray]:
+        """Points within ``meters`` of ``(lat, lon)``.
+
+        Returns:
+            ``(indices, distances)``, nearest first.
+        """
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        dlat = np.degrees(meters / EARTH_RADIUS_M)
+        max_abs_lat = min(abs(lat) + dlat, 90.0)
+        cos_lat = np.cos(np.radians(max_abs_lat))
+        dlon = 180.0 if cos_lat < 1e-9 else min(dlat / cos_lat, 180.0)
+        pos = self._window(
+            int(self._row(lat - dlat)),
+            int(self._row(lat + dlat)),
+            int(self._col(lon - dlon)),
+            int(self._col(lon + dlon)),
+        )
+        distances = haversine_m(lat, lon, self._lat_sorted[pos], self._lon_sorted[pos])
+        keep = np.flatnonzero(distances <= meters)
+        keep = keep[np.argsort(distances[keep], kind="stable")]
+        return self.order[pos[keep]], distances[keep]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """The ``k`` points nearest to ``(lat, lon)``.
+
+        Rings of cells around the query are added until at least ``k`` candidates
+        are found; a radius query out to the k-th candidate's distance then
+        yields the exact answer.
+
+        Returns:
+            ``(indices, distances)``, nearest first.
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        row, col = int(self._row(lat)), int(self._col(lon))
+        reach = 0
+        while True:
+            pos = self._window(row - reach, row + reach, col - reach, col + reach)
+            if len(pos) >= k or reach > max(self.rows, self.cols):
+                break
+            reach = max(1, reach * 2)
+        distances = haversine_m(lat, lon, self._lat_sorted[pos], self._lon_sorted[pos])
+        kth = float(np.partition(distances, k - 1)[k - 1])
+        indices, distances = self.radius(lat, lon, kth)
+        return indices[:k], distances[:k]
+
+    def neighbours(
+        self, k: int, meters: float | None = None
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """For every point, its ``k`` nearest other points (optionally within ``meters``)."""
+        result = []
+        for i in range(len(self)):
+            lat, lon = float(self.latitude[i]), float(self.longitude[i])
+            if meters is None:
+                indices, distances = self.nearest(lat, lon, k + 1)
+            else:
+                indices, distances = self.radius(lat, lon, meters)
+            others = indices != i
+            result.append((indices[others][:k], distances[others][:k]))
+        return result
@@ -0,0 +1,67 @@
+"""Category styles shared by every exporter.
+
+The trip CSVs use six categories. Each has a marker color and glyphicon for the
+HTML planner and a pin color for KML/KMZ. The same colors (as ``#rrggbb``) are
+used for GeoJSON and GPX. Any other category gets its marker from keywords in its
+name ("museum" looks like Culture) and the "Unique" pin in KML.
+"""
+
+from dataclasses import dataclass
+from functools import cache
+from types import MappingProxyType
+
+
+@dataclass(frozen=True)
+class CategoryStyle:
+    """How places of one category are drawn."""
+
+    style_id: str  # KML <Style> id
+    marker_color: str  # awesome-markers color name
+    icon: str  # glyphicon name
+    kml_color: str  # aabbggrr
+
+    @property
+    def hex_color(self) -> str:
+        """The pin color as ``#rrggbb``."""
+        return f"#{self.kml_color[6:8]}{self.kml_color[4:6]}{self.kml_color[2:4]}"
+
+
+# In the order the KML <Style> definitions are written
+CATEGORY_STYLES = MappingProxyType(
+    {
+        "Food": CategoryStyle("Food", "red", "cutlery", "ff5252ff"),  # Red
+        "Sweet Tooth": CategoryStyle("Sweet_Tooth", "red", "cutlery", "ff99ccff"),  # Pink
+        "Bar": CategoryStyle("Bar", "darkred", "glass", "ff000099"),  # Dark Red
+        "Nature": CategoryStyle("Nature", "green", "tree-deciduous", "ff57bb8a"),  # Green
+        "Culture": CategoryStyle("Culture", "orange", "star", "ffffcc33"),  # Orange/Yellow
+        "Unique": CategoryStyle("Unique", "purple", "star", "ffba68c8"),  # Purple
+    }
+)
+
+# (keywords, marker color, glyphicon) for categories outside the table, first match wins
+_MARKER_KEYWORDS = (
+    (("food", "sweet"), "red", "cutlery"),
+    (("bar",), "darkred", "glass"),
+    (("nature",), "green", "tree-deciduous"),
+    (("culture", "museum"), "orange", "star"),
+    (("unique",), "purple", "star"),
+)
+
+
+def marker_icon(category: str) -> tuple[str, str]:
+    """Marker color and glyphicon for ``category``, matched on keywords."""
+    text = category.lower()
+    for keywords, color, icon in _MARKER_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return color, icon
+    return "blue", "info-sign"
+
+
+@cache
+def style_for(category: str) -> CategoryStyle:
+    """The style of ``category``; unknown categories use the "Unique" pin."""
+    style = CATEGORY_STYLES.get(category)
+    if style is not None:
+        return style
+    unique = CATEGORY_STYLES["Unique"]
+    return CategoryStyle(unique.style_id, *marker_icon(category), unique.kml_color)
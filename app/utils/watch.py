@@ -0,0 +1,153 @@
+"""Polling file watcher and row snapshots for incremental rebuilds.
+
+``watch_files`` polls the places CSVs and reports a file once it has stopped
+changing for a short debounce period, since editors and spreadsheet apps
+often save in several writes. A ``Snapshot`` records what the last build was
+made from (the rows in CSV order, and the rows and location IDs of each zone),
+so ``diff`` can tell which outputs and zones an edit actually touched.
+"""
+
+import os
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .html_map import location_ids
+from .models import Location, Zone
+
+# Seconds between polls, and how long a changed file must stay unchanged
+POLL_INTERVAL = 0.2
+DEBOUNCE = 0.3
+
+# (mtime in ns, size), or None while the file is missing (e.g. mid-save)
+FileStamp = tuple[int, int] | None
+
+Row = tuple[str, float, float, str, str, str]
+
+
+def file_stamp(path: Path) -> FileStamp:
+    """Cheap change marker for ``path``."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def watch_files(
+    paths: Iterable[Path],
+    on_change: Callable[[list[Path]], None],
+    interval: float = POLL_INTERVAL,
+    debounce: float = DEBOUNCE,
+    stop: Callable[[], bool] | None = None,
+) -> None:
+    """Call ``on_change`` with the files that changed, once each has settled.
+
+    Runs until ``stop`` returns True (or forever). A file that is missing is
+    not reported until it reappears, so save-by-rename looks like one change.
+    """
+    stamps = {path: file_stamp(path) for path in paths}
+    pending: dict[Path, float] = {}  # path -> when it last changed
+    while not (stop and stop()):
+        time.sleep(interval)
+        now = time.monotonic()
+        for path, previous in stamps.items():
+            current = file_stamp(path)
+            if current != previous:
+                stamps[path] = current
+                pending[path] = now
+        settled = [
+            path
+            for path, changed in pending.items()
+            if now - changed >= debounce and stamps[path] is not None
+        ]
+        if settled:
+            for path in settled:
+                del pending[path]
+            on_change(settled)
+
+
+def _row(loc: Location) -> Row:
+    return (loc.name, loc.latitude, loc.longitude, loc.category, loc.address, loc.notes)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """What one build of a country was made from."""
+
+    rows: tuple[Row, ...]
+    # Zone ID -> (rows, location IDs) of the places the build put in it
+    zones: dict[str, tuple[tuple[Row, ...], tuple[str, ...]]]
+    # Categories in order of first appearance, which numbers them on the page
+    categories: tuple[str, ...]
+    # The CSV's Zone column, which only the extra export formats copy
+    zone_labels: tuple[str, ...] = ()
+
+    @classmethod
+    def of(
+        cls,
+        locations: Iterable[Location],
+        zones: Sequence[Zone],
+        zone_locations: dict[str, list[Location]],
+    ) -> "Snapshot":
+        """Snapshot ``locations`` as bucketed into ``zone_locations`` for a build."""
+        zone_ids = location_ids(zones, zone_locations)
+        snapshot_zones = {}
+        categories: dict[str, None] = {}
+        for zone in zones:
+            for loc in zone_locations[zone.id]:
+                categories.setdefault(loc.category)
+            snapshot_zones[zone.id] = (
+                tuple(_row(loc) for loc in zone_locations[zone.id]),
+                tuple(zone_ids[zone.id]),
+            )
+        rows = tuple(_row(loc) for loc in locations)
+        labels = tuple(loc.zone for loc in locations)
+        return cls(rows, snapshot_zones, tuple(categories), labels)
+
+
+@dataclass
+class RowDiff:
+    """How a new snapshot differs from the previous one."""
+
+    added: int = 0
+    removed: int = 0
+    rows_changed: bool = False  # rows added, removed, edited or reordered
+    labels_changed: bool = False  # some row's Zone column was edited
+    zones: set[str] = field(default_factory=set)  # zone IDs whose page content changed
+
+    def summary(self, zones: Sequence[Zone] = ()) -> str:
+        """E.g. "+1/-1 row(s) in Chinatown, Marina Bay"."""
+        names = [zone.name for zone in zones if zone.id in self.zones] or sorted(self.zones)
+        text = f"+{self.added}/-{self.removed} row(s)"
+        if not (self.added or self.removed):
+            if self.rows_changed:
+                text = "rows reordered"
+            else:
+                text = "zones reassigned" if self.zones else "Zone column edited"
+        return f"{text} in {', '.join(names)}" if names else text
+
+
+def diff(old: Snapshot | None, new: Snapshot) -> RowDiff:
+    """Compare two snapshots; everything counts as changed when there is no ``old``."""
+    if old is None:
+        return RowDiff(len(new.rows), 0, True, True, set(new.zones))
+    added = Counter(new.rows)
+    added.subtract(old.rows)
+    if old.categories != new.categories:
+        zones = set(old.zones) | set(new.zones)
+    else:
+        zones = {
+            zone
+            for zone in old.zones.keys() | new.zones.keys()
+            if old.zones.get(zone) != new.zones.get(zone)
+        }
+    return RowDiff(
+        added=sum(n for n in added.values() if n > 0),
+        removed=-sum(n for n in added.values() if n < 0),
+        rows_changed=old.rows != new.rows,
+        labels_changed=old.zone_labels != new.zone_labels,
+        zones=zones,
+    )
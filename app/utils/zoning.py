@@ -0,0 +1,140 @@
+"""Assign locations to zones by name, falling back to the zone polygons.
+
+Rows whose ``Zone`` column names a known zone (case-insensitively) keep that
+zone. Blank or unknown names are placed geometrically: a bounding-box prefilter
+narrows the candidates for each zone polygon and a vectorized ray-casting test
+decides containment. Anything still unplaced goes to the country's last zone,
+which is the catch-all ("Worth the Travel", "Other Regions", ...).
+
+Results are returned per call; the ``Zone`` objects in ``COUNTRY_CONFIGS`` are
+immutable and shared by every build in the process.
+"""
+
+from collections.abc import Sequence
+from functools import cache
+
+import numpy as np
+
+from .columnar import LocationStore
+from .models import COUNTRY_CONFIGS, Location, Zone
+
+UNASSIGNED = -1
+
+
+def points_in_polygon(lats: np.ndarray, lons: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Vectorized even-odd ray casting.
+
+    Args:
+        lats: Point latitudes.
+        lons: Point longitudes.
+        polygon: ``(n, 2)`` array of ``[lat, lon]`` vertices; closing is implicit.
+
+    Returns:
+        Boolean mask, True where the point lies inside ``polygon``.
+    """
+    inside = np.zeros(lats.shape, dtype=bool)
+    lat_j, lon_j = polygon[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for lat_i, lon_i in polygon:
+            crosses = (lon_i > lons) != (lon_j > lons)
+            edge_lat = (lat_j - lat_i) * (lons - lon_i) / (lon_j - lon_i) + lat_i
+            inside ^= crosses & (lats < edge_lat)
+            lat_j, lon_j = lat_i, lon_i
+    return inside
+
+
+class ZoneIndex:
+    """Precomputed name table and polygon index for one country's zones."""
+
+    def __init__(self, zones: Sequence[Zone]) -> None:
+        self.zones = list(zones)
+        self.fallback = len(self.zones) - 1
+        self.by_name: dict[str, int] = {}
+        for i, zone in enumerate(self.zones):
+            self.by_name.setdefault(zone.name.lower(), i)
+
+        # (zone index, vertices, (min_lat, max_lat, min_lon, max_lon))
+        self.polygons: list[tuple[int, np.ndarray, tuple[float, float, float, float]]] = []
+        for i, zone in enumerate(self.zones):
+            if len(zone.polygon) >= 3:
+                vertices = np.asarray(zone.polygon, dtype=np.float64)
+                bbox = (
+                    float(vertices[:, 0].min()),
+                    float(vertices[:, 0].max()),
+                    float(vertices[:, 1].min()),
+                    float(vertices[:, 1].max()),
+                )
+                self.polygons.append((i, vertices, bbox))
+
+    def match_names(self, names: Sequence[str]) -> np.ndarray:
+        """Map zone names to zone indices, ``UNASSIGNED`` where unknown."""
+        by_name = self.by_name
+        return np.fromiter(
+            (by_name.get(name.lower(), UNASSIGNED) for name in names),
+            dtype=np.int32,
+            count=len(names),
+        )
+
+    def locate(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Return the index of the first zone polygon containing each point."""
+        result = np.full(lats.shape, UNASSIGNED, dtype=np.int32)
+        for zone_idx, vertices, (min_lat, max_lat, min_lon, max_lon) in self.polygons:
+            candidates = np.flatnonzero(
+                (result == UNASSIGNED)
+                & (lats >= min_lat)
+                & (lats <= max_lat)
+                & (lons >= min_lon)
+                & (lons <= max_lon)
+            )
+            if candidates.size:
+                hits = points_in_polygon(lats[candidates], lons[candidates], vertices)
+                result[candidates[hits]] = zone_idx
+        return result
+
+    def assign(self, lats: np.ndarray, lons: np.ndarray, names: np.ndarray) -> np.ndarray:
+        """Combine name matches, polygon containment and the catch-all zone.
+
+        Args:
+            lats: Point latitudes.
+            lons: Point longitudes.
+            names: Zone indices from ``match_names`` (``UNASSIGNED`` if unknown).
+        """
+        result = np.array(names, dtype=np.int32, copy=True)
+        missing = np.flatnonzero(result == UNASSIGNED)
+        if missing.size and self.polygons:
+            result[missing] = self.locate(lats[missing], lons[missing])
+        result[result == UNASSIGNED] = self.fallback
+        return result
+
+    def assign_locations(self, locations: Sequence[Location]) -> np.ndarray:
+        """Return a zone index for every location."""
+        if isinstance(locations, LocationStore):
+            # Only the distinct zone strings need a lookup
+            names = self.match_names(locations.zones)[locations.zone_codes]
+            return self.assign(locations.latitude, locations.longitude, names)
+
+        count = len(locations)
+        lats = np.fromiter((loc.latitude for loc in locations), np.float64, count)
+        lons = np.fromiter((loc.longitude for loc in locations), np.float64, count)
+        names = self.match_names([loc.zone for loc in locations])
+        return self.assign(lats, lons, names)
+
+    def bucket(self, locations: Sequence[Location]) -> dict[str, list[Location]]:
+        """Group ``locations`` by zone ID, in zone order, for a single build.
+
+        The zones themselves are shared configuration and are never modified.
+        """
+        buckets: dict[str, list[Location]] = {zone.id: [] for zone in self.zones}
+        if not self.zones:
+            return buckets
+        lists = [buckets[zone.id] for zone in self.zones]
+        for loc, zone_idx in zip(locations, self.assign_locations(locations).tolist(), strict=True):
+            lists[zone_idx].append(loc)
+        return buckets
+
+
+@cache
+def zone_index_for(country: str) -> ZoneIndex:
+    """Build (once per process) the zone index for a country."""
+    config = COUNTRY_CONFIGS.get(country, COUNTRY_CONFIGS["Singapore"])
+    return ZoneIndex(config.zones)
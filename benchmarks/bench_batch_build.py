@@ -0,0 +1,48 @@
+"""Sequential versus process-pool batch builds over many country folders.
+
+Usage:
+    python -m benchmarks.bench_batch_build --rows 2000 --jobs 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.main import build_batch, find_countries
+from app.utils.models import COUNTRY_CONFIGS
+
+from .synthetic import write_places_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000, help="places per country")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for seed, country in enumerate(COUNTRY_CONFIGS):
+            csv_file = root / country.lower() / "data" / f"{country.lower()}_places.csv"
+            write_places_csv(csv_file, args.rows, country, seed=seed)
+        countries = list(find_countries(root).values())
+
+        timings = {}
+        for label, jobs in (("sequential", 1), (f"pool x{args.jobs}", args.jobs)):
+            start = time.perf_counter()
+            reports = build_batch(countries, root / f"output_{jobs}", jobs=jobs, force=True)
+            timings[label] = time.perf_counter() - start
+            failed = [report.name for report in reports if report.errors]
+            if failed:
+                raise SystemExit(f"batch build failed for: {', '.join(failed)}")
+
+    sequential = timings["sequential"]
+    print(f"\n{len(countries)} countries x {args.rows:,} rows, {os.cpu_count()} CPUs")
+    for label, elapsed in timings.items():
+        print(f"  {label:<12} {elapsed:7.2f} s   speedup {sequential / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
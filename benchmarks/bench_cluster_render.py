@@ -0,0 +1,52 @@
+"""Output size and render time: individual markers versus client-side clustering.
+
+Usage:
+    python -m benchmarks.bench_cluster_render --sizes 1000,10000,100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils import generate_html_map, load_store
+
+from .synthetic import write_places_csv
+
+
+def render(csv_file: str, output: Path, country: str, threshold: int | None) -> tuple[float, int]:
+    """Return (seconds, bytes) for one generate_html_map call."""
+    locations = load_store(csv_file)
+    start = time.perf_counter()
+    generate_html_map(csv_file, country, str(output), locations, cluster_threshold=threshold)
+    return time.perf_counter() - start, os.path.getsize(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--country", default="Singapore")
+    parser.add_argument(
+        "--max-marker-rows",
+        type=int,
+        default=100_000,
+        help="skip the individual-marker run above this size",
+    )
+    args = parser.parse_args()
+
+    print(f"\n{'rows':>9}  {'mode':<10} {'render s':>9} {'size MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        for size in (int(s) for s in args.sizes.split(",")):
+            csv_file = str(write_places_csv(out / f"places_{size}.csv", size, args.country))
+            modes: dict[str, int | None] = {"clustered": 0}
+            if size <= args.max_marker_rows:
+                modes = {"markers": None, **modes}
+            for mode, threshold in modes.items():
+                elapsed, nbytes = render(csv_file, out / f"{mode}.html", args.country, threshold)
+                print(f"{size:>9,}  {mode:<10} {elapsed:9.2f} {nbytes / 2**20:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
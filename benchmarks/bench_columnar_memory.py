@@ -0,0 +1,85 @@
+"""Memory footprint of the columnar LocationStore versus per-row dataclasses.
+
+Usage:
+    python -m benchmarks.bench_columnar_memory --rows 200000
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.utils import load_locations, load_store
+
+from .synthetic import write_places_csv
+
+
+@dataclass
+class DictLocation:
+    """The original, ``__dict__``-backed Location layout."""
+
+    name: str
+    latitude: float
+    longitude: float
+    category: str
+    address: str = ""
+    notes: str = ""
+    zone: str = ""
+
+
+def load_dict_locations(csv_file: str) -> list[DictLocation]:
+    with open(csv_file, encoding="utf-8", newline="") as f:
+        return [
+            DictLocation(
+                name=row["Name"],
+                latitude=float(row["Latitude"]),
+                longitude=float(row["Longitude"]),
+                category=row["Category"],
+                address=row["Address"],
+                notes=row["Notes"],
+                zone=row["Zone"],
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def measure(loader: Callable[[str], object], csv_file: str) -> tuple[float, float, float]:
+    """Return (seconds, retained MiB, peak MiB) for loading ``csv_file``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    dataset = loader(csv_file)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dataset
+    return elapsed, retained / 2**20, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    loaders: dict[str, Callable[[str], object]] = {
+        "dataclass (dict)": load_dict_locations,
+        "dataclass (slots)": load_locations,
+        "LocationStore": load_store,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = str(write_places_csv(Path(tmp) / "bench_places.csv", args.rows))
+        print(f"\n{args.rows:,} rows")
+        for label, loader in loaders.items():
+            elapsed, retained, peak = measure(loader, csv_file)
+            print(
+                f"  {label:<18} {elapsed:7.2f} s   retained {retained:8.1f} MiB"
+                f"   peak {peak:8.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
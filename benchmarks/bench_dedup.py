@@ -0,0 +1,117 @@
+"""Near-duplicate detection throughput and recall, against an all-pairs scan.
+
+A share of the synthetic rows are re-emitted as near-duplicates: the name is
+re-cased, re-punctuated or has a typo, and the point is moved up to 15 m.
+
+Usage:
+    python -m benchmarks.bench_dedup --sizes 10000,100000,1000000 --pairwise-max 5000
+"""
+
+import argparse
+import csv
+import math
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils.dedup import Deduplicator, _distance_m, name_similarity
+from app.utils.geocoding import normalize_address
+from app.utils.loader import iter_rows
+
+from .synthetic import write_places_csv
+
+
+def _perturb_name(rng: random.Random, name: str) -> str:
+    choice = rng.randrange(4)
+    if choice == 0:
+        return name.upper()
+    if choice == 1:
+        return name.replace(" ", "-") + "!"
+    if choice == 2:
+        i = rng.randrange(len(name))
+        return name[:i] + name[i + 1 :] if not name[i].isdigit() else name.lower()
+    return "  " + name + "  "
+
+
+def write_with_duplicates(path: Path, rows: int, share: float, seed: int = 0) -> int:
+    """Write ``rows`` places plus near-duplicates of ``share`` of them; return how many."""
+    rng = random.Random(seed)
+    base = write_places_csv(path.with_suffix(".base.csv"), rows, seed=seed)
+    with open(base, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        body = list(reader)
+
+    duplicates = []
+    for row in rng.sample(body, int(rows * share)):
+        copy = list(row)
+        copy[0] = _perturb_name(rng, row[0])
+        bearing, metres = rng.uniform(0, 2 * math.pi), rng.uniform(0, 15)
+        lat = float(row[2]) + metres * math.cos(bearing) / 111_195
+        lon = float(row[3]) + metres * math.sin(bearing) / (111_195 * math.cos(math.radians(lat)))
+        copy[2], copy[3] = f"{lat:.6f}", f"{lon:.6f}"
+        duplicates.append(copy)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(body)
+        writer.writerows(duplicates)
+    return len(duplicates)
+
+
+def pairwise(csv_file: Path, dedup: Deduplicator) -> int:
+    """Quadratic reference: compare every row with every kept row."""
+    kept: list[tuple[str, float, float]] = []
+    merged = 0
+    for row in iter_rows(str(csv_file)):
+        key = normalize_address(row["Name"])
+        lat, lon = float(row["Latitude"]), float(row["Longitude"])
+        if any(
+            _distance_m(lat, lon, k_lat, k_lon) <= dedup.distance_m
+            and name_similarity(key, k_key) >= dedup.min_similarity
+            for k_key, k_lat, k_lon in kept
+        ):
+            merged += 1
+        else:
+            kept.append((key, lat, lon))
+    return merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--share", type=float, default=0.1, help="fraction of rows duplicated")
+    parser.add_argument(
+        "--pairwise-max", type=int, default=5_000, help="largest size to run all-pairs on"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"\n{'rows':>10} {'injected':>9} {'merged':>8} {'grid s':>8} {'rows/s':>10} {'pairs s':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            csv_file = Path(tmp) / f"places_{size}.csv"
+            injected = write_with_duplicates(csv_file, size, args.share)
+            dedup = Deduplicator()
+            start = time.perf_counter()
+            for _ in dedup.filter(iter_rows(str(csv_file))):
+                pass
+            elapsed = time.perf_counter() - start
+
+            pairs = "-"
+            if size <= args.pairwise_max:
+                start = time.perf_counter()
+                if pairwise(csv_file, Deduplicator()) != len(dedup.merges):
+                    raise SystemExit(f"{size}: grid and all-pairs results differ")
+                pairs = f"{time.perf_counter() - start:9.2f}"
+            print(
+                f"{dedup.rows_seen:>10,} {injected:>9,} {len(dedup.merges):>8,} "
+                f"{elapsed:8.2f} {dedup.rows_seen / elapsed:10,.0f} {pairs:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
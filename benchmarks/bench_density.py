@@ -0,0 +1,48 @@
+"""Cost of the density grid behind ``--density``, cold and from its cache.
+
+For each size, the places of a synthetic country are loaded into a
+``LocationStore`` and counted per cell and category at every zoom level below
+``DENSITY_ZOOM``, once from scratch and once read back from the cache file.
+The cell counts show how much less the page draws than one pin per place.
+
+Usage:
+    python -m benchmarks.bench_density --sizes 10000,100000,1000000 --country Japan
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils import load_store
+from app.utils.density import DENSITY_ZOOM, MIN_DENSITY_ZOOM, cached_density_grid
+
+from .synthetic import write_places_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--country", default="Japan")
+    args = parser.parse_args()
+
+    levels = range(MIN_DENSITY_ZOOM, DENSITY_ZOOM)
+    print(
+        f"\n{'rows':>9}  {'cold ms':>8}  {'cached ms':>9}  cells at zoom {', '.join(map(str, levels))}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            csv_file = write_places_csv(Path(tmp) / f"places_{size}.csv", size, args.country)
+            store = load_store(str(csv_file))
+            cache_file = Path(tmp) / f"page_{size}.density.json"
+            timings = []
+            for _ in range(2):
+                start = time.perf_counter()
+                grid = cached_density_grid(store, cache_file, levels)
+                timings.append((time.perf_counter() - start) * 1000)
+            cells = ", ".join(str(len(grid.levels[zoom])) for zoom in levels)
+            print(f"{size:>9,}  {timings[0]:8.1f}  {timings[1]:9.1f}  {cells}")
+
+
+if __name__ == "__main__":
+    main()
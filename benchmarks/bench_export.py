@@ -0,0 +1,58 @@
+"""Time and peak RSS of writing every export format in one pass versus one pass each.
+
+"single pass" streams the CSV once and feeds each place to the KMZ, GeoJSON,
+GPX and CSV writers together; "separate" reads the CSV again for every format,
+as running the exporters one after another would. Each mode runs in a fresh
+interpreter so its peak RSS is measured in isolation. Since every writer
+streams, peak RSS should stay flat as ``--rows`` grows.
+
+Usage:
+    python -m benchmarks.bench_export --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from .bench_kml_streaming import run_mode
+from .synthetic import write_places_csv
+
+FORMATS = ("kmz", "geojson", "gpx", "csv")
+
+MODES: dict[str, str] = {
+    "single pass": (
+        "from app.utils.export import write_exports\n"
+        "from app.utils.loader import iter_locations\n"
+        "write_exports(iter_locations(csv_file), outputs, 'Singapore')\n"
+    ),
+    "separate": (
+        "from app.utils.export import write_exports\n"
+        "from app.utils.loader import iter_locations\n"
+        "for fmt, path in outputs.items():\n"
+        "    write_exports(iter_locations(csv_file), {fmt: path}, 'Singapore')\n"
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = str(write_places_csv(Path(tmp) / "bench_places.csv", args.rows))
+        print(f"\n{args.rows:,} rows -> {', '.join(FORMATS)}")
+        for mode, code in MODES.items():
+            outputs = {fmt: str(Path(tmp) / f"out.{fmt}") for fmt in FORMATS}
+            elapsed, peak = run_mode(f"outputs = {outputs!r}\n" + code, csv_file, "")
+            size = sum(os.path.getsize(path) for path in outputs.values()) / 2**20
+            rate = args.rows / elapsed
+            print(
+                f"  {mode:<11} {elapsed:7.2f} s  {rate:9,.0f} rows/s   "
+                f"peak RSS {peak:7.1f} MiB   {size:8.1f} MiB out"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Rows per second: the row-by-row CSV loader versus validated pandas ingestion.
+
+Each size is loaded from a clean CSV with ``load_store`` and with
+``ingest_store`` on every available pandas engine; the stores must hold
+exactly the same places (coordinates compared bit for bit), less the
+synthetic points that scatter outside the country's bounds. A copy with one
+bad row in every hundred is then ingested to show the rejected rows land in
+the report rather than stopping the load.
+
+Usage:
+    python -m benchmarks.bench_ingest --sizes 100000,1000000
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+from itertools import compress
+from pathlib import Path
+
+import numpy as np
+
+from app.utils import LocationStore, load_store
+from app.utils.ingest import IngestReport, ingest_store, resolve_engine
+
+from .synthetic import write_places_csv
+
+# Bad coordinate pairs injected into the dirty copy, in rotation
+BAD_COORDINATES = [("", "103.8"), ("abc", "103.8"), ("95", "103.8"), ("35.68", "139.76")]
+
+
+def same_places(loaded: LocationStore, ingested: LocationStore, report: IngestReport) -> bool:
+    """Whether ``ingested`` holds exactly the loaded places that were not rejected."""
+    keep = np.ones(len(loaded), dtype=bool)
+    keep[[bad.row - 1 for bad in report.bad_rows]] = False
+    return (
+        len(ingested) == keep.sum()
+        and np.array_equal(loaded.latitude[keep], ingested.latitude)
+        and np.array_equal(loaded.longitude[keep], ingested.longitude)
+        and all(a == b for a, b in zip(compress(loaded, keep), ingested, strict=True))
+    )
+
+
+def write_dirty_copy(clean: Path, dirty: Path, every: int = 100) -> int:
+    """Copy ``clean`` with every ``every``-th row's coordinates broken; returns how many."""
+    broken = 0
+    with (
+        open(clean, encoding="utf-8", newline="") as src,
+        open(dirty, "w", encoding="utf-8", newline="") as dst,
+    ):
+        reader, writer = csv.DictReader(src), None
+        for i, row in enumerate(reader):
+            if writer is None:
+                writer = csv.DictWriter(dst, reader.fieldnames)
+                writer.writeheader()
+            if i % every == every - 1:
+                row["Latitude"], row["Longitude"] = BAD_COORDINATES[broken % len(BAD_COORDINATES)]
+                broken += 1
+            writer.writerow(row)
+    return broken
+
+
+def timed(load, *args, **kwargs) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = load(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    engines = ["c"] + (["pyarrow"] if resolve_engine("auto") == "pyarrow" else [])
+    print(f"pandas engines: {', '.join(engines)}")
+    print(f"\n{'rows':>9}  {'loader':<16} {'seconds':>8} {'rows/s':>10} {'speedup':>8}  result")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        for size in (int(s) for s in args.sizes.split(",")):
+            clean = write_places_csv(out / f"places_{size}.csv", size, args.country)
+            baseline_s, baseline = timed(load_store, str(clean))
+            print(f"{size:>9,}  {'csv loop':<16} {baseline_s:8.2f} {size / baseline_s:10,.0f}")
+            for engine in engines:
+                seconds, (store, report) = timed(
+                    ingest_store, str(clean), args.country, engine=engine
+                )
+                match = "identical" if same_places(baseline, store, report) else "MISMATCH"
+                match += f", {len(report.bad_rows):,} outside bounds"
+                print(
+                    f"{'':>9}  {'pandas ' + engine:<16} {seconds:8.2f} {size / seconds:10,.0f} "
+                    f"{baseline_s / seconds:7.1f}x  {match}"
+                )
+
+            dirty = out / f"dirty_{size}.csv"
+            broken = write_dirty_copy(clean, dirty)
+            seconds, (store, report) = timed(ingest_store, str(dirty), args.country)
+            print(
+                f"{'':>9}  {'dirty (auto)':<16} {seconds:8.2f} {size / seconds:10,.0f} "
+                f"{'':>8}  {len(report.bad_rows):,} bad rows reported ({broken:,} injected), "
+                f"{len(store):,} kept"
+            )
+
+
+if __name__ == "__main__":
+    main()
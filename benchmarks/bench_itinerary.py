@@ -0,0 +1,63 @@
+"""Day-route optimizer: time and route length against the starting tour and convergence.
+
+"start" is the construction alone (nearest neighbour, or a Hilbert curve above
+``MATRIX_LIMIT`` stops); "budget" is 2-opt + Or-opt within the default move budget;
+"converged" runs the same passes until neither improves the route.
+
+Usage:
+    python -m benchmarks.bench_itinerary --sizes 100,300,1000,5000 --converge-max 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.itinerary import MOVE_BUDGET, Itinerary, optimize_route
+from app.utils.models import COUNTRY_CONFIGS
+
+
+def timed(lats: np.ndarray, lons: np.ndarray, budget: int) -> tuple[float, Itinerary]:
+    """Return (milliseconds, itinerary) for one optimizer run."""
+    start = time.perf_counter()
+    route = optimize_route(lats, lons, move_budget=budget)
+    return (time.perf_counter() - start) * 1000, route
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,300,1000,5000")
+    parser.add_argument(
+        "--budget", type=int, default=MOVE_BUDGET, help="candidate moves to evaluate"
+    )
+    parser.add_argument(
+        "--converge-max", type=int, default=1000, help="largest size to run to convergence"
+    )
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    # Stops scattered around one zone centre, like a busy zone's places
+    rng = np.random.default_rng(0)
+    lat0, lon0 = COUNTRY_CONFIGS[args.country].zones[0].center
+
+    print(
+        f"\n{'stops':>6} {'start ms':>9} {'start km':>9} {'budget ms':>10} {'budget km':>10} "
+        f"{'conv ms':>9} {'conv km':>8}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        lats = lat0 + rng.normal(0, 0.02, size)
+        lons = lon0 + rng.normal(0, 0.02, size)
+        columns = []
+        budgets = [0, args.budget] + ([10**15] if size <= args.converge_max else [])
+        for budget in budgets:
+            ms, route = timed(lats, lons, budget)
+            if sorted(route.order) != list(range(size)):
+                raise SystemExit(f"{size}: route is not a permutation of the stops")
+            columns.append(f"{ms:9.0f} {route.distance_m / 1000:9.2f}")
+        if len(columns) < 3:
+            columns.append(f"{'-':>9} {'-':>8}")
+        print(f"{size:>6} " + " ".join(columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Peak RSS of the streaming KML writer versus building the whole document first.
+
+Each mode runs in a fresh interpreter so its peak RSS is measured in isolation.
+
+Usage:
+    python -m benchmarks.bench_kml_streaming --rows 1000000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .synthetic import write_places_csv
+
+MODES: dict[str, str] = {
+    # Equivalent to the original exporter: every row loaded, one big join, one write
+    "buffered": (
+        "from app.utils.kml_exporter import iter_kml_rows\n"
+        "from app.utils.loader import iter_rows\n"
+        "rows = list(iter_rows(csv_file))\n"
+        "content = ''.join(iter_kml_rows(rows, 'Singapore'))\n"
+        "open(output, 'w', encoding='utf-8').write(content)\n"
+    ),
+    "stream kml": ("from app.utils import create_kml\ncreate_kml(csv_file, 'Singapore', output)\n"),
+    "stream kmz": (
+        "from app.utils import create_kml\ncreate_kml(csv_file, 'Singapore', output, kmz=True)\n"
+    ),
+}
+
+
+def run_mode(code: str, csv_file: str, output: str) -> tuple[float, float]:
+    """Return (seconds, peak RSS MiB) of ``code`` run in a child interpreter."""
+    prelude = f"csv_file = {csv_file!r}\noutput = {output!r}\n"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", prelude + code],
+        stdout=subprocess.DEVNULL,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status):
+        raise RuntimeError(f"benchmark child failed with status {status}")
+    return elapsed, usage.ru_maxrss / 1024  # ru_maxrss is KiB on Linux
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = str(write_places_csv(Path(tmp) / "bench_places.csv", args.rows))
+        print(f"\n{args.rows:,} rows")
+        for mode in args.modes.split(","):
+            output = str(Path(tmp) / f"out_{mode.replace(' ', '_')}")
+            elapsed, peak = run_mode(MODES[mode], csv_file, output)
+            size = os.path.getsize(output) / 2**20
+            print(f"  {mode:<11} {elapsed:7.2f} s   peak RSS {peak:8.1f} MiB   {size:8.1f} MiB out")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Page size and build time: inline popups per marker versus one JSON table.
+
+Both modes write every place as an individual (unclustered) marker. "Eager
+popups" counts the popup objects the browser creates while parsing the page;
+with the table, popups are only built when opened.
+
+Usage:
+    python -m benchmarks.bench_popup_table --sizes 10000,100000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils import generate_html_map, load_store
+
+from .synthetic import write_places_csv
+
+
+def build(csv_file: str, output: Path, country: str, compact: bool) -> tuple[float, int, int]:
+    """Return (seconds, bytes, eager popups) for one unclustered page."""
+    locations = load_store(csv_file)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_html_map(
+            csv_file,
+            country,
+            str(output),
+            locations,
+            cluster_threshold=None,
+            compact_popups=compact,
+        )
+    seconds = time.perf_counter() - start
+    popups = output.read_text(encoding="utf-8").count("L.popup(")
+    return seconds, os.path.getsize(output), popups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    print(f"\n{'rows':>9}  {'mode':<7} {'build s':>8} {'size MiB':>9} {'B/place':>8} {'popups':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        for size in (int(s) for s in args.sizes.split(",")):
+            csv_file = str(write_places_csv(out / f"places_{size}.csv", size, args.country))
+            sizes = {}
+            for mode, compact in (("inline", False), ("table", True)):
+                seconds, size_bytes, popups = build(
+                    csv_file, out / f"{mode}_{size}.html", args.country, compact
+                )
+                sizes[mode] = size_bytes
+                print(
+                    f"{size:>9,}  {mode:<7} {seconds:8.2f} {size_bytes / 2**20:9.2f} "
+                    f"{size_bytes / size:8.0f} {popups:>8,}"
+                )
+            print(f"{'':>9}  table is {sizes['table'] / sizes['inline']:.1%} of inline")
+
+
+if __name__ == "__main__":
+    main()
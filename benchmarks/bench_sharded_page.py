@@ -0,0 +1,48 @@
+"""Initial page weight: single-file HTML map versus the sharded shell plus per-zone GeoJSON.
+
+The browser must download and parse the whole single-file page before the map
+is interactive; a sharded page only needs its shell, then fetches zones lazily.
+
+Usage:
+    python -m benchmarks.bench_sharded_page --sizes 1000,10000,100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils import generate_html_map, load_store
+from app.utils.shards import shard_directory
+
+from .synthetic import write_places_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    print(f"\n{'rows':>9}  {'mode':<8} {'build s':>8} {'page KiB':>9} {'largest shard KiB':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        for size in (int(s) for s in args.sizes.split(",")):
+            csv_file = str(write_places_csv(out / f"places_{size}.csv", size, args.country))
+            locations = load_store(csv_file)
+            for mode, sharded in (("single", False), ("sharded", True)):
+                output = out / f"{mode}_{size}.html"
+                start = time.perf_counter()
+                generate_html_map(csv_file, args.country, str(output), locations, sharded=sharded)
+                elapsed = time.perf_counter() - start
+                shards = list(shard_directory(output).glob("*")) if sharded else []
+                largest = max((os.path.getsize(path) for path in shards), default=0)
+                print(
+                    f"{size:>9,}  {mode:<8} {elapsed:8.2f} {os.path.getsize(output) / 1024:9.1f} "
+                    f"{largest / 1024:18.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
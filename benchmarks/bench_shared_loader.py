@@ -0,0 +1,65 @@
+"""Compare the old two-parse flow against one shared parse feeding both exporters.
+
+Usage:
+    python -m benchmarks.bench_shared_loader --rows 2000
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from app.main import build_country
+from app.utils import create_kml, generate_html_map
+
+from .synthetic import write_places_csv
+
+
+def measure(fn: Callable[[], object]) -> tuple[float, float]:
+    """Return (wall seconds, peak traced MiB) for ``fn``.
+
+    Time and memory are taken on separate runs because tracemalloc slows
+    allocation-heavy code down considerably.
+    """
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        csv_file = str(write_places_csv(out / "bench_places.csv", args.rows, args.country))
+
+        def two_parse() -> None:
+            create_kml(csv_file, args.country, str(out / "two.kml"))
+            generate_html_map(csv_file, args.country, str(out / "two.html"))
+
+        def shared_parse() -> None:
+            build_country(args.country, csv_file, out)
+
+        results = {
+            "two-parse": measure(two_parse),
+            "shared-parse": measure(shared_parse),
+        }
+
+    print(f"\n{args.rows:,} rows ({args.country})")
+    for label, (elapsed, peak) in results.items():
+        print(f"  {label:<13} {elapsed:8.2f} s   peak {peak:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
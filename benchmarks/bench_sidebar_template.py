@@ -0,0 +1,74 @@
+"""Per-call sidebar template overhead and output size when building many maps.
+
+Usage:
+    python -m benchmarks.bench_sidebar_template --maps 100 --rows 50
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from folium import MacroElement
+from jinja2 import Template
+
+from app.utils import generate_html_map, load_store
+from app.utils.sidebar import SIDEBAR_TEMPLATE
+
+from .synthetic import write_places_csv
+
+
+def legacy_sidebar_setup(calls: int) -> float:
+    """Seconds per call spent re-parsing the template and redefining the class."""
+    start = time.perf_counter()
+    for _ in range(calls):
+
+        class Sidebar(MacroElement):
+            _template = Template(SIDEBAR_TEMPLATE)
+
+    return (time.perf_counter() - start) / calls
+
+
+def build_maps(csv_file: str, out: Path, maps: int, shared_assets: bool) -> tuple[float, int]:
+    """Build ``maps`` pages; return (seconds per map, total bytes written)."""
+    locations = load_store(csv_file)
+    start = time.perf_counter()
+    for i in range(maps):
+        generate_html_map(
+            csv_file,
+            "Singapore",
+            str(out / f"map_{i}.html"),
+            locations,
+            shared_assets=shared_assets,
+        )
+    elapsed = (time.perf_counter() - start) / maps
+    return elapsed, sum(path.stat().st_size for path in out.iterdir())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--maps", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    compile_ms = legacy_sidebar_setup(args.maps) * 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        csv_file = str(write_places_csv(root / "places.csv", args.rows))
+        results = {}
+        for label, shared in (("inline assets", False), ("shared assets", True)):
+            out = root / label.replace(" ", "_")
+            out.mkdir()
+            results[label] = build_maps(csv_file, out, args.maps, shared)
+
+    print(f"\n{args.maps} maps x {args.rows} rows in one process")
+    print(f"  per-call template parse + class (old): {compile_ms:7.2f} ms  (now once per process)")
+    for label, (per_map, total) in results.items():
+        print(
+            f"  {label:<14} {per_map * 1000:8.1f} ms/map   "
+            f"{total / 2**20:7.2f} MiB total   {total / args.maps / 1024:7.1f} KiB/map"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Grid spatial index versus brute-force vectorized haversine scans.
+
+Every index answer is checked against the brute-force result.
+
+Usage:
+    python -m benchmarks.bench_spatial --points 1000000 --queries 200
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from app.utils.models import COUNTRY_CONFIGS
+from app.utils.spatial import SpatialIndex, haversine_m
+
+
+def timed(fn: Callable[[], object], repeat: int) -> tuple[float, list]:
+    """Return (mean milliseconds per call, results)."""
+    start = time.perf_counter()
+    results = [fn() for _ in range(repeat)]
+    return (time.perf_counter() - start) / repeat * 1000, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=500.0, help="metres")
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    # Points clustered around the zone centres, like a real catalogue
+    rng = np.random.default_rng(0)
+    centers = np.array([zone.center for zone in COUNTRY_CONFIGS[args.country].zones])
+    picks = rng.integers(len(centers), size=args.points)
+    lats = centers[picks, 0] + rng.normal(0, 0.02, args.points)
+    lons = centers[picks, 1] + rng.normal(0, 0.02, args.points)
+    queries = np.column_stack([lats, lons])[rng.integers(args.points, size=args.queries)]
+    queries += rng.normal(0, 0.001, queries.shape)
+
+    start = time.perf_counter()
+    index = SpatialIndex(lats, lons)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def brute_knn(lat: float, lon: float) -> np.ndarray:
+        distances = haversine_m(lat, lon, lats, lons)
+        nearest = np.argpartition(distances, args.k)[: args.k]
+        return nearest[np.argsort(distances[nearest])]
+
+    def brute_radius(lat: float, lon: float) -> np.ndarray:
+        return np.flatnonzero(haversine_m(lat, lon, lats, lons) <= args.radius)
+
+    def brute_bbox(lat: float, lon: float) -> np.ndarray:
+        return np.flatnonzero(
+            (lats >= lat - 0.005)
+            & (lats <= lat + 0.005)
+            & (lons >= lon - 0.005)
+            & (lons <= lon + 0.005)
+        )
+
+    cases = {
+        f"kNN k={args.k}": (
+            lambda lat, lon: index.nearest(lat, lon, args.k)[0],
+            brute_knn,
+            lambda a, b: np.array_equal(a, b),
+        ),
+        f"radius {args.radius:g} m": (
+            lambda lat, lon: index.radius(lat, lon, args.radius)[0],
+            brute_radius,
+            lambda a, b: np.array_equal(np.sort(a), b),
+        ),
+        "bbox ~1 km": (
+            lambda lat, lon: index.bbox(lat - 0.005, lon - 0.005, lat + 0.005, lon + 0.005),
+            brute_bbox,
+            lambda a, b: np.array_equal(a, b),
+        ),
+    }
+
+    print(f"\n{args.points:,} points, {args.queries} queries; index build {build_ms:.0f} ms")
+    print(f"  {'query':<14} {'index ms':>9} {'brute ms':>9} {'speedup':>8}")
+    for label, (indexed, brute, same) in cases.items():
+        query_iter = iter(queries.tolist())
+        index_ms, got = timed(lambda f=indexed, q=query_iter: f(*next(q)), args.queries)
+        query_iter = iter(queries.tolist())
+        brute_ms, expected = timed(lambda f=brute, q=query_iter: f(*next(q)), args.queries)
+        if not all(same(a, b) for a, b in zip(got, expected, strict=True)):
+            raise SystemExit(f"{label}: index and brute force disagree")
+        print(f"  {label:<14} {index_ms:9.3f} {brute_ms:9.2f} {brute_ms / index_ms:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Cold-start cost of KML-only, HTML-only and full runs, from ``python -X importtime``.
+
+Each scenario runs in a fresh interpreter on a tiny CSV, so the time is almost
+all imports. The table lists the best wall time, the import time of the app's
+own top-level imports, which heavy packages got loaded and the slowest imports.
+With ``--baseline`` the run is compared with an earlier ``--output`` and exits
+non-zero if a scenario's wall time grew by more than ``--threshold``.
+
+Usage:
+    python -m benchmarks.bench_startup --repeat 5 --output startup.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .synthetic import write_places_csv
+
+SCENARIOS = {
+    "import": "import app.utils",
+    "kml": "from app.utils import create_kml\ncreate_kml(CSV, 'Singapore', OUT + '/map.kml')",
+    "html": (
+        "from app.utils import generate_html_map\n"
+        "generate_html_map(CSV, 'Singapore', OUT + '/map.html')"
+    ),
+    "full": (
+        "from pathlib import Path\n"
+        "from app.main import build_country\n"
+        "build_country('Singapore', CSV, Path(OUT), force=True)"
+    ),
+}
+
+# Packages worth knowing about when they show up in a run
+HEAVY = ("folium", "branca", "jinja2", "pandas", "numpy", "urllib.request")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """``(module, depth, cumulative microseconds)`` for each ``-X importtime`` line."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(cumulative)))
+    return entries
+
+
+def run(code: str, csv_file: str, out_dir: str) -> tuple[float, list[tuple[str, int, int]]]:
+    """Run ``code`` in a fresh interpreter; return (wall seconds, importtime entries)."""
+    script = f"CSV = {csv_file!r}\nOUT = {out_dir!r}\n{code}\n"
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, parse_importtime(result.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3, help="slowest imports to list")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="earlier --output to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = str(write_places_csv(Path(tmp) / "places.csv", 20))
+        for scenario, code in SCENARIOS.items():
+            runs = [run(code, csv_file, tmp) for _ in range(args.repeat)]
+            wall, entries = min(runs, key=lambda r: r[0])
+            app_imports = [e for e in entries if e[1] == 0 and e[0].startswith("app")]
+            loaded = {name for name, _, _ in entries}
+            slowest = sorted((e for e in entries if e[1] == 0), key=lambda e: -e[2])
+            results[scenario] = {
+                "wall_ms": round(wall * 1000, 1),
+                "app_import_ms": round(sum(e[2] for e in app_imports) / 1000, 1),
+                "heavy": [name for name in HEAVY if name in loaded],
+                "slowest": [[name, round(us / 1000, 1)] for name, _, us in slowest[: args.top]],
+            }
+
+    print(f"\n{'scenario':<8} {'wall ms':>8} {'imports ms':>10}  heavy packages loaded")
+    for scenario, result in results.items():
+        print(
+            f"{scenario:<8} {result['wall_ms']:8.1f} {result['app_import_ms']:10.1f}  "
+            f"{', '.join(result['heavy']) or '-'}"
+        )
+        for name, ms in result["slowest"]:
+            print(f"{'':<8}   {ms:8.1f} ms  {name}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        slower = [
+            f"{scenario} {baseline[scenario]['wall_ms']:.0f} -> {result['wall_ms']:.0f} ms"
+            for scenario, result in results.items()
+            if scenario in baseline
+            and result["wall_ms"] > baseline[scenario]["wall_ms"] * (1 + args.threshold)
+        ]
+        if slower:
+            raise SystemExit("Startup regressed: " + "; ".join(slower))
+        print(f"\nNo scenario started more than {args.threshold:.0%} slower than the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Rebuild time after a one-row edit: full ``build_country`` versus watch mode.
+
+Watch mode keeps the process (and its imports) warm, works out from a row
+snapshot which outputs and zones an edit touched and redoes only those. Each
+size is timed for a full forced build, a save that changes nothing, a notes
+edit in one zone and a place moved to another zone (which leaves the KML as
+it was). Times do not include interpreter start-up, which a fresh
+``python -m app.main`` run also pays.
+
+Usage:
+    python -m benchmarks.bench_watch --sizes 200,2000,20000
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from app.main import BuildOptions, LiveBuild, build_country
+
+from .synthetic import write_places_csv
+
+MODES = {
+    "inline": BuildOptions(),
+    "compact": BuildOptions(compact_popups=True),
+    "sharded": BuildOptions(sharded=True),
+}
+
+
+def edit(csv_file: Path, change) -> None:
+    """Rewrite ``csv_file`` with ``change`` applied to its rows."""
+    with open(csv_file, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    change(rows)
+    with open(csv_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="200,2000,20000")
+    parser.add_argument("--country", default="Singapore")
+    args = parser.parse_args()
+
+    edits = {
+        "no-op save": lambda rows: None,
+        "notes edit": lambda rows: rows[0].update(Notes=rows[0]["Notes"] + " (edited)"),
+        "zone move": lambda rows: rows[1].update(Zone=rows[2]["Zone"]),
+    }
+    print(f"\n{'rows':>7}  {'mode':<8} {'full s':>7}  " + "  ".join(f"{e:>11}" for e in edits))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            for mode, options in MODES.items():
+                folder = Path(tmp) / f"{mode}_{size}"
+                csv_file = write_places_csv(folder / "places.csv", size, args.country)
+                out = folder / "output"
+                full = timed(
+                    build_country, args.country, str(csv_file), out, force=True, options=options
+                )
+                live = LiveBuild(args.country, str(csv_file), out, options=options)
+                timed(live.rebuild)  # snapshot only; the outputs are fresh
+                cells = []
+                for change in edits.values():
+                    edit(csv_file, change)
+                    seconds = timed(live.rebuild)
+                    cells.append(f"{seconds * 1000:8.0f} ms")
+                print(f"{size:>7,}  {mode:<8} {full:7.2f}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
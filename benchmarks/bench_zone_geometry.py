@@ -0,0 +1,52 @@
+"""Cost of deriving zone outlines, centers and zooms, with and without the cache.
+
+For each size, the places of a synthetic country are bucketed into zones and
+``zone_geometries`` is timed cold (hulls, simplification and views computed,
+cache written) and warm (every zone read back from the cache). The vertex
+count of one zone's outline at each zoom level shows what simplification saves.
+
+Usage:
+    python -m benchmarks.bench_zone_geometry --sizes 1000,100000,1000000 --country Japan
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils import load_store
+from app.utils.geometry import GeometryCache, zone_geometries
+from app.utils.models import COUNTRY_CONFIGS
+from app.utils.zoning import zone_index_for
+
+from .synthetic import write_places_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--country", default="Japan")
+    args = parser.parse_args()
+
+    zones = COUNTRY_CONFIGS[args.country].zones
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\n{'rows':>9}  {'cold ms':>8}  {'warm ms':>8}  vertices by zoom ({zones[0].id})")
+        for size in (int(s) for s in args.sizes.split(",")):
+            csv_file = write_places_csv(Path(tmp) / f"places_{size}.csv", size, args.country)
+            zone_locations = zone_index_for(args.country).bucket(load_store(str(csv_file)))
+            cache_path = Path(tmp) / f"geometry_{size}.json"
+            timings = []
+            for _ in range(2):
+                start = time.perf_counter()
+                geometries = zone_geometries(
+                    args.country, zones, zone_locations, GeometryCache(cache_path)
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+            levels = ", ".join(
+                f"z{zoom}: {len(ring)}" for zoom, ring in geometries[zones[0].id].outlines
+            )
+            print(f"{size:>9,}  {timings[0]:8.1f}  {timings[1]:8.1f}  {levels}")
+
+
+if __name__ == "__main__":
+    main()
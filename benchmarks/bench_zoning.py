@@ -0,0 +1,97 @@
+"""Zone assignment: legacy nested name scan versus the hashed + polygon ZoneIndex.
+
+Usage:
+    python -m benchmarks.bench_zoning --points 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.columnar import LocationStore, StringTable, encode_categorical
+from app.utils.models import COUNTRY_CONFIGS, Zone
+from app.utils.zoning import ZoneIndex
+
+
+def legacy_assign(zone_names: list[str], zones: list[Zone]) -> list[int]:
+    """The original O(locations x zones) name comparison."""
+    result = []
+    for name in zone_names:
+        for i, zone in enumerate(zones):
+            if zone.name.lower() == name.lower():
+                result.append(i)
+                break
+        else:
+            result.append(len(zones) - 1)
+    return result
+
+
+def synthetic_store(points: int, zones: list[Zone], blank_share: float, seed: int) -> LocationStore:
+    """Points over the zones' extent; a share of rows has a blank or wrong Zone."""
+    rng = np.random.default_rng(seed)
+    vertices = np.concatenate([np.asarray(z.polygon) for z in zones if z.polygon])
+    lats = rng.uniform(vertices[:, 0].min(), vertices[:, 0].max(), points)
+    lons = rng.uniform(vertices[:, 1].min(), vertices[:, 1].max(), points)
+
+    labels = [z.name for z in zones] + ["", "Somewhere Else"]
+    weights = np.full(len(labels), (1 - blank_share) / len(zones))
+    weights[-2:] = blank_share / 2
+    names = rng.choice(len(labels), size=points, p=weights)
+    zone_codes, zone_table = encode_categorical(labels[i] for i in names)
+    category_codes, categories = encode_categorical(["Food"] * points)
+
+    return LocationStore(
+        latitude=lats,
+        longitude=lons,
+        category_codes=category_codes,
+        categories=categories,
+        zone_codes=zone_codes,
+        zones=zone_table,
+        names=StringTable([""] * points),
+        addresses=StringTable([""] * points),
+        notes=StringTable([""] * points),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--country", default="Singapore")
+    parser.add_argument("--blank-share", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    zones = COUNTRY_CONFIGS[args.country].zones
+    store = synthetic_store(args.points, zones, args.blank_share, args.seed)
+    zone_names = [store.zones[code] for code in store.zone_codes]
+
+    start = time.perf_counter()
+    legacy_assign(zone_names, zones)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ZoneIndex(zones)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.assign(store.latitude, store.longitude, index.match_names(zone_names))
+    hashed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assigned = index.assign_locations(store)
+    columnar = time.perf_counter() - start
+
+    geometric = int(np.count_nonzero(index.match_names(store.zones)[store.zone_codes] < 0))
+    print(f"\n{args.points:,} points, {len(zones)} zones, {geometric:,} placed geometrically")
+    print(f"  legacy name scan            {legacy:8.3f} s")
+    print(f"  ZoneIndex build             {build * 1000:8.3f} ms")
+    print(f"  ZoneIndex (per-row names)   {hashed:8.3f} s")
+    print(f"  ZoneIndex (LocationStore)   {columnar:8.3f} s")
+    counts = np.bincount(assigned, minlength=len(zones))
+    for zone, count in zip(zones, counts, strict=True):
+        print(f"    {zone.name:<30} {count:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Load test for the local map server: latency percentiles and requests per second.
+
+Starts ``MapServer`` for a synthetic dataset in a separate process (or targets
+a running one with ``--url``) and drives it from ``--concurrency`` client
+threads, each holding one keep-alive connection. Every client asks for gzip
+and revalidates what it has seen with ``If-None-Match``, as a browser would.
+The request mix is mostly ``/places`` for random map views, plus the page,
+its zone shards and now and then ``/kml``.
+
+Usage:
+    python -m benchmarks.load_test --rows 20000 --concurrency 8 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from app.utils.models import COUNTRY_CONFIGS
+
+from .synthetic import write_places_csv
+
+# Share of requests per kind
+MIX = {"places": 0.85, "page": 0.05, "shard": 0.09, "kml": 0.01}
+
+
+def serve(csv_file: str, country: str, ready: multiprocessing.Queue) -> None:
+    """Server process: build the site, report the port, serve until killed."""
+    import contextlib
+    import io
+
+    from app.utils.server import MapServer, MapSite
+
+    with tempfile.TemporaryDirectory() as site_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            site = MapSite.build(country, csv_file, Path(site_dir))
+        server = MapServer(("127.0.0.1", 0), site)
+        ready.put(server.server_address[1])
+        server.serve_forever()
+
+
+def random_view(rng: random.Random, bounds: tuple[tuple[float, float], ...]) -> str:
+    """``/places`` URL for a random 1024x768 px view inside ``bounds``."""
+    (south, west), (north, east) = bounds
+    zoom = rng.randint(11, 17)
+    width = 360 * 1024 / (256 * 2**zoom)
+    height = width * 768 / 1024
+    lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+    return (
+        f"/places?bbox={lat - height / 2:.5f},{lon - width / 2:.5f},"
+        f"{lat + height / 2:.5f},{lon + width / 2:.5f}&zoom={zoom}"
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def client(
+    host: str,
+    port: int,
+    shards: list[str],
+    bounds: tuple[tuple[float, float], ...],
+    deadline: float,
+    seed: int,
+    results: dict[str, list],
+) -> None:
+    """Send requests until ``deadline``; record (seconds, status, bytes) per kind."""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    etags: dict[str, str] = {}
+    kinds, weights = list(MIX), list(MIX.values())
+    local: dict[str, list] = defaultdict(list)
+    while time.perf_counter() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "places":
+            path = random_view(rng, bounds)
+        elif kind == "page":
+            path = "/"
+        elif kind == "shard":
+            path = "/" + rng.choice(shards)
+        else:
+            path = "/kml"
+        headers = {"Accept-Encoding": "gzip"}
+        if path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        local[kind].append((time.perf_counter() - start, response.status, len(body)))
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+    conn.close()
+    for kind, samples in local.items():
+        results[kind].extend(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running server to test (default: start one)")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--country", default="Singapore")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            csv_file = str(write_places_csv(Path(tmp) / "places.csv", args.rows, args.country))
+            ready: multiprocessing.Queue = multiprocessing.get_context("spawn").Queue()
+            server = multiprocessing.get_context("spawn").Process(
+                target=serve, args=(csv_file, args.country, ready), daemon=True
+            )
+            server.start()
+            host, port = "127.0.0.1", ready.get(timeout=600)
+
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            conn.request("GET", "/")
+            page = conn.getresponse().read().decode("utf-8")
+            conn.close()
+            shards = re.findall(r'"url": ?"([^"]+)"', page) or [""]
+            bounds = COUNTRY_CONFIGS[args.country].bounds
+
+            results: dict[str, list] = defaultdict(list)
+            deadline = time.perf_counter() + args.duration
+            threads = [
+                threading.Thread(
+                    target=client, args=(host, port, shards, bounds, deadline, seed, results)
+                )
+                for seed in range(args.concurrency)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            if server is not None:
+                server.kill()
+
+    summary = {}
+    print(f"\n{'kind':<8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'304s':>6}")
+    everything = [sample for samples in results.values() for sample in samples]
+    for kind, samples in [*sorted(results.items()), ("all", everything)]:
+        latencies = [s[0] for s in samples]
+        row = {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "not_modified": sum(1 for s in samples if s[1] == 304),
+            "errors": sum(1 for s in samples if s[1] >= 400),
+        }
+        summary[kind] = row
+        print(
+            f"{kind:<8} {row['requests']:>9,} {row['rps']:>8,.0f} {row['p50_ms']:>8.2f} "
+            f"{row['p99_ms']:>8.2f} {row['not_modified']:>6,}"
+        )
+    errors = summary["all"]["errors"]
+    print(f"{args.concurrency} clients for {elapsed:.1f} s, {errors} error response(s)")
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
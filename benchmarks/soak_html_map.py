@@ -0,0 +1,81 @@
+"""Soak test: many HTML builds in one warm process must stay correct and flat in memory.
+
+Every build's sidebar must list exactly the rows of its input, and traced memory
+after the last build must be within ``--tolerance`` MiB of memory after warm-up.
+Exits non-zero on failure.
+
+Usage:
+    python -m benchmarks.soak_html_map --builds 500 --rows 50
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.utils import generate_html_map, load_store
+from app.utils.build_cache import hash_config
+
+from .synthetic import write_places_csv
+
+# Folium and jinja fill some one-off internal caches during the first few dozen builds
+WARMUP_BUILDS = 50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--builds", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--country", default="Singapore")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed growth in MiB")
+    args = parser.parse_args()
+
+    config_hash = hash_config(args.country)
+    failures: list[str] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        csv_file = str(write_places_csv(root / "places.csv", args.rows, args.country))
+        output = root / "map.html"
+        locations = load_store(csv_file)
+
+        tracemalloc.start()
+        baseline = 0
+        start = time.perf_counter()
+        for i in range(args.builds):
+            if i == WARMUP_BUILDS:
+                gc.collect()
+                baseline = tracemalloc.get_traced_memory()[0]
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_html_map(csv_file, args.country, str(output), locations)
+            items = output.read_text(encoding="utf-8").count('class="location-item"')
+            if items != args.rows:
+                failures.append(f"build {i}: {items} sidebar entries, expected {args.rows}")
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        final = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    if hash_config(args.country) != config_hash:
+        failures.append(f"COUNTRY_CONFIGS[{args.country!r}] changed during the run")
+    growth = (final - baseline) / 2**20
+    if args.builds > WARMUP_BUILDS and growth > args.tolerance:
+        failures.append(f"traced memory grew {growth:.2f} MiB after warm-up")
+
+    print(
+        f"\n{args.builds:,} builds x {args.rows} rows: {elapsed / args.builds * 1000:.1f} ms/build, "
+        f"memory growth after warm-up {growth:+.2f} MiB"
+    )
+    if failures:
+        for failure in failures[:10]:
+            print(f"❌ {failure}")
+        raise SystemExit(1)
+    print("✅ Output and memory stable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Benchmark suite: KML, HTML and end-to-end builds over synthetic countries, with baselines.
+
+Every case (country x size x target) runs in a fresh process, so its peak RSS
+is its own; the best of ``--repeat`` runs is kept. Results are compared with a
+JSON baseline and the suite exits non-zero if any case's throughput dropped by
+more than ``--threshold``. The first run on a machine (or ``--update``) writes
+the baseline instead. Baselines are only comparable on the same machine.
+
+Targets:
+    kml   ``create_kml`` streaming straight from the CSV
+    html  ``generate_html_map`` including loading the CSV
+    main  ``build_country``: one load feeding both exporters, manifest included
+
+Generated CSVs are cached in ``--data-dir`` (1M rows take ~20 s to write).
+
+Usage:
+    python -m benchmarks.suite --sizes 1000,100000,1000000
+    python -m benchmarks.suite --sizes 1000 --countries Singapore,Japan --update
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from app.main import build_country
+from app.utils import create_kml, generate_html_map, profiling
+from app.utils.models import COUNTRY_CONFIGS
+
+from .synthetic import write_places_csv
+
+TARGETS = ("kml", "html", "main")
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / f"{platform.node() or 'local'}.json"
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "interactive-map-bench"
+
+_MIB = 1 << 20
+
+
+def dataset(data_dir: Path, country: str, rows: int, seed: int) -> Path:
+    """Path of the cached synthetic CSV for a case, writing it if needed."""
+    path = data_dir / f"{country.lower()}_{rows}_seed{seed}_places.csv"
+    if not path.exists():
+        partial = path.with_suffix(".partial")
+        write_places_csv(partial, rows, country, seed=seed)
+        partial.replace(path)
+    return path
+
+
+def run_case(target: str, country: str, csv_file: str, out_dir: str) -> dict[str, Any]:
+    """Run one target once (in a worker process); return its timing and memory."""
+    out = Path(out_dir)
+    start_rss = profiling.peak_rss()
+    # Folium warns about the tile provider on every map
+    warnings.simplefilter("ignore", UserWarning)
+    with profiling.profile_session() as profiler, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if target == "kml":
+            create_kml(csv_file, country, str(out / "map.kml"))
+        elif target == "html":
+            generate_html_map(csv_file, country, str(out / "map.html"))
+        else:
+            build_country(country, csv_file, out, force=True)
+        seconds = time.perf_counter() - start
+    peak_rss = profiling.peak_rss()
+    return {
+        "seconds": seconds,
+        "peak_rss_mib": round(peak_rss / _MIB, 1) if peak_rss else None,
+        "rss_growth_mib": round((peak_rss - start_rss) / _MIB, 1) if peak_rss else None,
+        "bytes_written": profiler.counters.get("bytes_written", 0),
+        "stages": {s.name: round(s.seconds, 4) for s in profiler.stages.values()},
+    }
+
+
+def measure(target: str, country: str, csv_file: Path, rows: int, repeat: int) -> dict[str, Any]:
+    """Best of ``repeat`` fresh-process runs of one case.
+
+    A run that raises or kills its worker (e.g. out of memory) fails the case.
+    """
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for _ in range(repeat):
+        with (
+            tempfile.TemporaryDirectory() as out_dir,
+            ProcessPoolExecutor(1, mp_context=context) as pool,
+        ):
+            try:
+                runs.append(pool.submit(run_case, target, country, str(csv_file), out_dir).result())
+            except BrokenProcessPool:
+                return {"rows": rows, "error": "worker died (out of memory?)"}
+            except Exception as exc:
+                return {"rows": rows, "error": f"{type(exc).__name__}: {exc}"}
+    best = min(runs, key=lambda run: run["seconds"])
+    return {
+        "rows": rows,
+        "rows_per_s": round(rows / best["seconds"], 1),
+        **best,
+        "seconds": round(best["seconds"], 4),
+        "peak_rss_mib": max((run["peak_rss_mib"] or 0) for run in runs) or None,
+    }
+
+
+def compare(
+    results: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> tuple[list[str], list[str]]:
+    """Compare ``results`` with ``baseline``; return (report lines, failed or regressed cases)."""
+    lines = [
+        f"{'case':<28} {'rows/s':>12} {'baseline':>12} {'change':>8} {'peak MiB':>9} {'growth':>7}"
+    ]
+    regressed = []
+    for name, result in results.items():
+        if "error" in result:
+            lines.append(f"{name:<28} FAILED: {result['error']}")
+            regressed.append(name)
+            continue
+        base = baseline.get(name)
+        if base is not None and "error" in base:
+            base = None
+        if base is None:
+            change, status = "new", ""
+        else:
+            ratio = result["rows_per_s"] / base["rows_per_s"] - 1
+            change = f"{ratio:+.1%}"
+            status = ""
+            if ratio < -threshold:
+                status = "  REGRESSED"
+                regressed.append(name)
+        base_rate = f"{base['rows_per_s']:12,.0f}" if base else f"{'-':>12}"
+        lines.append(
+            f"{name:<28} {result['rows_per_s']:12,.0f} {base_rate} {change:>8} "
+            f"{result['peak_rss_mib'] or 0:9.1f} {result['rss_growth_mib'] or 0:7.1f}{status}"
+        )
+    return lines, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument(
+        "--countries", default=",".join(COUNTRY_CONFIGS), help="comma-separated config names"
+    )
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="fail if throughput drops by more than this fraction (default 0.15)",
+    )
+    parser.add_argument("--update", action="store_true", help="overwrite the baseline")
+    parser.add_argument("--output", type=Path, help="also write this run's results here")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    targets = [t for t in args.targets.split(",") if t]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        raise SystemExit(f"Unknown target(s): {', '.join(sorted(unknown))}")
+
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    results: dict[str, dict] = {}
+    for country in args.countries.split(","):
+        for rows in (int(s) for s in args.sizes.split(",")):
+            csv_file = dataset(args.data_dir, country, rows, args.seed)
+            for target in targets:
+                name = f"{country}/{rows}/{target}"
+                result = results[name] = measure(target, country, csv_file, rows, args.repeat)
+                progress = result.get("error") or f"{result['seconds']:9.3f} s"
+                print(f"  {name:<28} {progress}", file=sys.stderr, flush=True)
+
+    document = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "machine": {
+            "node": platform.node(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": multiprocessing.cpu_count(),
+        },
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    baseline: dict[str, dict] = {}
+    if args.baseline.exists() and not args.update:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+
+    lines, regressed = compare(results, baseline, args.threshold)
+    print("\n" + "\n".join(lines))
+
+    if not baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2), encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+    if regressed:
+        raise SystemExit(
+            f"\n{len(regressed)} case(s) failed or regressed by more than "
+            f"{args.threshold:.0%}: " + ", ".join(regressed)
+        )
+    if baseline:
+        print(f"\nNo case regressed by more than {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
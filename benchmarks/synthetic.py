@@ -0,0 +1,68 @@
+"""Seeded synthetic ``*_places.csv`` generator for benchmarks."""
+
+import csv
+import random
+from collections.abc import Sequence
+from pathlib import Path
+
+from app.utils.models import COUNTRY_CONFIGS, Zone
+
+CATEGORIES = ["Food", "Sweet Tooth", "Bar", "Nature", "Culture", "Unique"]
+FIELDNAMES = ["Name", "Category", "Latitude", "Longitude", "Zone", "Address", "Notes"]
+
+
+def _inside(lat: float, lon: float, polygon: Sequence[Sequence[float]]) -> bool:
+    """Ray-casting point-in-polygon test."""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lon_i > lon) != (lon_j > lon) and lat < (lat_j - lat_i) * (lon - lon_i) / (
+            lon_j - lon_i
+        ) + lat_i:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _sample_point(rng: random.Random, zone: Zone) -> tuple[float, float]:
+    """Pick a point inside the zone polygon, or near its centre if it has none."""
+    if not zone.polygon:
+        return rng.gauss(zone.center[0], 0.05), rng.gauss(zone.center[1], 0.05)
+
+    lats = [p[0] for p in zone.polygon]
+    lons = [p[1] for p in zone.polygon]
+    while True:
+        lat = rng.uniform(min(lats), max(lats))
+        lon = rng.uniform(min(lons), max(lons))
+        if _inside(lat, lon, zone.polygon):
+            return lat, lon
+
+
+def write_places_csv(path: Path, rows: int, country: str = "Singapore", seed: int = 0) -> Path:
+    """Write ``rows`` synthetic places scattered over the zones of ``country``."""
+    rng = random.Random(seed)
+    zones = COUNTRY_CONFIGS[country].zones
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for i in range(rows):
+            zone = zones[i % len(zones)]
+            lat, lon = _sample_point(rng, zone)
+            category = rng.choice(CATEGORIES)
+            writer.writerow(
+                [
+                    f"{category} Spot {i}",
+                    category,
+                    f"{lat:.6f}",
+                    f"{lon:.6f}",
+                    zone.name,
+                    f"{rng.randint(1, 999)} Synthetic Rd",
+                    f"Synthetic note #{i}, seed {seed}",
+                ]
+            )
+
+    return path
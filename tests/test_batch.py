@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from app import main
+from app.main import BuildOptions, build_batch, find_countries
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,Central,1 Fullerton Rd,\n"
+    "Lau Pa Sat,Food,1.2807,103.8504,Central,18 Raffles Quay,\n"
+)
+
+
+@pytest.fixture
+def countries(tmp_path):
+    data = tmp_path / "singapore" / "data"
+    data.mkdir(parents=True)
+    (data / "singapore_places.csv").write_text(CSV, encoding="utf-8")
+    return list(find_countries(tmp_path).values())
+
+
+def test_extra_formats_share_one_pass(countries, tmp_path, monkeypatch):
+    passes = []
+
+    def iter_locations(*args):
+        passes.append(args[0])
+        return original(*args)
+
+    original = main.iter_locations
+    monkeypatch.setattr(main, "iter_locations", iter_locations)
+    options = BuildOptions(exports=("geojson", "gpx", "csv"))
+
+    (report,) = build_batch(countries, tmp_path / "output", jobs=1, options=options)
+
+    assert not report.errors
+    assert sorted(report.outputs) == ["csv", "geojson", "gpx", "html", "kml"]
+    assert len(passes) == 1
+    assert all(Path(output).exists() for output in report.outputs.values())
+
+
+def test_unchanged_outputs_are_skipped(countries, tmp_path):
+    options = BuildOptions(exports=("gpx",))
+    build_batch(countries, tmp_path / "output", jobs=1, options=options)
+
+    (report,) = build_batch(countries, tmp_path / "output", jobs=1, options=options)
+
+    assert sorted(report.skipped) == ["gpx", "html", "kml"]
+
+
+def test_pool_builds_what_one_process_builds(countries, tmp_path):
+    data = tmp_path / "japan" / "data"
+    data.mkdir(parents=True)
+    (data / "japan_places.csv").write_text(
+        CSV.replace("1.2868,103.8590", "35.6586,139.7454").replace(
+            "1.2807,103.8504", "35.71,139.81"
+        ),
+        encoding="utf-8",
+    )
+    countries = list(find_countries(tmp_path).values())
+
+    serial = build_batch(countries, tmp_path / "serial", jobs=1)
+    pooled = build_batch(countries, tmp_path / "pooled", jobs=2)
+
+    assert [report.name for report in pooled] == ["Japan", "Singapore"]
+    for one, other in zip(serial, pooled, strict=True):
+        assert not other.errors
+        assert sorted(one.outputs) == sorted(other.outputs) == ["html", "kml"]
+        kml = Path(one.outputs["kml"]).read_bytes()
+        assert Path(other.outputs["kml"]).read_bytes() == kml
+
+
+def test_a_broken_country_does_not_stop_the_batch(countries, tmp_path):
+    (tmp_path / "atlantis" / "data").mkdir(parents=True)
+    countries = list(find_countries(tmp_path).values())
+
+    atlantis, singapore = build_batch(countries, tmp_path / "output", jobs=2)
+
+    assert list(atlantis.errors) == ["csv"]
+    assert not singapore.errors
+    assert sorted(singapore.outputs) == ["html", "kml"]
@@ -0,0 +1,44 @@
+from utils.loader import load_locations
+
+from benchmarks.suite import compare, dataset, measure
+
+
+def result(rows_per_s):
+    return {"rows_per_s": rows_per_s, "peak_rss_mib": 80.0, "rss_growth_mib": 5.0}
+
+
+def test_compare_flags_regressions_and_failures():
+    results = {
+        "Singapore/1000/kml": result(850.0),
+        "Singapore/1000/html": result(990.0),
+        "Singapore/1000/main": {"rows": 1000, "error": "worker died (out of memory?)"},
+        "Japan/1000/kml": result(10.0),
+    }
+    baseline = {name: result(1000.0) for name in results if name.startswith("Singapore")}
+
+    lines, regressed = compare(results, baseline, threshold=0.1)
+
+    assert regressed == ["Singapore/1000/kml", "Singapore/1000/main"]
+    assert "-15.0%" in lines[1] and lines[1].endswith("REGRESSED")
+    assert "new" in lines[4]
+
+
+def test_synthetic_datasets_are_cached_and_reproducible(tmp_path):
+    path = dataset(tmp_path / "a", "Singapore", 50, seed=3)
+    again = dataset(tmp_path / "b", "Singapore", 50, seed=3)
+
+    assert path.read_bytes() == again.read_bytes()
+    assert dataset(tmp_path / "a", "Singapore", 50, seed=3) == path
+    assert dataset(tmp_path / "a", "Singapore", 50, seed=4).read_bytes() != path.read_bytes()
+    assert len(load_locations(str(path))) == 50
+
+
+def test_a_case_runs_in_a_fresh_process(tmp_path):
+    csv_file = dataset(tmp_path, "Singapore", 100, seed=0)
+
+    case = measure("kml", "Singapore", csv_file, 100, repeat=1)
+
+    assert "error" not in case
+    assert case["rows_per_s"] > 0
+    assert case["bytes_written"] > 0
+    assert "kml/write" in case["stages"]
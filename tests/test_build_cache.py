@@ -0,0 +1,63 @@
+from dataclasses import replace
+
+import pytest
+from utils.build_cache import BuildManifest, hash_file, zone_digests
+from utils.loader import load_locations
+
+from app import main
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,Civic District & Marina Bay,,\n"
+    "Maxwell Food Centre,Food,1.2803,103.8448,Chinatown & CBD,,\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return path
+
+
+def test_manifest_round_trip(tmp_path, csv_file):
+    output = tmp_path / "map.kml"
+    output.write_text("<kml/>", encoding="utf-8")
+    inputs = {"csv": hash_file(csv_file), "exporter": "1"}
+    manifest = BuildManifest(tmp_path)
+    manifest.record(output, inputs)
+    manifest.record_zones("Singapore", {"Central": "a"})
+    manifest.save()
+
+    again = BuildManifest(tmp_path)
+
+    assert again.is_fresh(output, inputs)
+    assert not again.is_fresh(output, {**inputs, "exporter": "2"})
+    assert not again.is_fresh(tmp_path / "missing.kml", inputs)
+    assert again.changed_zones("Singapore", {"Central": "b", "North": "c"}) == {"Central", "North"}
+
+
+def test_zone_digests_follow_the_rows(csv_file):
+    locations = load_locations(str(csv_file))
+    digests = zone_digests(locations)
+
+    locations[0] = replace(locations[0], notes="Edited")
+
+    changed = zone_digests(locations)
+    assert changed["Chinatown & CBD"] == digests["Chinatown & CBD"]
+    assert changed["Civic District & Marina Bay"] != digests["Civic District & Marina Bay"]
+
+
+def test_only_an_edited_csv_is_rebuilt(tmp_path, csv_file, capsys):
+    output = tmp_path / "output"
+    main.build_country("Singapore", str(csv_file), output)
+    capsys.readouterr()
+
+    main.build_country("Singapore", str(csv_file), output)
+    assert "outputs are up to date" in capsys.readouterr().out
+
+    csv_file.write_text(CSV.replace("Food,", "Bar,"), encoding="utf-8")
+    main.build_country("Singapore", str(csv_file), output)
+    out = capsys.readouterr().out
+    assert "up to date" not in out
+    assert "Changed zones: Chinatown & CBD" in out
@@ -0,0 +1,94 @@
+import pytest
+from utils.columnar import LocationStore, LocationView, StringTable, encode_categorical
+from utils.models import Location
+from utils.zoning import zone_index_for
+
+ROWS = [
+    {
+        "Name": "Maxwell Food Centre",
+        "Category": "Food",
+        "Latitude": "1.2803",
+        "Longitude": "103.8448",
+        "Zone": "Chinatown & CBD",
+        "Address": "1 Kadayanallur St",
+        "Notes": "Chicken rice",
+    },
+    {
+        "Name": "Café Ŝingapura",
+        "Category": "Sweet Tooth",
+        "Latitude": "1.3000",
+        "Longitude": "103.8500",
+        "Zone": "",
+        "Address": "",
+        "Notes": "",
+    },
+    {
+        "Name": "Lau Pa Sat",
+        "Category": "Food",
+        "Latitude": "1.2807",
+        "Longitude": "103.8504",
+        "Zone": "Chinatown & CBD",
+        "Address": "18 Raffles Quay",
+        "Notes": "",
+    },
+]
+
+
+@pytest.fixture
+def store():
+    return LocationStore.from_rows(ROWS)
+
+
+def test_string_table_round_trip():
+    values = ["plain", "ünïcödé", "", "東京"]
+
+    for table in (StringTable(values), StringTable.from_strings(values)):
+        assert list(table) == values
+        assert table[-1] == "東京"
+        assert table[1:3] == ["ünïcödé", ""]
+        assert list(table.take([3, 0])) == ["東京", "plain"]
+
+
+def test_categories_are_dictionary_encoded():
+    codes, table = encode_categorical(["Food", "Bar", "Food"])
+
+    assert codes.tolist() == [0, 1, 0]
+    assert table == ["Food", "Bar"]
+
+
+def test_rows_read_back_as_locations(store):
+    expected = [Location.from_csv_row(row) for row in ROWS]
+
+    assert len(store) == 3
+    assert [view.to_location() for view in store] == expected
+    assert store[1].name == "Café Ŝingapura"
+    assert store[-1].category == "Food"
+    assert store[0].uid == expected[0].uid
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_views_decode_nothing_until_read(store):
+    view = store[0]
+
+    assert isinstance(view, LocationView)
+    assert isinstance(view, Location)
+    assert view.coordinate_text == ("103.8448", "1.2803")
+    with pytest.raises(AttributeError):
+        view.name = "Renamed"
+
+
+def test_take_and_round_trip(store):
+    subset = store.take([2, 0])
+
+    assert [loc.name for loc in subset] == ["Lau Pa Sat", "Maxwell Food Centre"]
+    copy = LocationStore.from_locations(subset)
+    assert [loc.to_location() for loc in copy] == [loc.to_location() for loc in subset]
+    assert copy.nbytes > 0
+
+
+def test_zone_buckets_hold_views(store):
+    buckets = zone_index_for("Singapore").bucket(store)
+
+    assert [loc.name for loc in buckets["chinatown"]] == ["Maxwell Food Centre", "Lau Pa Sat"]
+    assert all(isinstance(loc, LocationView) for locs in buckets.values() for loc in locs)
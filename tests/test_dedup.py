@@ -0,0 +1,68 @@
+import csv
+
+import pytest
+from utils.dedup import Deduplicator, name_similarity
+from utils.ingest import ingest_store
+from utils.loader import load_locations
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Lau Pa Sat,Food,1.2807,103.8504,Central,18 Raffles Quay,\n"
+    "Somewhere Unknown,Food,,,Central,,\n"
+    '"Maxwell Food Centre",Food,1.2803,103.8448,Central,,"Chicken rice,\nand more"\n'
+    "Lau Pasat,Food,1.2808,103.8505,Central,,\n"
+    "Maxwell Food Center,Food,1.2804,103.8448,Central,,\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_report_gives_csv_lines(csv_file, tmp_path):
+    dedup = Deduplicator()
+
+    locations = load_locations(csv_file, dedup=dedup)
+
+    assert [loc.name for loc in locations] == ["Lau Pa Sat", "Maxwell Food Centre"]
+    # Line 3 had no coordinates and was skipped; line 4 runs on to line 5
+    assert [(m.kept_line, m.kept_name, m.dropped_line, m.dropped_name) for m in dedup.merges] == [
+        (2, "Lau Pa Sat", 6, "Lau Pasat"),
+        (5, "Maxwell Food Centre", 7, "Maxwell Food Center"),
+    ]
+    report = tmp_path / "merges.csv"
+    dedup.write_report(report)
+    with open(report, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["kept_line"], row["dropped_line"]) for row in rows] == [("2", "6"), ("5", "7")]
+
+
+def test_ingest_reports_lines_too(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(CSV.replace("Chicken rice,\nand more", "Chicken rice"), encoding="utf-8")
+    dedup = Deduplicator()
+
+    store, report = ingest_store(str(path), "Singapore", dedup=dedup)
+
+    assert [loc.name for loc in store] == ["Lau Pa Sat", "Maxwell Food Centre"]
+    assert [row.row for row in report.bad_rows] == [2]
+    assert [(m.kept_line, m.dropped_line) for m in dedup.merges] == [(2, 5), (4, 6)]
+
+
+def test_rows_from_elsewhere_are_numbered_after_a_header():
+    dedup = Deduplicator()
+    rows = [
+        {"Name": "Block 123", "Latitude": "1.30", "Longitude": "103.80"},
+        {"Name": "Block 123 ", "Latitude": "1.30001", "Longitude": "103.80"},
+    ]
+
+    assert len(list(dedup.filter(rows))) == 1
+    assert (dedup.merges[0].kept_line, dedup.merges[0].dropped_line) == (2, 3)
+
+
+def test_names_with_different_numbers_differ():
+    assert name_similarity("block 123", "block 124") == 0.0
+    assert name_similarity("maxwell food centre", "maxwell food center") > 0.85
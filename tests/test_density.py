@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from utils import density
+from utils.columnar import LocationStore
+from utils.density import cached_density_grid, density_grid
+from utils.models import Location
+
+CATEGORIES = ["Food", "Bar", "Nature"]
+
+
+@pytest.fixture(scope="module")
+def locations():
+    rng = np.random.default_rng(3)
+    lats = 1.33 + rng.normal(0, 0.05, 500)
+    lons = 103.83 + rng.normal(0, 0.08, 500)
+    return [
+        Location(f"Place {i}", lat, lon, CATEGORIES[i % 3])
+        for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist(), strict=True))
+    ]
+
+
+def test_every_level_counts_every_place(locations):
+    grid = density_grid(locations)
+
+    assert list(grid.levels) == list(range(density.MIN_DENSITY_ZOOM, density.DENSITY_ZOOM))
+    assert grid.categories == tuple(CATEGORIES)
+    sizes = [len(cells) for cells in grid.levels.values()]
+    assert sizes == sorted(sizes)
+    for cells in grid.levels.values():
+        assert sum(cell[2] for cell in cells) == len(locations)
+        for _, _, total, per_category in cells:
+            counts = per_category[1::2]
+            assert sum(counts) == total
+            assert counts == sorted(counts, reverse=True)
+
+
+def test_coarse_levels_match_binning_directly(locations):
+    nested = density_grid(locations, [6, 9, 12]).levels
+    direct = density_grid(locations, [9]).levels[9]
+
+    assert [cell[2:] for cell in nested[9]] == [cell[2:] for cell in direct]
+    assert np.array([cell[:2] for cell in nested[9]]) == pytest.approx(
+        np.array([cell[:2] for cell in direct])
+    )
+    assert density_grid(LocationStore.from_locations(locations), [9]).levels[9] == direct
+
+
+def test_grid_is_cached_until_the_places_change(locations, tmp_path, monkeypatch):
+    cache_file = tmp_path / "map.density.json"
+    grid = cached_density_grid(locations, cache_file, [8])
+    computed = []
+
+    def recompute(*args):
+        computed.append(args)
+        return original(*args)
+
+    original = density.density_grid
+    monkeypatch.setattr(density, "density_grid", recompute)
+
+    assert cached_density_grid(locations, cache_file, [8]) == grid
+    assert not computed
+    assert cached_density_grid(locations[1:], cache_file, [8]) != grid
+    assert len(computed) == 1
@@ -0,0 +1,68 @@
+import csv
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+from utils.export import KmlWriter, category_filter, export_path, write_exports
+from utils.kml_exporter import iter_kml
+from utils.loader import load_locations
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,Central,1 Fullerton Rd,\n"
+    "Lau Pa Sat,Food,1.2807,103.8504,Central,18 Raffles Quay,Satay & beer\n"
+    "MacRitchie,Nature,1.3442,103.8356,North,,Treetop walk\n"
+)
+
+
+@pytest.fixture
+def locations(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return load_locations(str(path))
+
+
+def test_kml_writer_and_iter_kml_give_one_document(locations, tmp_path):
+    output = tmp_path / "trip.kml"
+    with KmlWriter(str(output), country="Singapore", routes=["<Placemark/>"]) as writer:
+        for loc in locations:
+            writer.add(loc)
+
+    expected = "".join(iter_kml(locations, "Singapore", ["<Placemark/>"]))
+    assert output.read_text(encoding="utf-8") == expected
+
+
+def test_formats_are_written_in_one_pass(locations, tmp_path):
+    outputs = {fmt: export_path(fmt, "Singapore", tmp_path) for fmt in ("kmz", "geojson", "gpx")}
+
+    write_exports(iter(locations), outputs, "Singapore")
+
+    with zipfile.ZipFile(outputs["kmz"]) as archive:
+        assert archive.read("doc.kml").decode("utf-8") == "".join(iter_kml(locations))
+    with open(outputs["geojson"], encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    assert [feature["properties"]["name"] for feature in features] == [
+        "Merlion Park",
+        "Lau Pa Sat",
+        "MacRitchie",
+    ]
+    assert features[0]["geometry"]["coordinates"] == [103.859, 1.2868]
+    gpx = Path(outputs["gpx"]).read_text(encoding="utf-8")
+    assert gpx.count("<wpt ") == 3
+    assert "<desc>18 Raffles Quay - Satay &amp; beer</desc>" in gpx
+
+
+def test_category_filter_writes_a_subset(locations, tmp_path):
+    output = export_path("csv", "Singapore", tmp_path)
+
+    write_exports(locations, {"csv": output}, where=category_filter(["Food", "Nature"]))
+
+    with open(output, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["Name"] for row in rows] == ["Lau Pa Sat", "MacRitchie"]
+    assert rows[1]["Zone"] == "North"
+
+
+def test_no_categories_keeps_everything():
+    assert category_filter([]) is None
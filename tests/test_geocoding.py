@@ -0,0 +1,172 @@
+import csv
+
+import pytest
+from utils.geocoding import (
+    Gazetteer,
+    GeocodeCache,
+    Geocoder,
+    RateLimiter,
+    StaticBackend,
+    fill_missing_coordinates,
+    geocode_csv,
+)
+
+MARINA = (1.2834, 103.8607)
+CHINATOWN = (1.2838, 103.8443)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def make_geocoder(tmp_path, clock, answers=None, gazetteer_entries=None) -> Geocoder:
+    gazetteer = None
+    if gazetteer_entries is not None:
+        gazetteer = Gazetteer(tmp_path / "gazetteer.sqlite")
+        gazetteer.add(gazetteer_entries)
+    return Geocoder(
+        cache=GeocodeCache(tmp_path / "cache.sqlite"),
+        gazetteer=gazetteer,
+        backend=StaticBackend(answers or {}),
+        rate_limiter=RateLimiter(1.0, clock=clock, sleep=clock.sleep),
+    )
+
+
+def test_gazetteer_answers_before_remote(tmp_path, clock):
+    geocoder = make_geocoder(
+        tmp_path,
+        clock,
+        answers={"Marina Bay": (0.0, 0.0), "Chinatown": CHINATOWN},
+        gazetteer_entries=[("Marina Bay", *MARINA)],
+    )
+
+    assert geocoder.geocode_many(["Marina Bay", "Chinatown"]) == {
+        "Marina Bay": MARINA,
+        "Chinatown": CHINATOWN,
+    }
+    assert geocoder.backend.calls == ["chinatown"]
+
+
+def test_cache_answers_before_gazetteer_and_remote(tmp_path, clock):
+    geocoder = make_geocoder(tmp_path, clock, answers={"Chinatown": CHINATOWN})
+    geocoder.geocode("Chinatown")
+
+    again = make_geocoder(tmp_path, clock, answers={"Chinatown": (0.0, 0.0)}, gazetteer_entries=[])
+    assert again.geocode("Chinatown") == CHINATOWN
+    assert again.backend.calls == []
+
+
+def test_misses_are_remembered(tmp_path, clock):
+    geocoder = make_geocoder(tmp_path, clock)
+    assert geocoder.geocode("Nowhere") is None
+    assert geocoder.geocode("Nowhere") is None
+    assert geocoder.backend.calls == ["nowhere"]
+
+    # Also across runs, since the cache is on disk
+    again = make_geocoder(tmp_path, clock, answers={"Nowhere": MARINA})
+    assert again.geocode("Nowhere") is None
+    assert again.backend.calls == []
+
+
+def test_cached_miss_is_resolved_by_a_later_gazetteer(tmp_path, clock):
+    make_geocoder(tmp_path, clock).geocode("Marina Bay")
+
+    geocoder = make_geocoder(tmp_path, clock, gazetteer_entries=[("Marina Bay", *MARINA)])
+    assert geocoder.geocode("Marina Bay") == MARINA
+    assert geocoder.backend.calls == []
+    assert geocoder.cache.get_many(["marina bay"]) == {"marina bay": MARINA}
+
+
+def test_local_only_lookups_skip_the_backend(tmp_path, clock):
+    geocoder = make_geocoder(tmp_path, clock, answers={"Chinatown": CHINATOWN})
+    assert geocoder.geocode_many(["Chinatown"], remote=False) == {"Chinatown": None}
+    assert geocoder.backend.calls == []
+
+
+def test_remote_calls_are_rate_limited(tmp_path, clock):
+    geocoder = make_geocoder(tmp_path, clock, answers={"Chinatown": CHINATOWN})
+    geocoder.geocode_many(["Chinatown", "Marina Bay", "Orchard"])
+    assert clock.slept == [1.0, 1.0]
+
+
+def test_fill_missing_coordinates(tmp_path, clock):
+    geocoder = make_geocoder(tmp_path, clock, answers={"1 Marina Blvd": MARINA})
+    rows = [
+        {"Name": "Placed", "Address": "", "Latitude": "1.3", "Longitude": "103.8"},
+        {"Name": "Garden", "Address": "1 Marina Blvd", "Latitude": "", "Longitude": ""},
+        {"Name": "Lost", "Address": "", "Latitude": "", "Longitude": ""},
+    ]
+
+    filled = list(fill_missing_coordinates(rows, geocoder))
+
+    assert [row["Name"] for row in filled] == ["Placed", "Garden"]
+    assert (filled[1]["Latitude"], filled[1]["Longitude"]) == ("1.2834", "103.8607")
+    # Most specific queries first, for the whole batch, then the address alone
+    assert geocoder.backend.calls == ["garden 1 marina blvd", "lost", "1 marina blvd"]
+
+
+def test_geocode_csv_keeps_unresolved_rows(tmp_path, clock):
+    source = tmp_path / "places.csv"
+    source.write_text(
+        "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+        "Garden,Nature,,,Central,1 Marina Blvd,\n"
+        "Lost,Food,,,Central,,\n",
+        encoding="utf-8",
+    )
+    geocoder = make_geocoder(tmp_path, clock, answers={"1 Marina Blvd": MARINA})
+
+    geocode_csv(str(source), geocoder, tmp_path / "filled.csv")
+
+    with open(tmp_path / "filled.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["Name"], row["Latitude"]) for row in rows] == [("Garden", "1.2834"), ("Lost", "")]
+
+
+def counting(rows, read):
+    for row in rows:
+        read.append(row["Name"])
+        yield row
+
+
+def placed(name):
+    return {"Name": name, "Address": "", "Latitude": "1.3", "Longitude": "103.8"}
+
+
+def test_blank_row_without_geocoder_is_not_buffered(capsys):
+    rows = [{"Name": "Lost", "Address": "", "Latitude": "", "Longitude": ""}]
+    rows += [placed(f"P{i}") for i in range(1000)]
+    read = []
+
+    filled = fill_missing_coordinates(counting(rows, read), None)
+
+    assert next(filled)["Name"] == "P0"
+    assert len(read) == 2
+    assert len(list(filled)) == 999
+    assert "Skipped 1 place(s) without coordinates: Lost" in capsys.readouterr().out
+
+
+def test_rows_are_held_back_at_most_one_batch(tmp_path, clock):
+    geocoder = make_geocoder(tmp_path, clock, answers={"Lost": MARINA})
+    rows = [{"Name": "Lost", "Address": "", "Latitude": "", "Longitude": ""}]
+    rows += [placed(f"P{i}") for i in range(1000)]
+    read = []
+
+    filled = fill_missing_coordinates(counting(rows, read), geocoder, batch_size=10)
+
+    assert next(filled)["Name"] == "Lost"
+    assert len(read) == 10
+    assert [row["Name"] for row in filled] == [f"P{i}" for i in range(1000)]
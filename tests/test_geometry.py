@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from utils.geometry import (
+    GeometryCache,
+    convex_hull,
+    derive_geometry,
+    derived_zones,
+    simplify,
+    zone_geometries,
+)
+from utils.models import COUNTRY_CONFIGS, Location
+from utils.zoning import points_in_polygon
+
+ZONES = COUNTRY_CONFIGS["Singapore"].zones
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(2)
+    return 1.30 + rng.normal(0, 0.01, 300), 103.85 + rng.normal(0, 0.01, 300)
+
+
+def test_hull_of_a_square_and_its_inside():
+    square = np.array([[0, 0], [0, 1], [1, 1], [1, 0], [0.5, 0.5], [0, 0.5]], dtype=float)
+
+    hull = convex_hull(square)
+
+    assert sorted(map(tuple, hull.tolist())) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def test_outline_holds_every_place_and_simplifies_by_zoom(points):
+    geometry = derive_geometry(*points)
+
+    # Simplification cuts corners by about a pixel, which the padding covers from zoom 12 up
+    for zoom, outline in geometry.outlines:
+        if zoom >= 12:
+            assert points_in_polygon(*points, np.array(outline)).all()
+    sizes = [len(outline) for _, outline in geometry.outlines]
+    assert sizes == sorted(sizes)
+    assert geometry.outlines[0][0] == 0
+    assert 11 <= geometry.zoom <= 15
+    assert geometry.center == pytest.approx((1.30, 103.85), abs=0.01)
+
+
+def test_simplify_keeps_a_ring():
+    ring = np.array([[0, 0], [0, 1e-6], [0, 1e-3], [1e-3, 1e-3], [1e-3, 0]], dtype=float)
+
+    assert len(simplify(ring, 1.0)) == 4
+    assert len(simplify(ring, 1e6)) == 3
+
+
+def test_geometry_is_cached_per_zone(tmp_path):
+    zone = ZONES[2]
+    places = {zone.id: [Location("A", 1.30, 103.85, "Food"), Location("B", 1.31, 103.86, "Food")]}
+    cache = GeometryCache(tmp_path / "geometry.json")
+    first = zone_geometries("Singapore", ZONES, places, cache)
+
+    again = zone_geometries("Singapore", ZONES, places, GeometryCache(tmp_path / "geometry.json"))
+
+    assert again == first
+    assert list(first) == [zone.id]
+    (derived,) = [z for z in derived_zones(ZONES, first) if z.id == zone.id]
+    assert (derived.center, derived.zoom) == (first[zone.id].center, first[zone.id].zoom)
+    assert derived.polygon == (zone.polygon or first[zone.id].polygon)
@@ -0,0 +1,90 @@
+import re
+
+from utils.build_cache import hash_config
+from utils.html_map import generate_html_map, location_ids
+from utils.loader import load_store
+from utils.models import COUNTRY_CONFIGS, Location
+from utils.zoning import zone_index_for
+
+# Builds of each dataset in one process (a short soak; see benchmarks/soak_html_map.py)
+BUILDS = 20
+
+# Folium names its elements with random hex IDs
+FOLIUM_ID = re.compile(r"_[0-9a-f]{32}")
+
+HEADER = "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+CHINATOWN = HEADER + (
+    "Buddha Tooth Relic Temple,Culture,1.2815,103.8443,Chinatown & CBD,288 South Bridge Rd,\n"
+    "Maxwell Food Centre,Food,1.2803,103.8448,Chinatown & CBD,1 Kadayanallur St,\n"
+)
+ELSEWHERE = HEADER + (
+    "Gardens by the Bay,Nature,1.2816,103.8636,,18 Marina Gardens Dr,\n"
+    "Jewel Changi,Unique,1.3603,103.9898,,78 Airport Blvd,\n"
+    "Botanic Gardens,Nature,1.3138,103.8159,,1 Cluny Rd,\n"
+)
+
+
+def build(tmp_path, name, text, **options):
+    csv_file = tmp_path / f"{name}.csv"
+    csv_file.write_text(text, encoding="utf-8")
+    output = tmp_path / f"{name}.html"
+    generate_html_map(str(csv_file), "Singapore", str(output), load_store(str(csv_file)), **options)
+    return FOLIUM_ID.sub("_ID", output.read_text(encoding="utf-8"))
+
+
+def test_repeated_builds_are_stable(tmp_path, capsys):
+    configs = {country: hash_config(country) for country in COUNTRY_CONFIGS}
+    index = zone_index_for("Singapore")
+    polygons = [(i, vertices.copy(), bbox) for i, vertices, bbox in index.polygons]
+
+    first = {
+        name: build(tmp_path, name, text) for name, text in (("a", CHINATOWN), ("b", ELSEWHERE))
+    }
+    for _ in range(BUILDS):
+        assert build(tmp_path, "a", CHINATOWN) == first["a"]
+        assert build(tmp_path, "b", ELSEWHERE) == first["b"]
+
+    assert first["a"].count('class="location-item"') == 2
+    assert first["b"].count('class="location-item"') == 3
+    assert "Jewel Changi" not in first["a"]
+    assert {country: hash_config(country) for country in COUNTRY_CONFIGS} == configs
+    assert index.zones == list(COUNTRY_CONFIGS["Singapore"].zones)
+    for (i, vertices, bbox), (j, now, now_bbox) in zip(polygons, index.polygons, strict=True):
+        assert (i, bbox) == (j, now_bbox)
+        assert (vertices == now).all()
+
+
+def test_large_maps_are_clustered_in_the_browser(tmp_path):
+    clustered = build(tmp_path, "clustered", ELSEWHERE, cluster_threshold=2)
+    markers = build(tmp_path, "markers", ELSEWHERE, cluster_threshold=None)
+
+    # One marker factory for the JSON rows instead of a Leaflet object per place
+    assert clustered.count("L.marker(") == 1
+    assert "L.markerClusterGroup" in clustered
+    assert '[1.3603, 103.9898, "Jewel Changi"' in clustered
+    assert markers.count("L.marker(") == 3
+    assert "L.markerClusterGroup" not in markers
+
+
+def test_sidebar_items_find_their_marker_by_id(tmp_path):
+    page = build(
+        tmp_path, "ids", CHINATOWN + CHINATOWN.splitlines(keepends=True)[1], cluster_threshold=None
+    )
+
+    opened = re.findall(r"openLocation\('([^']+)'", page)
+    registered = re.search(r"registerPlanner\(\s*\w+,\s*\{(.*?)\}", page, re.S).group(1)
+    assert len(opened) == len(set(opened)) == 3
+    assert opened[2] == f"{opened[0]}-2"
+    for loc_id in opened:
+        assert f'"{loc_id}": marker_ID' in registered
+
+
+def test_location_ids_are_stable():
+    loc = Location("Merlion Park", 1.2868, 103.859, "Culture")
+    moved = Location("Merlion Park", 1.2869, 103.859, "Culture")
+    zones = COUNTRY_CONFIGS["Singapore"].zones[:1]
+
+    ids = location_ids(zones, {zones[0].id: [loc, moved, loc]})
+
+    assert ids[zones[0].id] == [loc.uid, moved.uid, f"{loc.uid}-2"]
+    assert Location("Merlion Park", 1.2868, 103.859, "Other").uid == loc.uid
@@ -0,0 +1,58 @@
+import pytest
+from utils.ingest import ingest_store, resolve_engine
+from utils.loader import load_store
+
+GOOD = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,Central,1 Fullerton Rd,\n"
+    "Lau Pa Sat,Food,1.28070000000000001,103.8504,Central,,Satay\n"
+)
+BAD = (
+    "No Coordinates,Food,,,Central,,\n"
+    "Typo,Food,1.28o7,103.8504,Central,,\n"
+    "Swapped,Food,103.8504,1.2807,Central,,\n"
+    "Tokyo Tower,Culture,35.6586,139.7454,,,\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(GOOD + BAD, encoding="utf-8")
+    return str(path)
+
+
+def test_bad_rows_are_reported_not_fatal(csv_file, tmp_path):
+    store, report = ingest_store(csv_file, "Singapore")
+
+    assert [loc.name for loc in store] == ["Merlion Park", "Lau Pa Sat"]
+    assert report.rows_read == 6
+    assert [(bad.row, bad.reason) for bad in report.bad_rows] == [
+        (3, "missing coordinates"),
+        (4, "coordinates are not numbers"),
+        (5, "coordinates out of range"),
+        (6, "outside Singapore bounds"),
+    ]
+    assert report.bad_rows[1].latitude == "1.28o7"
+    report.write_report(tmp_path / "bad.csv")
+    assert (tmp_path / "bad.csv").read_text(encoding="utf-8").startswith("row,reason,name")
+
+
+def test_clean_rows_match_the_row_loader(tmp_path):
+    path = tmp_path / "good.csv"
+    path.write_text(GOOD, encoding="utf-8")
+
+    store, report = ingest_store(str(path), "Singapore")
+
+    assert not report.bad_rows
+    expected = load_store(str(path))
+    assert [loc.to_location() for loc in store] == [loc.to_location() for loc in expected]
+    assert [loc.uid for loc in store] == [loc.uid for loc in expected]
+    assert store[1].coordinate_text == ("103.8504", "1.28070000000000001")
+
+
+def test_engines():
+    assert resolve_engine("c") == "c"
+    assert resolve_engine() in ("c", "pyarrow")
+    with pytest.raises(ValueError):
+        resolve_engine("python")
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from utils.itinerary import optimize_route, route_length
+
+from app import main
+from app.utils import itinerary
+
+
+@pytest.fixture
+def stops():
+    rng = np.random.default_rng(0)
+    return 1.29 + rng.normal(0, 0.02, 200), 103.85 + rng.normal(0, 0.02, 200)
+
+
+def test_same_stops_give_the_same_route(stops):
+    first = optimize_route(*stops)
+    again = optimize_route(*stops)
+
+    assert first.order == again.order
+    assert sorted(first.order) == list(range(200))
+
+
+def test_improvement_is_bounded_by_the_move_budget(stops):
+    start = optimize_route(*stops, move_budget=0)
+    short = optimize_route(*stops, move_budget=10_000)
+    full = optimize_route(*stops)
+
+    assert full.distance_m < short.distance_m < start.distance_m
+    assert full.distance_m == pytest.approx(route_length(*stops, full.order, closed=False))
+
+
+def test_round_trip_starts_at_the_start(stops):
+    route = optimize_route(*stops, start=5)
+
+    assert route.closed
+    assert route.order[0] == 5
+    assert route.distance_m == pytest.approx(route_length(*stops, route.order, closed=True))
+
+
+def test_routes_are_planned_once_per_build(tmp_path, monkeypatch):
+    csv_file = tmp_path / "places.csv"
+    csv_file.write_text(
+        "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+        "Merlion Park,Culture,1.2868,103.8590,Central,,\n"
+        "Lau Pa Sat,Food,1.2807,103.8504,Central,,\n"
+        "Raffles Hotel,Culture,1.2949,103.8545,Central,,\n",
+        encoding="utf-8",
+    )
+    plans = []
+
+    def zone_itineraries(*args, **kwargs):
+        plans.append(args)
+        return original(*args, **kwargs)
+
+    original = itinerary.zone_itineraries
+    monkeypatch.setattr(itinerary, "zone_itineraries", zone_itineraries)
+    options = main.BuildOptions(itineraries=True, exports=("kmz",))
+
+    main.build_country("Singapore", str(csv_file), tmp_path / "output", options=options)
+
+    assert len(plans) == 1
+    kml = (tmp_path / "output" / "Singapore_Trip_Mobile.kml").read_text(encoding="utf-8")
+    assert "day route</name>" in kml
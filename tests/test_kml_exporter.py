@@ -0,0 +1,47 @@
+import zipfile
+
+import pytest
+from utils.kml_exporter import create_kml
+from utils.loader import load_store
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,Central,1 Fullerton Rd,Photo <3\n"
+    "Lau Pa Sat,Food,1.28070,103.8504,Central,18 Raffles Quay,Satay street\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_loaded_places_keep_the_csv_coordinates(csv_file, tmp_path):
+    create_kml(csv_file, "Singapore", str(tmp_path / "streamed.kml"))
+    create_kml(csv_file, "Singapore", str(tmp_path / "loaded.kml"), locations=load_store(csv_file))
+
+    streamed = (tmp_path / "streamed.kml").read_text(encoding="utf-8")
+    assert (tmp_path / "loaded.kml").read_text(encoding="utf-8") == streamed
+    assert "<coordinates>103.8590,1.2868,0</coordinates>" in streamed
+    assert "<coordinates>103.8504,1.28070,0</coordinates>" in streamed
+    assert "Photo &lt;3" in streamed
+    assert streamed.endswith("</Placemark>\n</Document></kml>")
+
+
+def test_kmz_holds_the_same_document(csv_file, tmp_path):
+    create_kml(csv_file, "Singapore", str(tmp_path / "trip.kml"))
+    create_kml(csv_file, "Singapore", str(tmp_path / "trip.kmz"), kmz=True)
+
+    with zipfile.ZipFile(tmp_path / "trip.kmz") as archive:
+        assert archive.namelist() == ["doc.kml"]
+        assert archive.read("doc.kml") == (tmp_path / "trip.kml").read_bytes()
+
+
+def test_store_views_keep_the_csv_coordinates(csv_file):
+    store = load_store(csv_file)
+
+    assert store[0].coordinate_text == ("103.8590", "1.2868")
+    assert store[1:][0].coordinate_text == ("103.8504", "1.28070")
+    assert store[0].longitude == 103.859
@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,Central,1 Fullerton Rd,\n"
+)
+
+HEAVY = ("folium", "branca", "jinja2", "numpy", "pandas")
+
+
+def loaded(code, tmp_path):
+    """The heavy packages imported by running ``code`` in a fresh interpreter."""
+    csv_file = tmp_path / "places.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    script = (
+        f"import sys\nCSV, OUT = {str(csv_file)!r}, {str(tmp_path)!r}\n{code}\n"
+        f"print(__import__('json').dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import app.utils",
+        "import app.main",
+        "from app.utils import create_kml\ncreate_kml(CSV, 'Singapore', OUT + '/map.kml')",
+    ],
+)
+def test_kml_runs_load_nothing_heavy(code, tmp_path):
+    assert loaded(code, tmp_path) == []
+
+
+def test_html_map_loads_folium_on_use(tmp_path):
+    code = "from app.utils import generate_html_map\ngenerate_html_map(CSV, 'Singapore', OUT + '/m.html')"
+
+    assert {"folium", "jinja2"} <= set(loaded(code, tmp_path))
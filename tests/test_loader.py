@@ -0,0 +1,40 @@
+import pytest
+from utils.geocoding import Geocoder, StaticBackend
+from utils.loader import load_locations
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Gardens by the Bay,Nature,1.2816,103.8636,Central,18 Marina Gardens Dr,\n"
+    "Hawker Centre,Food,,,Central,1 Kadayanallur St,\n"
+    "Half Placed,Food,1.28,,Central,,\n"
+)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_rows_without_coordinates_are_skipped(csv_file, capsys):
+    locations = load_locations(csv_file)
+
+    assert [loc.name for loc in locations] == ["Gardens by the Bay"]
+    out = capsys.readouterr().out
+    assert "Skipped 2 place(s) without coordinates" in out
+    assert "Hawker Centre" in out
+
+
+def test_rows_without_coordinates_are_geocoded(csv_file):
+    backend = StaticBackend({"1 Kadayanallur St": (1.2795, 103.8447)})
+
+    locations = load_locations(csv_file, Geocoder(backend=backend))
+
+    assert [loc.name for loc in locations] == ["Gardens by the Bay", "Hawker Centre"]
+    assert (locations[1].latitude, locations[1].longitude) == (1.2795, 103.8447)
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_locations(str(tmp_path / "missing.csv"))
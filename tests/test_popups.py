@@ -0,0 +1,37 @@
+import json
+
+from utils.html_map import generate_html_map
+from utils.popups import rows_json
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,,1 Fullerton Rd,Photo spot\n"
+    'Lau Pa Sat,Food,1.2807,103.8504,,18 Raffles Quay,"Satay </script><b>& beer"\n'
+)
+
+
+def test_rows_are_safe_to_inline():
+    rows = [[1.5, 103.8, "</script><script>alert(1)</script>", "A & B"]]
+
+    text = rows_json(rows)
+
+    assert "<" not in text and ">" not in text and "&" not in text
+    assert json.loads(text) == rows
+
+
+def test_popups_are_built_in_the_browser(tmp_path):
+    csv_file = tmp_path / "places.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    pages = {}
+    for compact in (False, True):
+        output = tmp_path / f"{compact}.html"
+        generate_html_map(
+            str(csv_file), "Singapore", str(output), cluster_threshold=None, compact_popups=compact
+        )
+        pages[compact] = output.read_text(encoding="utf-8")
+
+    # The zone polygons keep their popups; the two markers' move into the browser
+    assert pages[False].count(".bindPopup(popup_") - pages[True].count(".bindPopup(popup_") == 2
+    assert "Photo spot" in pages[True]
+    assert "Satay \\u003c/script\\u003e\\u003cb\\u003e\\u0026 beer" in pages[True]
+    assert len(pages[True]) < len(pages[False])
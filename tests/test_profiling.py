@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from utils import profiling
+
+# Enough to move the process's peak RSS on any platform
+ALLOCATION = 64 << 20
+
+
+def test_stages_nest_and_count(tmp_path):
+    report_path = tmp_path / "profile.json"
+
+    with profiling.profile_session(report_path) as profiler, profiling.stage("html"):
+        profiling.count("rows", 3)
+        for _ in range(2):
+            with profiling.stage("render"):
+                profiling.count("bytes_written", 10)
+
+    assert list(profiler.stages) == ["html", "html/render"]
+    assert profiler.stages["html/render"].calls == 2
+    assert profiler.stages["html"].counters == {"rows": 3}
+    assert profiler.counters == {"rows": 3, "bytes_written": 20}
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert [stage["name"] for stage in report["stages"]] == ["html", "html/render"]
+    assert "html/render" in profiler.summary()
+
+
+def test_rss_is_reported_per_stage_and_once_per_session():
+    if profiling.peak_rss() is None:
+        pytest.skip("no getrusage on this platform")
+
+    with profiling.profile_session() as profiler:
+        with profiling.stage("allocate"):
+            block = bytearray(ALLOCATION)
+            block[::4096] = b"x" * len(block[::4096])
+        with profiling.stage("idle"):
+            pass
+    report = profiler.report()
+
+    stages = {stage["name"]: stage for stage in report["stages"]}
+    assert "peak_rss_mib" not in stages["allocate"]
+    assert stages["allocate"]["rss_growth_mib"] >= ALLOCATION / (1 << 20) / 2
+    # A later stage doesn't inherit the high-water mark of an earlier one
+    assert stages["idle"]["rss_growth_mib"] == 0
+    assert report["peak_rss_mib"] >= stages["allocate"]["rss_growth_mib"]
+
+
+def test_stages_are_free_outside_a_session():
+    assert not profiling.enabled()
+    with profiling.stage("anything"):
+        profiling.count("rows")
+
+    nested = profiling.profile_session()
+    with profiling.profile_session(), pytest.raises(RuntimeError), nested:
+        pass
+    assert not profiling.enabled()
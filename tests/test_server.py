@@ -0,0 +1,94 @@
+import gzip
+import json
+import threading
+from http.client import HTTPConnection
+
+import pytest
+from utils.kml_exporter import iter_kml
+from utils.server import MapServer, MapSite, negotiate_encoding, parse_bbox
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Buddha Tooth Relic Temple,Culture,1.2815,103.8443,Chinatown & CBD,288 South Bridge Rd,\n"
+    "Maxwell Food Centre,Food,1.2803,103.8448,Chinatown & CBD,1 Kadayanallur St,Chicken rice\n"
+    "Jewel Changi,Unique,1.3603,103.9898,,78 Airport Blvd,\n"
+)
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("site")
+    csv_file = tmp / "places.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    (tmp / "page").mkdir()
+    site = MapSite.build("Singapore", str(csv_file), tmp / "page", nearby=2)
+    server = MapServer(("127.0.0.1", 0), site)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, **headers):
+    connection = HTTPConnection(*server.server_address[:2])
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_page_loads_markers_from_places(server):
+    response, body = get(server, "/")
+
+    assert response.status == 200
+    assert '"/places"' in body.decode("utf-8")
+
+
+def test_places_in_bbox(server):
+    response, body = get(server, "/places?bbox=1.27,103.83,1.29,103.85&zoom=16")
+
+    result = json.loads(body)
+    assert response.status == 200
+    assert (result["total"], result["returned"]) == (2, 2)
+    names = [row[2] for row in result["places"]]
+    assert names == ["Buddha Tooth Relic Temple", "Maxwell Food Centre"]
+    # The same places as the page's shard, nearby lists included
+    _, shard = get(server, "/index_shards/chinatown.geojson")
+    features = json.loads(shard)["features"]
+    assert [row[6] for row in result["places"]] == [f["properties"]["id"] for f in features]
+    assert result["places"][1][7] == features[1]["properties"]["nearby"]
+    assert features[1]["properties"]["nearby"][0][0] == "Buddha Tooth Relic Temple"
+
+
+def test_places_revalidate_with_etag(server):
+    path = "/places?bbox=1.2,103.6,1.5,104.1"
+    response, _ = get(server, path)
+
+    again, body = get(server, path, **{"If-None-Match": response.getheader("ETag")})
+
+    assert again.status == 304
+    assert body == b""
+
+
+def test_bad_bbox_is_rejected(server):
+    response, _ = get(server, "/places?bbox=1,2,3")
+
+    assert response.status == 400
+
+
+def test_kml_is_streamed_compressed(server):
+    response, body = get(server, "/kml", **{"Accept-Encoding": "gzip"})
+
+    assert response.getheader("Content-Encoding") == "gzip"
+    site = server.site
+    assert gzip.decompress(body).decode("utf-8") == "".join(iter_kml(site.locations, "Singapore"))
+
+
+def test_parse_bbox_and_encoding():
+    assert parse_bbox("1,2,3,4") == (1.0, 2.0, 3.0, 4.0)
+    with pytest.raises(ValueError):
+        parse_bbox("3,2,1,4")
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("deflate, gzip") == "gzip"
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from utils.html_map import category_styles, generate_html_map, location_ids
+from utils.models import COUNTRY_CONFIGS, Location
+from utils.shards import shard_directory, write_zone_shards
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Buddha Tooth Relic Temple,Culture,1.2815,103.8443,Chinatown & CBD,288 South Bridge Rd,\n"
+    "Maxwell Food Centre,Food,1.2803,103.8448,Chinatown & CBD,1 Kadayanallur St,Chicken rice\n"
+    "Jewel Changi,Unique,1.3603,103.9898,,78 Airport Blvd,\n"
+)
+
+ZONES = COUNTRY_CONFIGS["Singapore"].zones
+
+
+@pytest.fixture
+def page(tmp_path):
+    csv_file = tmp_path / "places.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    output = tmp_path / "map.html"
+    generate_html_map(str(csv_file), "Singapore", str(output), sharded=True)
+    return output
+
+
+def test_places_live_in_zone_shards(page):
+    html = page.read_text(encoding="utf-8")
+    shards = sorted(p.name for p in shard_directory(page).iterdir())
+
+    assert shards == ["chinatown.geojson", f"{ZONES[-1].id}.geojson"]
+    assert "map_shards/chinatown.geojson" in html
+    assert "Maxwell Food Centre" not in html
+    features = json.loads((shard_directory(page) / "chinatown.geojson").read_text(encoding="utf-8"))
+    temple, maxwell = features["features"]
+    assert temple["geometry"]["coordinates"] == [103.8443, 1.2815]
+    assert maxwell["properties"]["name"] == "Maxwell Food Centre"
+    assert maxwell["properties"]["notes"] == "Chicken rice"
+
+
+def test_only_changed_zones_are_rewritten(tmp_path):
+    chinatown, other = ZONES[0], ZONES[-1]
+    zone_locations = {zone.id: [] for zone in ZONES}
+    zone_locations[chinatown.id] = [Location("Maxwell Food Centre", 1.2803, 103.8448, "Food")]
+    zone_locations[other.id] = [Location("Jewel Changi", 1.3603, 103.9898, "Unique")]
+    ids = location_ids(ZONES, zone_locations)
+    categories, _ = category_styles(zone_locations)
+    output = tmp_path / "map.html"
+    write_zone_shards(output, ZONES, zone_locations, ids, categories)
+    directory = shard_directory(output)
+    (directory / f"{other.id}.geojson").write_text("kept", encoding="utf-8")
+    (directory / "gone.geojson").write_text("stale", encoding="utf-8")
+
+    shards = write_zone_shards(output, ZONES, zone_locations, ids, categories, only=[chinatown.id])
+
+    assert sorted(shards) == sorted([chinatown.id, other.id])
+    assert shards[other.id]["bounds"] == [[1.3603, 103.9898], [1.3603, 103.9898]]
+    assert (directory / f"{other.id}.geojson").read_text(encoding="utf-8") == "kept"
+    assert not (directory / "gone.geojson").exists()
@@ -0,0 +1,40 @@
+from utils.html_map import generate_html_map
+from utils.sidebar import SIDEBAR_CSS, SIDEBAR_JS, asset_name, write_shared_assets
+
+CSV = (
+    "Name,Category,Latitude,Longitude,Zone,Address,Notes\n"
+    "Merlion Park,Culture,1.2868,103.8590,,1 Fullerton Rd,\n"
+    "Lau Pa Sat,Food,1.2807,103.8504,,18 Raffles Quay,\n"
+)
+
+
+def test_assets_are_written_once_under_hashed_names(tmp_path):
+    css, js = write_shared_assets(tmp_path)
+
+    assert (css, js) == (
+        asset_name("sidebar", SIDEBAR_CSS, ".css"),
+        asset_name("sidebar", SIDEBAR_JS, ".js"),
+    )
+    assert (tmp_path / css).read_text(encoding="utf-8") == SIDEBAR_CSS
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([css, js])
+    assert write_shared_assets(tmp_path) == (css, js)
+    assert asset_name("sidebar", SIDEBAR_CSS + " ", ".css") != css
+
+
+def test_pages_link_shared_assets_instead_of_inlining(tmp_path):
+    csv_file = tmp_path / "places.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    for name in ("a", "b"):
+        generate_html_map(
+            str(csv_file), "Singapore", str(tmp_path / f"{name}.html"), shared_assets=True
+        )
+    generate_html_map(str(csv_file), "Singapore", str(tmp_path / "inline.html"))
+
+    css, js = write_shared_assets(tmp_path)
+    for name in ("a", "b"):
+        page = (tmp_path / f"{name}.html").read_text(encoding="utf-8")
+        assert f'href="{css}"' in page
+        assert f'src="{js}"' in page
+        assert SIDEBAR_CSS not in page
+    assert SIDEBAR_CSS in (tmp_path / "inline.html").read_text(encoding="utf-8")
+    assert len(list(tmp_path.glob("sidebar.*"))) == 2
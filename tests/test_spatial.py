@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from utils.spatial import SpatialIndex, haversine_m
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(1)
+    return 1.35 + rng.normal(0, 0.05, 2000), 103.82 + rng.normal(0, 0.08, 2000)
+
+
+@pytest.fixture(scope="module")
+def index(points):
+    return SpatialIndex(*points)
+
+
+QUERIES = [(1.35, 103.82), (1.2, 103.6), (1.6, 104.2)]
+
+
+@pytest.mark.parametrize(("lat", "lon"), QUERIES)
+def test_nearest_matches_brute_force(points, index, lat, lon):
+    distances = haversine_m(lat, lon, *points)
+
+    indices, found = index.nearest(lat, lon, k=5)
+
+    assert indices.tolist() == np.argsort(distances, kind="stable")[:5].tolist()
+    assert found == pytest.approx(np.sort(distances)[:5])
+
+
+@pytest.mark.parametrize(("lat", "lon"), QUERIES)
+def test_radius_matches_brute_force(points, index, lat, lon):
+    distances = haversine_m(lat, lon, *points)
+
+    indices, found = index.radius(lat, lon, 2_000)
+
+    assert sorted(indices.tolist()) == np.flatnonzero(distances <= 2_000).tolist()
+    assert (np.diff(found) >= 0).all()
+
+
+def test_bbox_and_neighbours(points, index):
+    lats, lons = points
+    inside = (lats >= 1.3) & (lats <= 1.4) & (lons >= 103.8) & (lons <= 103.9)
+
+    assert index.bbox(1.3, 103.8, 1.4, 103.9).tolist() == np.flatnonzero(inside).tolist()
+    (first, distances), *_ = index.neighbours(3)
+    assert 0 not in first.tolist()
+    assert first.tolist() == index.nearest(lats[0], lons[0], k=4)[0][1:].tolist()
+    assert len(distances) == 3
+
+
+def test_empty_index():
+    index = SpatialIndex(np.empty(0), np.empty(0))
+
+    assert index.nearest(1.0, 2.0, k=3)[0].size == 0
+    assert index.radius(1.0, 2.0, 100)[0].size == 0
+    assert index.bbox(0, 0, 1, 1).size == 0
@@ -0,0 +1,65 @@
+from dataclasses import replace
+
+import pytest
+from utils.models import COUNTRY_CONFIGS, Location
+from utils.watch import Snapshot, diff, watch_files
+from utils.zoning import zone_index_for
+
+ZONES = COUNTRY_CONFIGS["Singapore"].zones
+
+PLACES = [
+    Location("Maxwell Food Centre", 1.2803, 103.8448, "Food", zone="Chinatown & CBD"),
+    Location("Jewel Changi", 1.3603, 103.9898, "Unique"),
+    Location("Buddha Tooth Relic Temple", 1.2815, 103.8443, "Culture", zone="Chinatown & CBD"),
+]
+
+
+def snapshot(locations):
+    return Snapshot.of(locations, ZONES, zone_index_for("Singapore").bucket(locations))
+
+
+@pytest.fixture
+def before():
+    return snapshot(PLACES)
+
+
+def test_an_edit_touches_its_zone_only(before):
+    edited = [replace(PLACES[0], notes="Chicken rice"), *PLACES[1:]]
+
+    change = diff(before, snapshot(edited))
+
+    assert (change.added, change.removed, change.rows_changed) == (1, 1, True)
+    assert change.zones == {"chinatown"}
+    assert change.summary(ZONES) == "+1/-1 row(s) in Chinatown & CBD"
+
+
+def test_moves_between_zones_and_reorders(before):
+    reordered = diff(before, snapshot([PLACES[1], PLACES[0], PLACES[2]]))
+    relabelled = diff(before, snapshot([replace(PLACES[0], zone="chinatown & cbd"), *PLACES[1:]]))
+
+    assert reordered.rows_changed and not reordered.zones
+    assert reordered.summary() == "rows reordered"
+    assert relabelled.labels_changed and not relabelled.zones
+    assert diff(None, before).zones == set(before.zones)
+
+
+def test_a_new_category_renumbers_every_zone(before):
+    new = [*PLACES, Location("ATLAS Bar", 1.3005, 103.8582, "Bar", zone="Kampong Glam & Bugis")]
+
+    assert diff(before, snapshot(new)).zones == {zone.id for zone in ZONES}
+
+
+def test_changes_are_reported_once_settled(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text("a", encoding="utf-8")
+    polls, changes = [], []
+
+    def stop():
+        polls.append(None)
+        if len(polls) in (2, 3):  # two quick saves
+            path.write_text("a" * len(polls), encoding="utf-8")
+        return bool(changes) or len(polls) > 200
+
+    watch_files([path], changes.append, interval=0.005, debounce=0.05, stop=stop)
+
+    assert changes == [[path]]
@@ -0,0 +1,39 @@
+import numpy as np
+from utils.models import Location, Zone
+from utils.zoning import UNASSIGNED, ZoneIndex, points_in_polygon
+
+SQUARE = ((0.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, 0.0))
+# An L: the square with its north-east quarter cut away
+ELL = ((0.0, 0.0), (0.0, 1.0), (0.5, 1.0), (0.5, 0.5), (1.0, 0.5), (1.0, 0.0))
+
+
+def zone(zone_id, polygon=()):
+    return Zone(zone_id, zone_id.title(), "red", (0.0, 0.0), 12, "", polygon)
+
+
+def place(name, lat, lon, zone_name=""):
+    return Location(name, lat, lon, "Food", zone=zone_name)
+
+
+def test_points_in_polygon():
+    lats = np.array([0.25, 0.75, 0.75, 1.5])
+    lons = np.array([0.25, 0.25, 0.75, 0.5])
+
+    assert points_in_polygon(lats, lons, np.array(ELL)).tolist() == [True, True, False, False]
+    assert points_in_polygon(lats, lons, np.array(SQUARE)).tolist() == [True, True, True, False]
+
+
+def test_names_win_then_polygons_then_the_last_zone():
+    index = ZoneIndex([zone("ell", ELL), zone("square", SQUARE), zone("elsewhere")])
+    locations = [
+        place("named", 0.25, 0.25, "SQUARE"),
+        place("in the ell", 0.25, 0.25),
+        place("in the notch", 0.75, 0.75, "Nowhere"),
+        place("far away", 5.0, 5.0),
+    ]
+
+    assert index.match_names(["Ell", "nowhere"]).tolist() == [0, UNASSIGNED]
+    assert index.assign_locations(locations).tolist() == [1, 0, 1, 2]
+    buckets = index.bucket(locations)
+    assert list(buckets) == ["ell", "square", "elsewhere"]
+    assert [loc.name for loc in buckets["square"]] == ["named", "in the notch"]